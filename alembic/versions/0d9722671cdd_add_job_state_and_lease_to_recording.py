@@ -0,0 +1,42 @@
+"""Add job state and lease columns to Recording
+
+Revision ID: 0d9722671cdd
+Revises: 53e0c35b04c7
+Create Date: 2026-10-18 09:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d9722671cdd'
+down_revision: Union[str, None] = '53e0c35b04c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('recordings') as batch_op:
+        batch_op.add_column(sa.Column('status', sa.String(), server_default='pending', nullable=False))
+        batch_op.add_column(sa.Column('lease_owner', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('last_error', sa.String(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_recordings_status'), ['status'], unique=False)
+    # Recordings transcribed before job tracking existed are already done
+    op.execute("UPDATE recordings SET status = 'done' WHERE transcript_fetched = true")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('recordings') as batch_op:
+        batch_op.drop_index(batch_op.f('ix_recordings_status'))
+        batch_op.drop_column('last_error')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('lease_owner')
+        batch_op.drop_column('status')
@@ -0,0 +1,70 @@
+"""Add search_passages and its full-text index
+
+Revision ID: 193ca73c08ad
+Revises: 7efd4fcb2cd7
+Create Date: 2026-10-18 14:02:51.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '193ca73c08ad'
+down_revision: Union[str, None] = '7efd4fcb2cd7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'search_passages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('recording_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('start_seconds', sa.Float(), nullable=True),
+        sa.Column('end_seconds', sa.Float(), nullable=True),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(['recording_id'], ['recordings.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_search_passages_recording_id'), 'search_passages', ['recording_id'], unique=False)
+    # FTS5 table + sync triggers on SQLite, tsvector column + GIN index on Postgres
+    # (kept in step with SEARCH_INDEX_DDL in app/models.py)
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_passages_fts USING fts5("
+            "body, content='search_passages', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS search_passages_ai AFTER INSERT ON search_passages BEGIN "
+            "INSERT INTO search_passages_fts(rowid, body) VALUES (new.id, new.body); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS search_passages_ad AFTER DELETE ON search_passages BEGIN "
+            "INSERT INTO search_passages_fts(search_passages_fts, rowid, body) VALUES ('delete', old.id, old.body); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS search_passages_au AFTER UPDATE ON search_passages BEGIN "
+            "INSERT INTO search_passages_fts(search_passages_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+            "INSERT INTO search_passages_fts(rowid, body) VALUES (new.id, new.body); END"
+        )
+    elif dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE search_passages ADD COLUMN body_tsv tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('english', body)) STORED"
+        )
+        op.execute("CREATE INDEX ix_search_passages_body_tsv ON search_passages USING gin (body_tsv)")
+    # Existing transcripts are indexed by scripts/reindex_search.py
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS search_passages_fts")
+    op.drop_index(op.f('ix_search_passages_recording_id'), table_name='search_passages')
+    op.drop_table('search_passages')
@@ -0,0 +1,30 @@
+"""Add summary attempts to Recording
+
+Revision ID: 4e6b8d0a1c39
+Revises: 8c5d3a7f2b14
+Create Date: 2026-10-18 23:12:40.561208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e6b8d0a1c39'
+down_revision: Union[str, None] = '8c5d3a7f2b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('recordings') as batch_op:
+        batch_op.add_column(sa.Column('summary_attempts', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('recordings') as batch_op:
+        batch_op.drop_column('summary_attempts')
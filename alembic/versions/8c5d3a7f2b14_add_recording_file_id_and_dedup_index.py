@@ -0,0 +1,43 @@
+"""Add recording file id and dedup index to Recording
+
+Revision ID: 8c5d3a7f2b14
+Revises: 2b7c9e4f1a68
+Create Date: 2026-10-18 21:47:03.318245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c5d3a7f2b14'
+down_revision: Union[str, None] = '2b7c9e4f1a68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('recordings') as batch_op:
+        batch_op.add_column(sa.Column('recording_file_id', sa.String(), nullable=True))
+    # Existing rows get "" like new events that name no file, so their redeliveries
+    # conflict with them. Where a meeting was already stored more than once, only
+    # its first row gets "": the others are kept, under an id that matches no event.
+    op.execute(
+        "UPDATE recordings SET recording_file_id = CASE WHEN id = ("
+        "  SELECT MIN(r.id) FROM recordings r WHERE r.platform = recordings.platform AND r.meeting_id = recordings.meeting_id"
+        ") THEN '' ELSE 'legacy-' || id END WHERE recording_file_id IS NULL"
+    )
+    with op.batch_alter_table('recordings') as batch_op:
+        batch_op.alter_column('recording_file_id', existing_type=sa.String(), nullable=False, server_default='')
+        batch_op.create_index('uq_recordings_platform_meeting_file', ['platform', 'meeting_id', 'recording_file_id'],
+                              unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('recordings') as batch_op:
+        batch_op.drop_index('uq_recordings_platform_meeting_file')
+        batch_op.drop_column('recording_file_id')
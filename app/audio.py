@@ -0,0 +1,289 @@
+"""
+Audio decoding helpers.
+
+``stream_audio`` pipes an HTTP download straight into ffmpeg and reads 16 kHz
+mono PCM back from ffmpeg's stdout, so a recording reaches Whisper without the
+video or a WAV file ever touching local disk. ``save_pcm``/``read_pcm`` hand
+decoded samples to another process through a file instead of pickling them.
+"""
+
+import collections
+import struct
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+import numpy as np
+import requests
+
+SAMPLE_RATE = 16000
+
+# How much of the response to inspect before deciding whether it can be streamed
+HEAD_BYTES = 64 * 1024
+CHUNK_BYTES = 1024 * 1024
+
+
+class NeedsSeekingError(Exception):
+    """The container can't be decoded from a non-seekable pipe."""
+
+
+def needs_seeking(head: bytes) -> bool:
+    """
+    Return True if an MP4/MOV stream puts its ``moov`` index after ``mdat``.
+
+    ffmpeg needs the index before the media data to decode from a pipe; Zoom and
+    most encoders write it at the end unless the file was remuxed with
+    ``-movflags +faststart``. Non-ISO-BMFF containers (webm, mkv, wav, ...) are
+    assumed to be streamable.
+    """
+    if len(head) < 8 or head[4:8] != b"ftyp":
+        return False
+    offset = 0
+    while offset + 8 <= len(head):
+        size, box_type = struct.unpack(">I4s", head[offset:offset + 8])
+        if box_type == b"moov":
+            return False
+        if box_type == b"mdat":
+            return True
+        if size == 1:
+            if offset + 16 > len(head):
+                break
+            size = struct.unpack(">Q", head[offset + 8:offset + 16])[0]
+        if size < 8:
+            # size 0 means "to end of file"; anything else is malformed
+            break
+        offset += size
+    # Ran out of header bytes without seeing the index: play it safe
+    return True
+
+
+def _ffmpeg_pcm_cmd(source: str):
+    return [
+        "ffmpeg",
+        "-nostdin",
+        "-i",
+        source,
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-ar",
+        str(SAMPLE_RATE),
+        "pipe:1",
+    ]
+
+
+def pcm_to_float(pcm: bytes) -> np.ndarray:
+    """Convert signed 16-bit PCM to the float32 [-1, 1] array Whisper expects."""
+    return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+
+def decode_stream(chunks: Iterable[bytes]) -> np.ndarray:
+    """Feed container bytes to ffmpeg's stdin and collect PCM from its stdout."""
+    proc = subprocess.Popen(
+        _ffmpeg_pcm_cmd("pipe:0"),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    errors = []
+
+    def feed():
+        try:
+            for chunk in chunks:
+                proc.stdin.write(chunk)
+        except BrokenPipeError:
+            # ffmpeg exited early; its exit code and stderr tell us why
+            pass
+        except Exception as e:
+            errors.append(e)
+        finally:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    stderr = []
+    feeder = threading.Thread(target=feed, daemon=True)
+    drainer = threading.Thread(target=lambda: stderr.append(proc.stderr.read()), daemon=True)
+    feeder.start()
+    drainer.start()
+    pcm = proc.stdout.read()
+    proc.wait()
+    feeder.join()
+    drainer.join()
+
+    if errors:
+        raise errors[0]
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, proc.args, output=pcm, stderr=b"".join(stderr))
+    return pcm_to_float(pcm)
+
+
+def save_pcm(samples: np.ndarray, path: Union[Path, str]):
+    """Write float32 samples raw, for read_pcm in another process."""
+    samples.astype(np.float32, copy=False).tofile(path)
+
+
+def read_pcm(path: Union[Path, str]) -> np.ndarray:
+    return np.fromfile(path, dtype=np.float32)
+
+
+def decode_file(path: Path) -> np.ndarray:
+    """Decode a local media file to PCM via ffmpeg's stdout (no WAV on disk)."""
+    proc = subprocess.run(_ffmpeg_pcm_cmd(str(path)), check=True, capture_output=True)
+    return pcm_to_float(proc.stdout)
+
+
+def pcm_windows(
+    source: Union[Path, str],
+    window_seconds: float,
+    search_seconds: float = 10.0,
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Decode ``source`` (a local file or a URL ffmpeg can open) and yield
+    (sample offset, samples) windows of roughly ``window_seconds``, cut at the
+    quietest moment within ``search_seconds`` of each nominal boundary. At most
+    one window plus the search margin is held in memory, whatever the length
+    of the recording.
+    """
+    window = int(window_seconds * SAMPLE_RATE)
+    search = min(int(search_seconds * SAMPLE_RATE), window // 2)
+    proc = subprocess.Popen(
+        _ffmpeg_pcm_cmd(str(source)),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    # Only the tail of ffmpeg's log is kept for the error message
+    stderr = collections.deque(maxlen=50)
+    drainer = threading.Thread(target=lambda: stderr.extend(proc.stderr), daemon=True)
+    drainer.start()
+    try:
+        offset = 0
+        carry = np.zeros(0, dtype=np.float32)
+        while True:
+            wanted = window + search - len(carry)
+            pcm = proc.stdout.read(wanted * 2)
+            samples = np.concatenate([carry, pcm_to_float(pcm[: len(pcm) // 2 * 2])])
+            if len(pcm) < wanted * 2:
+                break
+            cut = quietest_point(samples, window - search, len(samples))
+            yield offset, samples[:cut]
+            offset += cut
+            carry = samples[cut:]
+        proc.wait()
+        drainer.join()
+        if proc.returncode != 0:
+            raise subprocess.CalledProcessError(proc.returncode, proc.args, stderr=b"".join(stderr))
+        if len(samples):
+            yield offset, samples
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+
+def stream_audio(url: str, session: Optional[requests.Session] = None, spool: Optional[Path] = None) -> np.ndarray:
+    """
+    Download ``url`` straight into ffmpeg and return 16 kHz mono float32 audio.
+    If the container needs a seekable input, the rest of the same response is
+    written to ``spool`` and decoded from there; without ``spool`` that raises
+    NeedsSeekingError.
+    """
+    if session is None:
+        from .downloader import get_session
+        session = get_session()
+    resp = session.get(url, stream=True, timeout=60)
+    resp.raise_for_status()
+    try:
+        head = b""
+        body = resp.iter_content(CHUNK_BYTES)
+        for chunk in body:
+            head += chunk
+            if len(head) >= HEAD_BYTES:
+                break
+        if not needs_seeking(head):
+            return decode_stream(_iter_response_rest(head, body))
+        if spool is None:
+            raise NeedsSeekingError(f"{url} has its index after the media data")
+        print(f"{url} has its index after the media data; finishing the download to {spool}")
+        with open(spool, "wb") as f:
+            for chunk in _iter_response_rest(head, body):
+                f.write(chunk)
+    finally:
+        resp.close()
+    return decode_file(spool)
+
+
+def _iter_response_rest(head: bytes, body: Iterator[bytes]) -> Iterator[bytes]:
+    yield head
+    yield from body
+
+
+def load_audio(url: str, session: Optional[requests.Session] = None) -> np.ndarray:
+    """
+    Stream ``url`` into memory as PCM. Containers that need seeking are
+    finished into a temporary file from the same response, not downloaded again.
+    """
+    with tempfile.TemporaryDirectory() as tmpdir:
+        return stream_audio(url, session, spool=Path(tmpdir) / "recording")
+
+
+def frame_rms(audio: np.ndarray, frame_samples: int = 160) -> np.ndarray:
+    """RMS energy of consecutive non-overlapping frames (10 ms at 16 kHz by default)."""
+    n = len(audio) // frame_samples
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[: n * frame_samples].reshape(n, frame_samples)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+
+def quietest_point(audio: np.ndarray, lo: int, hi: int, smooth_seconds: float = 0.3) -> int:
+    """Sample offset of the quietest (smoothed) 10 ms frame of ``audio[lo:hi]``."""
+    frame_samples = SAMPLE_RATE // 100
+    energy = frame_rms(audio[lo:hi], frame_samples)
+    if len(energy) == 0:
+        return hi
+    width = max(1, int(smooth_seconds * 100))
+    smoothed = np.convolve(energy, np.ones(width, dtype=np.float32) / width, mode="same")
+    return lo + int(np.argmin(smoothed)) * frame_samples
+
+
+def find_split_points(
+    audio: np.ndarray,
+    window_seconds: float,
+    search_seconds: float = 10.0,
+    smooth_seconds: float = 0.3,
+) -> list:
+    """
+    Sample offsets at which to cut ``audio`` into roughly ``window_seconds``
+    windows. Each cut is moved to the quietest moment within ``search_seconds``
+    of the nominal boundary, so words aren't split across windows.
+    """
+    frame_samples = SAMPLE_RATE // 100
+    energy = frame_rms(audio, frame_samples)
+    if len(energy) == 0:
+        return []
+    # Moving average so a cut lands in a pause rather than a single quiet frame
+    width = max(1, int(smooth_seconds * 100))
+    smoothed = np.convolve(energy, np.ones(width, dtype=np.float32) / width, mode="same")
+
+    window = int(window_seconds * 100)
+    search = int(search_seconds * 100)
+    cuts = []
+    previous = 0
+    target = window
+    while target < len(smoothed) - window // 4:
+        lo = max(previous + window // 2, target - search)
+        hi = min(len(smoothed), target + search)
+        if lo >= hi:
+            break
+        cut = lo + int(np.argmin(smoothed[lo:hi]))
+        cuts.append(cut * frame_samples)
+        previous = cut
+        target = cut + window
+    return cuts
@@ -0,0 +1,161 @@
+"""
+Pluggable transcription backends.
+
+Every backend takes a path or 16 kHz mono float32 samples and returns the dict
+``model.transcribe`` produces (``text``, ``segments`` with ``id``/``seek``/
+``start``/``end``/``text``/``tokens``/``temperature``/``avg_logprob``/
+``compression_ratio``/``no_speech_prob``, ``language``), so the pipeline,
+transcript cache and summariser never see which engine ran. Choose one with
+TRANSCRIBE_BACKEND:
+
+  whisper         openai-whisper on PyTorch, fp32 (default)
+  whisper-int8    the same model with its Linear layers dynamically quantised
+                  to int8 for CPU inference
+  faster-whisper  CTranslate2 engine (``pip install faster-whisper``); compute
+                  type from FASTER_WHISPER_COMPUTE_TYPE, int8 by default
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+import numpy as np
+
+DEFAULT_BACKEND = "whisper"
+FASTER_WHISPER_COMPUTE_TYPE = os.getenv("FASTER_WHISPER_COMPUTE_TYPE", "int8")
+
+
+class TranscriptionBackend:
+    """Loads ``model_name`` once; ``transcribe`` is safe to call repeatedly."""
+
+    name = ""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def transcribe(self, audio: Union[Path, str, np.ndarray]) -> dict:
+        raise NotImplementedError
+
+
+class WhisperBackend(TranscriptionBackend):
+    name = "whisper"
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        from .transcription import get_model
+        # fp32 weights stay in app.transcription's model registry, shared with other callers
+        get_model(model_name)
+
+    def transcribe(self, audio):
+        from .transcription import get_model
+        if not isinstance(audio, np.ndarray):
+            audio = str(audio)
+        return get_model(self.model_name).transcribe(audio)
+
+
+def quantize_whisper(model):
+    """Dynamically quantise a Whisper model's Linear layers to int8, in place."""
+    import torch
+    import whisper.model
+
+    # whisper.model.Linear only casts weights to the input dtype, which is a
+    # no-op on CPU; quantize_dynamic swaps exact nn.Linear types only
+    for module in model.modules():
+        if type(module) is whisper.model.Linear:
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class QuantizedWhisperBackend(TranscriptionBackend):
+    name = "whisper-int8"
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        import whisper
+        print(f"Loading Whisper model {model_name} (int8)")
+        # Loaded privately: quantisation rewrites the module tree of the model it is given
+        self.model = quantize_whisper(whisper.load_model(model_name, device="cpu"))
+
+    def transcribe(self, audio):
+        if not isinstance(audio, np.ndarray):
+            audio = str(audio)
+        return self.model.transcribe(audio, fp16=False)
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    name = "faster-whisper"
+
+    def __init__(self, model_name: str):
+        super().__init__(model_name)
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError("TRANSCRIBE_BACKEND=faster-whisper needs `pip install faster-whisper`") from e
+        print(f"Loading faster-whisper model {model_name} ({FASTER_WHISPER_COMPUTE_TYPE})")
+        self.model = WhisperModel(model_name, device="cpu", compute_type=FASTER_WHISPER_COMPUTE_TYPE)
+
+    def transcribe(self, audio):
+        if not isinstance(audio, np.ndarray):
+            audio = str(audio)
+        # Greedy decoding with temperature fallback, as openai-whisper does by default
+        segments, info = self.model.transcribe(audio, beam_size=1)
+        return to_whisper_result(segments, info.language)
+
+
+def to_whisper_result(segments, language) -> dict:
+    """Convert faster-whisper segments into the openai-whisper result dict."""
+    converted = []
+    for i, seg in enumerate(segments):
+        converted.append({
+            "id": i,
+            "seek": int(getattr(seg, "seek", 0)),
+            "start": float(seg.start),
+            "end": float(seg.end),
+            "text": seg.text,
+            "tokens": list(getattr(seg, "tokens", [])),
+            "temperature": float(getattr(seg, "temperature", 0.0) or 0.0),
+            "avg_logprob": float(seg.avg_logprob),
+            "compression_ratio": float(seg.compression_ratio),
+            "no_speech_prob": float(seg.no_speech_prob),
+        })
+    return {
+        "text": "".join(seg["text"] for seg in converted),
+        "segments": converted,
+        "language": language,
+    }
+
+
+BACKENDS = {
+    cls.name: cls for cls in (WhisperBackend, QuantizedWhisperBackend, FasterWhisperBackend)
+}
+
+# Loaded backends, keyed by (backend, model); each process builds a given one at most once
+_backends: Dict[Tuple[str, str], TranscriptionBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def backend_name() -> str:
+    return os.getenv("TRANSCRIBE_BACKEND", DEFAULT_BACKEND)
+
+
+def get_backend(model_name: str, name: str = None) -> TranscriptionBackend:
+    """Return the ``name`` backend (TRANSCRIBE_BACKEND by default) for ``model_name``."""
+    name = name or backend_name()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TRANSCRIBE_BACKEND {name!r}; expected one of {', '.join(BACKENDS)}")
+    key = (name, model_name)
+    backend = _backends.get(key)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(key)
+            if backend is None:
+                backend = BACKENDS[name](model_name)
+                _backends[key] = backend
+    return backend
+
+
+def model_tag(model_name: str, name: str = None) -> str:
+    """Identifies the engine that produced a transcript (part of the transcript cache key)."""
+    name = name or backend_name()
+    return model_name if name == DEFAULT_BACKEND else f"{model_name}@{name}"
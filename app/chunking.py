@@ -0,0 +1,115 @@
+"""
+Token-aware transcript chunking for summarisation.
+
+Transcripts are split only between Whisper segments (or between sentences, for
+transcripts stored as plain text) and packed greedily into chunks measured in
+the configured model's own tokens. The chunk budget is the model's context
+window less the prompt template and the reserved completion, so a refine
+summary takes as few (sequential) LLM calls as the model allows. map_reduce
+chunks are capped at MAP_CHUNK_TOKENS instead, so a meeting splits into
+several chunks that are summarised concurrently. SUMMARY_CHUNK_TOKENS sets the
+cap for both.
+"""
+
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Union
+
+SUMMARY_MAX_OUTPUT_TOKENS = int(os.getenv("SUMMARY_MAX_OUTPUT_TOKENS", "1024"))
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "0")) # 0: MAP_CHUNK_TOKENS for map_reduce, the context window for refine
+MAP_CHUNK_TOKENS = 4000  # about 20 minutes of speech: an hour-long meeting maps as ~4 concurrent calls
+MIN_CHUNK_TOKENS = 256
+
+# Longest matching prefix wins, so "gpt-4o-mini" resolves before "gpt-4"
+CONTEXT_WINDOWS = {
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4-1106": 128000,
+    "gpt-4-0125": 128000,
+    "gpt-4-32k": 32768,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+
+def context_window(model_name: str) -> int:
+    matches = [prefix for prefix in CONTEXT_WINDOWS if model_name.startswith(prefix)]
+    return CONTEXT_WINDOWS[max(matches, key=len)] if matches else DEFAULT_CONTEXT_WINDOW
+
+
+@lru_cache(maxsize=None)
+def get_encoder(model_name: str):
+    """The tiktoken encoding for ``model_name``, loaded once per model."""
+    import tiktoken
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # tiktoken downloads its BPE files on first use; offline, fall back to the
+        # GPT-2 vocabulary bundled with Whisper (counts run a little high)
+        print(f"Could not load the tokenizer for {model_name} ({e}); using Whisper's GPT-2 encoding")
+        from whisper.tokenizer import get_encoding
+        return get_encoding("gpt2")
+
+
+def count_tokens(text: str, model_name: str) -> int:
+    return len(get_encoder(model_name).encode_ordinary(text))
+
+
+def chunk_budget(model_name: str, overhead_tokens: int, concurrent: bool = False) -> int:
+    """
+    Transcript tokens per call, after the prompt template and the reserved
+    completion. ``concurrent`` chunks (map_reduce) default to MAP_CHUNK_TOKENS.
+    """
+    budget = context_window(model_name) - SUMMARY_MAX_OUTPUT_TOKENS - overhead_tokens
+    chunk_tokens = int(os.getenv("SUMMARY_CHUNK_TOKENS", SUMMARY_CHUNK_TOKENS)) or (MAP_CHUNK_TOKENS if concurrent else 0)
+    if chunk_tokens:
+        budget = min(budget, chunk_tokens)
+    return max(budget, MIN_CHUNK_TOKENS)
+
+
+def transcript_segments(transcript_path: Union[Path, str]) -> List[dict]:
+    """The transcript's segments, or one {"text": ...} per sentence if it has none."""
+    from .transcript_store import load_segments, load_text
+    segments = load_segments(transcript_path)
+    if not segments:
+        segments = [{"text": t} for t in re.findall(r"[^.!?]+[.!?]*\s*", load_text(transcript_path))]
+    return segments
+
+
+def transcript_pieces(transcript_path: Union[Path, str]) -> List[str]:
+    """The transcript's segment texts, or its sentences if it has no segments."""
+    return [seg["text"] for seg in transcript_segments(transcript_path)]
+
+
+def pack_chunks(pieces: Iterable[str], model_name: str, max_tokens: int) -> List[str]:
+    """
+    Greedily pack consecutive pieces into chunks of at most ``max_tokens``, which
+    gives the fewest chunks possible without splitting a piece. A single piece
+    over the budget is cut on token boundaries.
+    """
+    encoder = get_encoder(model_name)
+    pieces = [p for p in pieces if p.strip()]
+    chunks, current, size = [], [], 0
+    for piece, tokens in zip(pieces, encoder.encode_ordinary_batch(pieces)):
+        if current and size + len(tokens) > max_tokens:
+            chunks.append("".join(current).strip())
+            current, size = [], 0
+        if len(tokens) > max_tokens:
+            chunks.extend(encoder.decode(tokens[i:i + max_tokens]).strip()
+                          for i in range(0, len(tokens), max_tokens))
+            continue
+        current.append(piece)
+        size += len(tokens)
+    if current:
+        chunks.append("".join(current).strip())
+    return chunks
+
+
+def chunk_transcript(transcript_path: Union[Path, str], model_name: str, overhead_tokens: int = 0) -> List[str]:
+    return pack_chunks(transcript_pieces(transcript_path), model_name, chunk_budget(model_name, overhead_tokens))
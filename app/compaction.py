@@ -0,0 +1,122 @@
+"""
+Transcript compaction before summarisation.
+
+Whisper transcripts carry a lot that costs prompt tokens and adds nothing to a
+summary: disfluencies ("um", "you know", "kind of", stuttered words),
+back-channel segments ("yeah", "mm-hmm"), and the repeated segments Whisper
+hallucinates when it gets stuck in a loop. compact_segments() strips those in
+one pass over the segments (each is compared with the last few kept, so the
+cost is linear), and can also drop segments Whisper itself flagged as probably
+not speech or badly decoded, by no_speech_prob and avg_logprob.
+
+The transcript on disk is untouched; only the text sent to the LLM is compacted.
+"""
+
+import os
+import re
+from collections import deque
+from typing import List, Tuple
+
+SUMMARY_COMPACTION = os.getenv("SUMMARY_COMPACTION", "0") == "1"
+COMPACT_DROP_LOW_CONFIDENCE = os.getenv("COMPACT_DROP_LOW_CONFIDENCE", "0") == "1"
+# Whisper's own no-speech rule: both thresholds must be crossed
+COMPACT_MAX_NO_SPEECH_PROB = float(os.getenv("COMPACT_MAX_NO_SPEECH_PROB", "0.6"))
+COMPACT_MIN_AVG_LOGPROB = float(os.getenv("COMPACT_MIN_AVG_LOGPROB", "-1.0"))
+NEAR_DUPLICATE_WINDOW = 3
+NEAR_DUPLICATE_SIMILARITY = 0.8
+
+_INTERJECTIONS = r"(?:u+m+|u+h+|e+r+m*|a+h+|h+m+|m+h*m+|mm-hmm|uh-huh)"
+# A filler with the commas around it: "we, uh, decided" -> "we decided"
+_FILLER = re.compile(rf"(?:,\s*)?\b(?:{_INTERJECTIONS}|you know|i mean)\b(?:,|(?=[\s.!?]|$))", re.IGNORECASE)
+# "kind of" / "sort of" as a hedge, not as in "what kind of database"
+_HEDGE = re.compile(r"\b(\w+\s+)?(?:kind|sort) of\s+", re.IGNORECASE)
+_NOUN_KIND = {"a", "an", "the", "this", "that", "these", "those", "what", "which", "any", "some", "every",
+              "each", "no", "one", "same", "different", "other", "another", "whatever", "certain", "right", "wrong"}
+# Stuttered words ("the the"); "that that" and "had had" are often grammatical
+_STUTTER = re.compile(r"\b(?!(?:that|had)\b)(\w+)(?:\s+\1\b)+", re.IGNORECASE)
+_BACKCHANNEL = re.compile(
+    rf"^(?:(?:{_INTERJECTIONS}|yeah|yep|yup|okay|ok|right|sure|mhm|got it|i see|cool)[\s,.!?]*)+$",
+    re.IGNORECASE,
+)
+_SENTENCE = re.compile(r"[^.!?]+[.!?]*\s*")
+_WORD = re.compile(r"\w+")
+_SPACES = re.compile(r"\s{2,}")
+
+
+def _drop_hedge(match: re.Match) -> str:
+    before = match.group(1)
+    if before and before.strip().lower() in _NOUN_KIND:
+        return match.group(0)
+    return before or ""
+
+
+def remove_disfluencies(text: str) -> str:
+    """Strip filler words, hedges and stutters from one segment's text."""
+    original = text
+    text = _FILLER.sub("", text)
+    text = _HEDGE.sub(_drop_hedge, text)
+    text = _STUTTER.sub(r"\1", text)
+    # Collapse a sentence repeated back to back within the segment ("Thank you. Thank you.")
+    sentences, previous = [], None
+    for sentence in _SENTENCE.findall(text):
+        key = sentence.strip().lower()
+        if key != previous:
+            sentences.append(sentence)
+        previous = key
+    text = _SPACES.sub(" ", "".join(sentences)).strip()
+    # Keep the leading space Whisper puts on segments, so texts still join cleanly
+    return " " + text if text and original[:1].isspace() else text
+
+
+def _words(text: str) -> frozenset:
+    return frozenset(_WORD.findall(text.lower()))
+
+
+def _similar(a: frozenset, b: frozenset) -> bool:
+    if not a or not b:
+        return a == b
+    return len(a & b) / len(a | b) >= NEAR_DUPLICATE_SIMILARITY
+
+
+def _low_confidence(segment: dict) -> bool:
+    no_speech, logprob = segment.get("no_speech_prob"), segment.get("avg_logprob")
+    if no_speech is None or logprob is None:
+        return False
+    return no_speech > COMPACT_MAX_NO_SPEECH_PROB and logprob < COMPACT_MIN_AVG_LOGPROB
+
+
+def compact_segments(segments: List[dict], drop_low_confidence: bool = None) -> Tuple[List[dict], dict]:
+    """
+    Segments with disfluencies removed and back-channel, repeated and (optionally)
+    low-confidence segments dropped; returns them with counts of what was removed.
+    Each segment is compared with the last NEAR_DUPLICATE_WINDOW kept ones only.
+    """
+    if drop_low_confidence is None:
+        drop_low_confidence = os.getenv("COMPACT_DROP_LOW_CONFIDENCE", "1" if COMPACT_DROP_LOW_CONFIDENCE else "0") == "1"
+    stats = {"segments": len(segments), "low_confidence": 0, "backchannel": 0, "duplicates": 0}
+    kept, recent = [], deque(maxlen=NEAR_DUPLICATE_WINDOW)
+    for segment in segments:
+        if drop_low_confidence and _low_confidence(segment):
+            stats["low_confidence"] += 1
+            continue
+        raw = segment["text"].strip()
+        if not raw or _BACKCHANNEL.match(raw):
+            stats["backchannel"] += 1
+            continue
+        text = remove_disfluencies(segment["text"])
+        if not text.strip():
+            stats["backchannel"] += 1
+            continue
+        words = _words(text)
+        # Short phrases ("Thank you.") only count as repeats right after themselves
+        candidates = recent if len(words) >= 4 else list(recent)[-1:]
+        if any(_similar(words, other) for other in candidates):
+            stats["duplicates"] += 1
+            continue
+        recent.append(words)
+        kept.append(dict(segment, text=text))
+    return kept, stats
+
+
+def compaction_enabled() -> bool:
+    return os.getenv("SUMMARY_COMPACTION", "1" if SUMMARY_COMPACTION else "0") == "1"
@@ -0,0 +1,213 @@
+"""
+Parallel, resumable HTTP downloads for meeting recordings.
+
+Large files are split into HTTP Range requests fetched concurrently over a
+shared, connection-pooled ``requests.Session``. Progress is tracked in a
+``<dest>.part`` file plus a small JSON sidecar listing finished ranges, so a
+download interrupted halfway resumes where it stopped instead of restarting
+from byte zero. Servers that don't support ranges get a single stream.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DOWNLOAD_PART_SIZE = int(os.getenv("DOWNLOAD_PART_SIZE", str(16 * 1024 * 1024)))
+DOWNLOAD_CONCURRENCY = int(os.getenv("DOWNLOAD_CONCURRENCY", "4"))
+DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "3"))
+DOWNLOAD_TIMEOUT = 60
+CHUNK_BYTES = 1024 * 1024
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class DownloadError(Exception):
+    pass
+
+
+def get_session() -> requests.Session:
+    """Process-wide session so connections to Zoom/S3 are reused across downloads."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max(DOWNLOAD_CONCURRENCY * 2, 10))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def probe(url: str, session: requests.Session) -> Tuple[Optional[int], bool, str]:
+    """
+    Return (size, accepts_ranges, final_url). Redirects (Zoom hands out signed
+    storage URLs) are resolved once so every part hits the final location.
+    """
+    resp = session.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=DOWNLOAD_TIMEOUT)
+    try:
+        resp.raise_for_status()
+        final_url = resp.url
+        if resp.status_code == 206:
+            # Content-Range: bytes 0-0/12345
+            total = resp.headers.get("Content-Range", "").rpartition("/")[2]
+            return (int(total) if total.isdigit() else None), True, final_url
+        length = resp.headers.get("Content-Length")
+        return (int(length) if length and length.isdigit() else None), False, final_url
+    finally:
+        resp.close()
+
+
+def _split(size: int, part_size: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+
+
+class _Progress:
+    """Finished byte ranges, persisted next to the partial file."""
+
+    def __init__(self, path: Path, size: int, part_size: int):
+        self.path = path
+        self.size = size
+        self.part_size = part_size
+        self.done = set()
+        self._lock = threading.Lock()
+        if path.exists():
+            try:
+                state = json.loads(path.read_text())
+                if state.get("size") == size and state.get("part_size") == part_size:
+                    self.done = set(state.get("done", []))
+            except (ValueError, OSError):
+                pass
+
+    def mark(self, start: int):
+        with self._lock:
+            self.done.add(start)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(json.dumps({"size": self.size, "part_size": self.part_size, "done": sorted(self.done)}))
+            os.replace(tmp, self.path)
+
+
+def _fetch_range(url: str, session: requests.Session, fd: int, start: int, end: int):
+    resp = session.get(url, headers={"Range": f"bytes={start}-{end}"}, stream=True, timeout=DOWNLOAD_TIMEOUT)
+    try:
+        resp.raise_for_status()
+        if resp.status_code != 206:
+            raise DownloadError(f"Server ignored range {start}-{end} (HTTP {resp.status_code})")
+        offset = start
+        for chunk in resp.iter_content(CHUNK_BYTES):
+            os.pwrite(fd, chunk, offset)
+            offset += len(chunk)
+    finally:
+        resp.close()
+    if offset != end + 1:
+        raise DownloadError(f"Range {start}-{end} ended early at byte {offset}")
+
+
+def _with_retries(fn, *args):
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        try:
+            return fn(*args)
+        except (requests.RequestException, DownloadError):
+            if attempt == DOWNLOAD_RETRIES:
+                raise
+            time.sleep(min(2 ** attempt * 0.5, 10))
+
+
+def _download_ranged(url, session, part_path: Path, progress: _Progress, concurrency: int):
+    if not part_path.exists():
+        # The sidecar outlived its partial file: its finished ranges are gone
+        progress.done.clear()
+    fd = os.open(part_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        os.ftruncate(fd, progress.size)
+        todo = [r for r in _split(progress.size, progress.part_size) if r[0] not in progress.done]
+
+        def fetch(byte_range):
+            start, end = byte_range
+            _with_retries(_fetch_range, url, session, fd, start, end)
+            progress.mark(start)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            # list() re-raises the first failed part
+            list(pool.map(fetch, todo))
+    finally:
+        os.close(fd)
+    # The file was pre-sized, so its size proves nothing: every range must be recorded as finished
+    missing = [start for start, _ in _split(progress.size, progress.part_size) if start not in progress.done]
+    if missing:
+        raise DownloadError(f"{len(missing)} ranges of {url} were never downloaded, starting at byte {missing[0]}")
+
+
+def _download_stream(url, session, part_path: Path, accepts_ranges: bool, size: Optional[int]):
+    # Resume from the partial file if the server lets us
+    offset = part_path.stat().st_size if accepts_ranges and part_path.exists() else 0
+    if offset and offset == size:
+        # Finished before it was moved into place (or a retry after that): nothing left to fetch
+        return
+    if size is not None and offset > size:
+        # Not a prefix of this file: start over
+        offset = 0
+    resp = session.get(url, headers={"Range": f"bytes={offset}-"} if offset else {}, stream=True,
+                       timeout=DOWNLOAD_TIMEOUT)
+    if offset and resp.status_code == 416:
+        # The server says the partial file is not shorter than the file: start over
+        resp.close()
+        offset = 0
+        resp = session.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT)
+    try:
+        resp.raise_for_status()
+        if offset and resp.status_code != 206:
+            offset = 0
+        with open(part_path, "ab" if offset else "wb") as f:
+            for chunk in resp.iter_content(CHUNK_BYTES):
+                f.write(chunk)
+    finally:
+        resp.close()
+
+
+def download(
+    url: str,
+    dest: Path,
+    part_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+    session: Optional[requests.Session] = None,
+) -> int:
+    """
+    Download ``url`` to ``dest`` and return its size in bytes. Files of at least
+    two parts are fetched as concurrent ranges, and every range must be recorded
+    as finished; a single stream is size-checked. Only then is the file moved
+    into place. ``dest.part`` and its sidecar are kept on failure, so a later
+    call with the same ``dest`` resumes.
+    """
+    dest = Path(dest)
+    part_size = part_size or DOWNLOAD_PART_SIZE
+    concurrency = concurrency or DOWNLOAD_CONCURRENCY
+    session = session or get_session()
+    part_path = dest.with_name(dest.name + ".part")
+    state_path = dest.with_name(dest.name + ".part.json")
+
+    size, accepts_ranges, final_url = probe(url, session)
+    if accepts_ranges and size is not None and size >= 2 * part_size and concurrency > 1:
+        progress = _Progress(state_path, size, part_size)
+        _download_ranged(final_url, session, part_path, progress, concurrency)
+        actual = progress.size
+    else:
+        if state_path.exists():
+            # Leftover from a ranged attempt: the partial file has holes, start over
+            part_path.unlink(missing_ok=True)
+            state_path.unlink()
+        _with_retries(_download_stream, final_url, session, part_path, accepts_ranges, size)
+        actual = part_path.stat().st_size
+        if size is not None and actual != size:
+            raise DownloadError(f"Downloaded {actual} bytes from {url}, expected {size}")
+    os.replace(part_path, dest)
+    if state_path.exists():
+        state_path.unlink()
+    return actual
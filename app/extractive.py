@@ -0,0 +1,166 @@
+"""
+Extractive meeting summaries, computed locally with no LLM call.
+
+The transcript's sentences are ranked with TextRank over TF-IDF vectors: a
+sentence scores highly when it shares vocabulary with many other sentences,
+so the ranking favours what the meeting kept coming back to. Sentences that
+sound like decisions ("we decided", "going with") get a boost, and the top
+five that don't repeat each other become the Key Decisions, in the order they
+were said. Action items are sentences matching commitment or request phrasing
+("I'll", "we need to", "can you"), with an owner when a name is attached.
+
+Everything is NumPy over the sentence/term matrix. Only terms that occur in
+two or more sentences can make sentences similar, so the matrix keeps just
+those columns, and the power iteration multiplies by it instead of building
+the sentence-by-sentence similarity matrix: time and memory stay linear in
+the transcript's length.
+
+The output has the same Key Decisions / Action Items layout as the LLM
+summaries, so publishing and search treat both alike.
+"""
+
+import re
+from typing import List, Optional
+
+import numpy as np
+
+from .compaction import compact_segments
+
+KEY_POINTS = 5
+MAX_ACTION_ITEMS = 10
+MIN_SENTENCE_WORDS = 6
+DAMPING = 0.85
+REDUNDANCY_SIMILARITY = 0.5
+DECISION_BOOST = 0.5
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further get got had has have having he her
+here hers him his how i if in into is it its itself just kind know like lot me more most my no nor not now of off
+on once only or other our ours out over own really right same she should so some sort such than that the their
+them then there these they thing things think this those through to too um uh under until up us very was we well
+were what when where which while who whom why will with would yeah yes you your going gonna want wanna okay ok
+""".split())
+
+_SENTENCE = re.compile(r"[^.!?]+[.!?]*")
+_TERM = re.compile(r"[a-z][a-z'-]+")
+_DECISION = re.compile(
+    r"\b(?:decided|decision|agreed|agree on|going (?:to go )?with|go with|settled on|plan is|the plan|tactic|"
+    r"approved|chose|choose|we'll use|we will use|moving forward|from now on|final(?:ly|ized)?)\b",
+    re.IGNORECASE,
+)
+_ACTION = re.compile(
+    r"\b(?:i'll|i will|we'll|we will|you'll|(?:need|needs|have|has) to (?!be\b)|let's|action items?|to-?do|"
+    r"follow up|make sure|can you|could you|please|will (?:send|share|set up|schedule|write|update|review|check|"
+    r"reach out|draft|prepare|create|look into)|by (?:monday|tuesday|wednesday|thursday|friday|tomorrow|"
+    r"next week|end of (?:the )?(?:day|week)|eod|eow))\b",
+    re.IGNORECASE,
+)
+# "Sarah will ...", "Sarah, can you ...", "Sarah is going to ..."
+_OWNER = re.compile(r"\b([A-Z][a-z]+),? (?:will|is going to|can you|could you|needs to|to take)\b")
+_NOT_NAMES = STOPWORDS | {"so", "and", "but", "then", "maybe", "who", "someone", "somebody", "everyone", "anyone"}
+
+
+def sentences(segments: List[dict]) -> List[str]:
+    """The transcript's sentences, after dropping back-channel and repeated segments and disfluencies."""
+    kept, _ = compact_segments(segments, drop_low_confidence=False)
+    text = "".join(seg["text"] for seg in kept)
+    return [s.strip() for s in _SENTENCE.findall(text) if s.strip()]
+
+
+def _tfidf(texts: List[str]) -> np.ndarray:
+    """L2-normalised TF-IDF rows, restricted to the terms that occur in at least two sentences."""
+    terms = [[t for t in _TERM.findall(s.lower()) if t not in STOPWORDS] for s in texts]
+    vocabulary = {}
+    rows = np.fromiter((i for i, ts in enumerate(terms) for _ in ts), dtype=np.int64)
+    cols = np.fromiter((vocabulary.setdefault(t, len(vocabulary)) for ts in terms for t in ts), dtype=np.int64)
+    n, n_terms = len(texts), len(vocabulary)
+    if not n_terms:
+        return np.zeros((n, 0), dtype=np.float32)
+    # Unique (sentence, term) pairs with their counts
+    pairs, counts = np.unique(rows * n_terms + cols, return_counts=True)
+    rows, cols = pairs // n_terms, pairs % n_terms
+    df = np.bincount(cols, minlength=n_terms)
+    weights = (1 + np.log(counts)) * (np.log((1 + n) / (1 + df[cols])) + 1)
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n))
+    shared = df[cols] > 1
+    columns = np.cumsum(df > 1) - 1
+    matrix = np.zeros((n, int((df > 1).sum())), dtype=np.float32)
+    matrix[rows[shared], columns[cols[shared]]] = weights[shared] / norms[rows[shared]]
+    return matrix
+
+
+def textrank(matrix: np.ndarray, iterations: int = 100, tolerance: float = 1e-6) -> np.ndarray:
+    """TextRank scores for the sentences whose normalised TF-IDF vectors are ``matrix``'s rows."""
+    n = matrix.shape[0]
+    self_similarity = (matrix * matrix).sum(axis=1)
+    # W = M M^T without the diagonal, applied without building it
+    weigh = lambda v: matrix @ (matrix.T @ v) - self_similarity * v
+    degree = weigh(np.ones(n, dtype=np.float32))
+    dangling = degree <= 1e-9
+    degree[dangling] = 1
+    scores = np.full(n, 1 / n, dtype=np.float32)
+    for _ in range(iterations):
+        spread = weigh(np.where(dangling, 0, scores / degree))
+        updated = (1 - DAMPING) / n + DAMPING * (spread + scores[dangling].sum() / n)
+        if np.abs(updated - scores).sum() < tolerance:
+            return updated
+        scores = updated
+    return scores
+
+
+def key_points(texts: List[str], limit: int = KEY_POINTS) -> List[str]:
+    """The top ``limit`` sentences by TextRank (decisions boosted), skipping near-repeats, in spoken order."""
+    # Action items are listed separately unless they also state a decision
+    candidates = [i for i, s in enumerate(texts) if len(s.split()) >= MIN_SENTENCE_WORDS
+                  and (_DECISION.search(s) or not _ACTION.search(s))] or list(range(len(texts)))
+    if not candidates:
+        return []
+    matrix = _tfidf([texts[i] for i in candidates])
+    scores = textrank(matrix)
+    scores *= 1 + DECISION_BOOST * np.array([bool(_DECISION.search(texts[i])) for i in candidates])
+    chosen = []
+    for position in np.argsort(-scores, kind="stable"):
+        if chosen and (matrix[chosen] @ matrix[position]).max() >= REDUNDANCY_SIMILARITY:
+            continue
+        chosen.append(position)
+        if len(chosen) == limit:
+            break
+    return [texts[candidates[p]] for p in sorted(chosen)]
+
+
+def _capitalize(text: str) -> str:
+    return text[:1].upper() + text[1:]
+
+
+def _owner(sentence: str) -> Optional[str]:
+    for match in _OWNER.finditer(sentence):
+        if match.group(1).lower() not in _NOT_NAMES:
+            return match.group(1)
+    return None
+
+
+def action_items(texts: List[str], limit: int = MAX_ACTION_ITEMS) -> List[str]:
+    """Sentences phrased as commitments or requests, as "Owner: sentence" when a name is attached."""
+    items, seen = [], set()
+    for sentence in texts:
+        if not _ACTION.search(sentence) or sentence.lower() in seen:
+            continue
+        seen.add(sentence.lower())
+        owner = _owner(sentence)
+        if owner and sentence.startswith(owner + ","):
+            sentence = _capitalize(sentence[len(owner) + 1:].strip())
+        items.append(f"{owner}: {sentence}" if owner else sentence)
+        if len(items) == limit:
+            break
+    return items
+
+
+def summarize_segments(segments: List[dict]) -> str:
+    """A Key Decisions / Action Items summary of Whisper segments, without an LLM."""
+    texts = [_capitalize(s) for s in sentences(segments)]
+    points = key_points(texts)
+    points += ["(No other decisions noted)"] * (KEY_POINTS - len(points))
+    actions = action_items(texts) or ["(No action items noted)"]
+    return ("**Key Decisions (5 bullet points):**\n" + "\n".join(f"- {p}" for p in points)
+            + "\n\n**Action Items:**\n" + "\n".join(f"- {a}" for a in actions))
@@ -0,0 +1,163 @@
+"""
+Recording ingestion off the event loop, with group commits.
+
+The Zoom webhook is an async endpoint; a synchronous insert and commit in it
+stalls every other request while SQLite (or Postgres) writes. Instead the
+endpoint hands the row to RecordingWriter and awaits the result
+(asyncio.wrap_future), so it still only answers once the row is stored.
+
+A single writer thread inserts whatever has queued up while its previous
+commit was running, in one transaction: under load many webhooks share a
+commit, and when idle a row is written as soon as it arrives. The queue is
+bounded at INGEST_QUEUE_SIZE; when it is full submit() raises QueueFull and
+the endpoint answers 503 with Retry-After, which Zoom retries, instead of
+piling up requests in memory.
+
+Zoom redelivers events it thinks failed and may report a recording more than
+once, so ingestion is idempotent. Rows are inserted with ON CONFLICT DO
+NOTHING against the unique (platform, meeting_id, recording_file_id) index,
+on SQLite and Postgres alike, and a duplicate resolves to None instead of an
+id. In front of that, RecentEvents remembers the events stored lately, so a
+hot retry is answered without a database round trip.
+"""
+
+import os
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+from .models import Recording
+
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "1000"))
+INGEST_BATCH = int(os.getenv("INGEST_BATCH", "200"))                        # rows per commit, at most
+INGEST_RETRY_AFTER_SECONDS = int(os.getenv("INGEST_RETRY_AFTER_SECONDS", "5"))  # sent with 503s
+INGEST_RECENT_EVENTS = int(os.getenv("INGEST_RECENT_EVENTS", "10000"))      # event keys remembered for retries
+
+
+class QueueFull(Exception):
+    """The writer is behind; the caller should ask the client to retry later."""
+
+
+class RecentEvents:
+    """LRU set of recently stored event keys. Used from the event loop only, so it takes no lock."""
+
+    def __init__(self, maxsize: int = None):
+        self.maxsize = maxsize or INGEST_RECENT_EVENTS
+        self._keys: "OrderedDict[str, None]" = OrderedDict()
+
+    def __contains__(self, key: str) -> bool:
+        if key not in self._keys:
+            return False
+        self._keys.move_to_end(key)
+        return True
+
+    def add(self, key: str):
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+        if len(self._keys) > self.maxsize:
+            self._keys.popitem(last=False)
+
+    def clear(self):
+        self._keys.clear()
+
+
+def insert_new(dialect_name: str):
+    """INSERT of one recording that does nothing if the recording file is already stored; returns its id if not."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return (
+        insert(Recording)
+        .on_conflict_do_nothing(index_elements=[Recording.platform, Recording.meeting_id, Recording.recording_file_id])
+        .returning(Recording.id)
+    )
+
+
+class RecordingWriter:
+    """Inserts recordings on a background thread, committing queued rows together."""
+
+    def __init__(self, session_factory: Callable = None, maxsize: int = None, batch: int = None):
+        self.session_factory = session_factory
+        self.batch = batch or INGEST_BATCH
+        self._queue: "queue.Queue[Optional[Tuple[dict, Future]]]" = queue.Queue(maxsize or INGEST_QUEUE_SIZE)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def submit(self, row: dict) -> Future:
+        """Queue a Recording's columns; the future resolves to its id once committed, or None for a duplicate."""
+        self._ensure_started()
+        future: Future = Future()
+        try:
+            self._queue.put_nowait((row, future))
+        except queue.Full:
+            raise QueueFull(f"{self._queue.maxsize} recordings already waiting to be written")
+        return future
+
+    def _ensure_started(self):
+        # Started on first use, so apps and test clients that never run the lifespan still work
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="recording-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        """Write what is queued, then stop the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            items = [item]
+            stop = False
+            while len(items) < self.batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                items.append(item)
+            self._write(items)
+            if stop:
+                return
+
+    def _session(self):
+        if self.session_factory is not None:
+            return self.session_factory()
+        from .db import SessionLocal
+        return SessionLocal()
+
+    def _write(self, items: List[Tuple[dict, Future]]):
+        db = self._session()
+        try:
+            # One statement per row, so each gets its own id or None; they still share the commit
+            statement = insert_new(db.get_bind().dialect.name)
+            ids = [db.execute(statement.values(**row)).scalar() for row, _ in items]
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            error = e
+        else:
+            error = None
+        finally:
+            db.close()
+        if error is None:
+            for recording_id, (_, future) in zip(ids, items):
+                future.set_result(recording_id)
+        elif len(items) > 1:
+            # One bad row shouldn't fail the rest of the batch
+            for item in items:
+                self._write([item])
+        else:
+            print(f"Failed to store recording: {error}")
+            items[0][1].set_exception(error)
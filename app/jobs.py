@@ -0,0 +1,206 @@
+"""
+Multi-worker safe job claiming for recordings.
+
+Workers claim recordings by taking a time-limited lease on them. A claim is a
+single UPDATE whose row selection uses ``FOR UPDATE SKIP LOCKED`` on Postgres,
+so concurrent workers never block on or double-claim the same row. SQLite does
+not render the locking clause, but it serialises writers and a single UPDATE
+statement is atomic there, which gives the same guarantee. Leases that expire
+(crashed or stuck worker) become claimable again.
+
+Recordings that are done but whose summary failed are leased the same way by
+the catch-up loop (claim_summaries), with their own attempt counter, so two
+workers never summarise the same recording and a summary that keeps failing
+is given up after SUMMARY_MAX_ATTEMPTS. An on-demand summary (the streaming
+endpoint) takes the same lease on one recording with claim_summary.
+"""
+
+import datetime
+import os
+import socket
+from typing import List, Optional
+
+from sqlalchemy import and_, case, or_, select, update
+from sqlalchemy.orm import Session
+
+from .models import Recording
+
+JOB_PENDING = "pending"
+JOB_PROCESSING = "processing"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "3600"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+SUMMARY_MAX_ATTEMPTS = int(os.getenv("SUMMARY_MAX_ATTEMPTS", "5"))  # catch-up summaries, per recording
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.utcnow()
+
+
+def _claimable(now: datetime.datetime):
+    return or_(
+        Recording.status == JOB_PENDING,
+        and_(Recording.status == JOB_PROCESSING, Recording.lease_expires_at < now),
+    )
+
+
+def _claim(db: Session, worker_id: str, claimable, values: dict, limit: int,
+           lease_seconds: Optional[int]) -> List[Recording]:
+    now = _utcnow()
+    expires = now + datetime.timedelta(seconds=lease_seconds or JOB_LEASE_SECONDS)
+    candidates = (
+        select(Recording.id)
+        .where(claimable(now))
+        .order_by(Recording.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    db.execute(
+        update(Recording)
+        .where(Recording.id.in_(candidates))
+        .values(lease_owner=worker_id, lease_expires_at=expires, **values)
+        .execution_options(synchronize_session=False)
+    )
+    # The lease expiry is unique to this claim, which identifies the rows we just took
+    claimed = (
+        db.query(Recording)
+        .filter(Recording.lease_owner == worker_id, Recording.lease_expires_at == expires)
+        .order_by(Recording.id)
+        .all()
+    )
+    db.commit()
+    return claimed
+
+
+def claim_jobs(db: Session, worker_id: str, limit: int = 1, lease_seconds: Optional[int] = None) -> List[Recording]:
+    """
+    Atomically lease up to ``limit`` claimable recordings to ``worker_id`` and
+    return them. Commits the session.
+    """
+    return _claim(db, worker_id, _claimable, {"status": JOB_PROCESSING, "attempts": Recording.attempts + 1},
+                  limit, lease_seconds)
+
+
+def _summary_claimable(now: datetime.datetime):
+    return and_(
+        Recording.status == JOB_DONE,
+        Recording.transcript_fetched == True,
+        Recording.transcript_path != None,  # nothing to summarise; claiming it would only use up attempts
+        Recording.summary == None,
+        Recording.summary_attempts < SUMMARY_MAX_ATTEMPTS,
+        or_(Recording.lease_expires_at == None, Recording.lease_expires_at < now),
+    )
+
+
+def claim_summaries(db: Session, worker_id: str, limit: int = 1,
+                    lease_seconds: Optional[int] = None) -> List[Recording]:
+    """
+    Lease up to ``limit`` transcribed recordings still missing a summary, for
+    the catch-up loop. Recordings a pipeline worker still holds are skipped.
+    Commits the session.
+    """
+    return _claim(db, worker_id, _summary_claimable, {"summary_attempts": Recording.summary_attempts + 1},
+                  limit, lease_seconds)
+
+
+def claim_summary(db: Session, recording_id: int, worker_id: str, regenerate: bool = False,
+                  lease_seconds: Optional[int] = None) -> bool:
+    """
+    Lease one transcribed recording to summarise it now. Fails if another
+    worker holds it, or if it already has a summary and ``regenerate`` is not
+    set. End the lease with release_summary. Commits the session.
+    """
+    now = _utcnow()
+    conditions = [
+        Recording.id == recording_id,
+        Recording.status == JOB_DONE,
+        Recording.transcript_path != None,
+        or_(Recording.lease_expires_at == None, Recording.lease_expires_at < now),
+    ]
+    if not regenerate:
+        conditions.append(Recording.summary == None)
+    rows = (
+        db.query(Recording)
+        .filter(*conditions)
+        .update(
+            {
+                "lease_owner": worker_id,
+                "lease_expires_at": now + datetime.timedelta(seconds=lease_seconds or JOB_LEASE_SECONDS),
+                "summary_attempts": Recording.summary_attempts + 1,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return rows == 1
+
+
+def release_summary(db: Session, recording_id: int, worker_id: str, count_attempt: bool = True) -> bool:
+    """
+    End a claim_summaries lease. Without ``count_attempt`` the attempt is given
+    back, for failures that say nothing about the recording (the budget was spent).
+    """
+    values = {"lease_owner": None, "lease_expires_at": None}
+    if not count_attempt:
+        values["summary_attempts"] = Recording.summary_attempts - 1
+    rows = (
+        db.query(Recording)
+        .filter(Recording.id == recording_id, Recording.lease_owner == worker_id, Recording.status == JOB_DONE)
+        .update(values, synchronize_session=False)
+    )
+    db.commit()
+    return rows == 1
+
+
+def renew_lease(db: Session, recording_id: int, worker_id: str, lease_seconds: Optional[int] = None) -> bool:
+    """Extend a lease still held by ``worker_id``. Returns False if it was lost."""
+    expires = _utcnow() + datetime.timedelta(seconds=lease_seconds or JOB_LEASE_SECONDS)
+    rows = (
+        db.query(Recording)
+        .filter(Recording.id == recording_id, Recording.lease_owner == worker_id, Recording.status == JOB_PROCESSING)
+        .update({"lease_expires_at": expires}, synchronize_session=False)
+    )
+    db.commit()
+    return rows == 1
+
+
+def complete_job(db: Session, recording_id: int, worker_id: str) -> bool:
+    """Mark a leased recording done. A worker whose lease was reclaimed is ignored."""
+    rows = (
+        db.query(Recording)
+        .filter(Recording.id == recording_id, Recording.lease_owner == worker_id, Recording.status == JOB_PROCESSING)
+        .update(
+            {"status": JOB_DONE, "lease_owner": None, "lease_expires_at": None, "last_error": None},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return rows == 1
+
+
+def fail_job(db: Session, recording_id: int, worker_id: str, error: str) -> bool:
+    """
+    Release a leased recording after an error. It goes back to pending until it
+    has used up JOB_MAX_ATTEMPTS, then stays failed.
+    """
+    rows = (
+        db.query(Recording)
+        .filter(Recording.id == recording_id, Recording.lease_owner == worker_id, Recording.status == JOB_PROCESSING)
+        .update(
+            {
+                "status": case((Recording.attempts >= JOB_MAX_ATTEMPTS, JOB_FAILED), else_=JOB_PENDING),
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "last_error": error,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return rows == 1
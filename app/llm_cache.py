@@ -0,0 +1,197 @@
+"""
+Persistent cache of LLM responses for summarisation.
+
+Every chat call LangChain makes for a summary (each chunk of a refine chain,
+each map and reduce call) is looked up here first, so re-summarising a
+recording (the catch-up loop, a manual re-run) only pays for calls whose
+prompt changed. Entries are keyed by a hash of the model parameters (model
+name, temperature, max tokens, ...) and of the full prompt (template plus
+transcript text), and live in the ``llm_cache`` table so every worker shares
+them. Entries expire after LLM_CACHE_TTL_HOURS, and the least recently used
+are evicted once the cache holds more than LLM_CACHE_MAX_MB. Inserts don't
+measure the table: each process keeps a running total from the last eviction
+pass plus what it has inserted since, and runs a pass when that total is over
+the limit or every LLM_CACHE_EVICT_EVERY inserts (which also catches other
+workers' inserts and expired entries).
+"""
+
+import contextvars
+import datetime
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.outputs import Generation
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+
+from .models import LLMCacheEntry
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "100"))
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", str(30 * 24)))
+LLM_CACHE_EVICT_EVERY = int(os.getenv("LLM_CACHE_EVICT_EVERY", "100"))  # inserts between eviction passes, at most
+
+
+class _Usage:
+    """This process's estimate of the cache size: bytes at the last eviction pass plus its inserts since."""
+
+    def __init__(self):
+        self.bytes: Optional[int] = None  # unknown until the first pass
+        self.inserts = 0
+
+
+# One estimate per database (session factory), shared by every LLMCache on it
+_usage: Dict[Any, _Usage] = {}
+_usage_lock = threading.Lock()
+
+
+class CacheStats:
+    """Hits seen while tracking (see track_hits); shared by the threads of one summary."""
+
+    def __init__(self):
+        self.hits = 0
+        self.tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, tokens: int):
+        with self._lock:
+            self.hits += 1
+            self.tokens += tokens
+
+
+# Runnable.batch copies the caller's context into its threads, so map_reduce
+# calls report to the same CacheStats as the summary that made them
+_stats: contextvars.ContextVar[Optional[CacheStats]] = contextvars.ContextVar("llm_cache_stats", default=None)
+
+
+@contextmanager
+def track_hits():
+    """Count cache hits (and the tokens they saved) inside the block, like get_openai_callback."""
+    stats = CacheStats()
+    token = _stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats.reset(token)
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+def _dumps(generations: Sequence[Generation]) -> str:
+    from langchain_core.load import dumps
+    return json.dumps([dumps(g) for g in generations])
+
+
+def _loads(value: str) -> list:
+    from langchain_core.load import loads
+    return [loads(g) for g in json.loads(value)]
+
+
+class LLMCache(BaseCache):
+    """LangChain cache backed by the llm_cache table; pass as ChatOpenAI(cache=...)."""
+
+    def __init__(self, session_factory, model_name: str, max_bytes: int = None, ttl: datetime.timedelta = None):
+        self.session_factory = session_factory
+        self.model_name = model_name
+        self.max_bytes = max_bytes if max_bytes is not None else int(LLM_CACHE_MAX_MB * 1024 * 1024)
+        self.ttl = ttl if ttl is not None else datetime.timedelta(hours=LLM_CACHE_TTL_HOURS)
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[list]:
+        key = cache_key(prompt, llm_string)
+        now = datetime.datetime.utcnow()
+        db = self.session_factory()
+        try:
+            entry = db.get(LLMCacheEntry, key)
+            if entry is None:
+                return None
+            if entry.created_at < now - self.ttl:
+                db.delete(entry)
+                db.commit()
+                return None
+            generations = _loads(entry.value)
+            entry.last_used_at = now
+            db.commit()
+            stats = _stats.get()
+            if stats is not None:
+                stats.record(entry.tokens)
+            return generations
+        except Exception as e:
+            # A broken cache costs money, not correctness: fall through to the API
+            print(f"LLM cache lookup failed: {e}")
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        from .chunking import count_tokens
+        value = _dumps(return_val)
+        tokens = count_tokens(prompt, self.model_name) + sum(count_tokens(g.text, self.model_name) for g in return_val)
+        db = self.session_factory()
+        try:
+            db.merge(LLMCacheEntry(
+                key=cache_key(prompt, llm_string), model=self.model_name, value=value,
+                size=len(value.encode("utf-8")), tokens=tokens,
+                created_at=datetime.datetime.utcnow(), last_used_at=datetime.datetime.utcnow(),
+            ))
+            db.commit()
+            if self._eviction_due(len(value.encode("utf-8"))):
+                self._evict(db)
+        except IntegrityError:
+            db.rollback()  # another worker cached the same call first
+        except Exception as e:
+            print(f"LLM cache update failed: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _eviction_due(self, size: int) -> bool:
+        with _usage_lock:
+            usage = _usage.setdefault(self.session_factory, _Usage())
+            usage.inserts += 1
+            if usage.bytes is not None:
+                usage.bytes += size
+            due = usage.bytes is None or usage.bytes > self.max_bytes or usage.inserts >= LLM_CACHE_EVICT_EVERY
+            if due:
+                usage.inserts = 0
+            return due
+
+    def _evict(self, db):
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.created_at < datetime.datetime.utcnow() - self.ttl))
+        remaining = db.scalar(select(func.coalesce(func.sum(LLMCacheEntry.size), 0))) or 0
+        if remaining > self.max_bytes:
+            victims = []
+            for key, size in db.execute(select(LLMCacheEntry.key, LLMCacheEntry.size).order_by(LLMCacheEntry.last_used_at)):
+                if remaining <= self.max_bytes:
+                    break
+                victims.append(key)
+                remaining -= size
+            db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(victims)))
+        db.commit()
+        with _usage_lock:
+            _usage.setdefault(self.session_factory, _Usage()).bytes = remaining
+
+    def clear(self, **kwargs: Any) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(delete(LLMCacheEntry))
+            db.commit()
+            with _usage_lock:
+                _usage.setdefault(self.session_factory, _Usage()).bytes = 0
+        finally:
+            db.close()
+
+
+def get_llm_cache(session_factory, model_name: str) -> Optional[LLMCache]:
+    """The cache to give the chat model, or None when LLM_CACHE_ENABLED=0."""
+    if os.getenv("LLM_CACHE_ENABLED", "1" if LLM_CACHE_ENABLED else "0") != "1":
+        return None
+    return LLMCache(session_factory, model_name)
@@ -1,16 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+import asyncio
 import os
 import hmac
 import hashlib
-from fastapi import Request, HTTPException, Header
+import json
+from fastapi import Request, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
 from .db import engine, SessionLocal, Base
+from .ingest import INGEST_RETRY_AFTER_SECONDS, QueueFull, RecentEvents, RecordingWriter
 from .models import Recording
+from .search import search
 # from .tasks import register_tasks
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI()
+# Read once at startup rather than on every webhook
+ZOOM_SIGNING_SECRET = (os.getenv("ZOOM_SIGNING_SECRET") or "").encode()
+ZOOM_VERIFICATION_TOKEN = os.getenv("ZOOM_VERIFICATION_TOKEN")
+
+recording_writer = RecordingWriter()
+recent_events = RecentEvents()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Recordings still queued are written before the process exits
+    recording_writer.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 Base.metadata.create_all(bind=engine)
 # register_tasks(app)  # Google Meet polling disabled since integration is deferred
 
@@ -26,23 +47,81 @@ async def health():
 async def zoom_webhook(request: Request, authorization: str = Header(None)):
     payload = await request.body()
     # Verify HMAC signature using signing secret
-    secret = os.getenv("ZOOM_SIGNING_SECRET").encode()
+    if not ZOOM_SIGNING_SECRET:
+        raise HTTPException(status_code=500, detail="ZOOM_SIGNING_SECRET is not configured")
     raw_sig = authorization or ""
     # Strip 'sha256=' prefix if present
     header_sig = raw_sig.split("=", 1)[1] if raw_sig.startswith("sha256=") else raw_sig
-    computed_sig = hmac.new(secret, payload, hashlib.sha256).hexdigest()
+    computed_sig = hmac.new(ZOOM_SIGNING_SECRET, payload, hashlib.sha256).hexdigest()
     if not hmac.compare_digest(computed_sig, header_sig):
         raise HTTPException(status_code=401, detail="Invalid signature")
-    data = await request.json()
+    # A redelivered event has the same body, so its signature identifies it
+    if computed_sig in recent_events:
+        return {"status": "duplicate"}
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid JSON")
     # Verify verification token
-    if data.get("meta", {}).get("token") != os.getenv("ZOOM_VERIFICATION_TOKEN"):
+    if data.get("meta", {}).get("token") != ZOOM_VERIFICATION_TOKEN:
         raise HTTPException(status_code=401, detail="Invalid verification token")
-    url = data["payload"]["object"]["download_url"]
-    meeting_id = data["payload"]["object"]["uuid"]
+    meeting = data["payload"]["object"]
+    meeting_id = meeting["uuid"]
+    # The meeting's MP4 file when the event lists its files, else the event's own download_url
+    mp4 = next((f for f in meeting.get("recording_files", []) if f.get("file_type") == "MP4"), None)
+    url = mp4["download_url"] if mp4 else meeting["download_url"]
+    file_id = (mp4 or {}).get("id", "")
 
-    db = SessionLocal()
-    rec = Recording(platform="zoom", meeting_id=meeting_id, recording_url=url)
-    db.add(rec)
-    db.commit()
-    db.close()
+    # Written by the background writer (app/ingest.py) so the event loop never waits on the database
+    try:
+        stored = recording_writer.submit({"platform": "zoom", "meeting_id": meeting_id, "recording_url": url,
+                                          "recording_file_id": file_id})
+    except QueueFull:
+        raise HTTPException(status_code=503, detail="Too many recordings waiting to be stored",
+                            headers={"Retry-After": str(INGEST_RETRY_AFTER_SECONDS)})
+    recording_id = await asyncio.wrap_future(stored)
+    recent_events.add(computed_sig)
+    if recording_id is None:
+        # Already stored and queued for processing
+        return {"status": "duplicate"}
     return {"status": "ok"}
+
+
+@app.get("/search")
+def search_recordings(
+    q: str = Query(..., min_length=1, description="Words that must all appear in one passage"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+):
+    # Plain def: the query is blocking database work, so FastAPI runs it in its threadpool
+    db = SessionLocal()
+    try:
+        return search(db, q, page, page_size)
+    finally:
+        db.close()
+
+
+@app.post("/recordings/{recording_id}/summary/stream")
+def stream_summary(recording_id: int, regenerate: bool = Query(False, description="Replace an existing summary")):
+    # Summarises an already-transcribed recording on demand; tokens arrive as server-sent events
+    import uuid
+    from .jobs import claim_summary, default_worker_id
+    from .summary_stream import summary_events
+    db = SessionLocal()
+    try:
+        rec = db.get(Recording, recording_id)
+        if rec is None:
+            raise HTTPException(status_code=404, detail="Recording not found")
+        if not rec.transcript_path:
+            raise HTTPException(status_code=409, detail="Recording has not been transcribed yet")
+        if rec.summary is not None and not regenerate:
+            raise HTTPException(status_code=409, detail="Recording already has a summary; pass regenerate=true to replace it")
+        # Leased like a catch-up summary, so no worker summarises it at the same time; the stream releases it
+        worker_id = f"{default_worker_id()}:stream-{uuid.uuid4().hex[:8]}"
+        if not claim_summary(db, recording_id, worker_id, regenerate):
+            raise HTTPException(status_code=409, detail="Recording is being processed by another worker")
+        transcript_path = rec.transcript_path
+    finally:
+        db.close()
+    return StreamingResponse(summary_events(recording_id, transcript_path, worker_id), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -0,0 +1,147 @@
+"""
+Long-lived Whisper model server.
+
+Loads the model once per host and serves transcription requests from worker
+processes over a local socket, so new workers start instantly instead of each
+reading the weights from disk. Start it with
+
+    python -m app.model_server
+
+and point workers at it with WHISPER_SERVER_ADDRESS (a Unix socket path, or
+host:port for TCP). Requests are served one at a time: PyTorch already uses
+every core for a single transcription.
+
+Connections carry pickles, so the shared WHISPER_SERVER_AUTHKEY is what keeps
+strangers from running code on the server: it is required for TCP, where
+anyone who can reach the port could otherwise connect. The server only reads
+audio files under AUDIO_DIR; anything else must be sent as samples.
+"""
+
+import os
+import threading
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+
+DEFAULT_ADDRESS = "/tmp/meetmate-whisper.sock"
+
+
+def parse_address(address: str):
+    """'/path/to.sock' or 'unix:/path' → socket path; 'host:port' → (host, port)."""
+    if address.startswith("unix:"):
+        return address[len("unix:"):]
+    if address.startswith("/") or address.startswith("."):
+        return address
+    host, _, port = address.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def _authkey(address) -> bytes:
+    key = os.getenv("WHISPER_SERVER_AUTHKEY")
+    if key:
+        return key.encode()
+    if not isinstance(address, str):
+        raise ValueError("WHISPER_SERVER_AUTHKEY must be set to use the model server over TCP")
+    # A Unix socket is only reachable through the filesystem
+    return b"meetmate"
+
+
+def transcribe_remote(audio: Union[Path, np.ndarray], address: str = None) -> dict:
+    """Send audio samples (or a local file path) to the model server and return its transcript."""
+    address = parse_address(address or os.getenv("WHISPER_SERVER_ADDRESS", DEFAULT_ADDRESS))
+    payload = audio if isinstance(audio, np.ndarray) else str(audio)
+    with Client(address, authkey=_authkey(address)) as conn:
+        conn.send(("transcribe", payload))
+        status, result = conn.recv()
+    if status != "ok":
+        raise RuntimeError(f"Model server failed to transcribe: {result}")
+    return result
+
+
+class ModelServer:
+    def __init__(self, address: str, model_name: str, backend: str = None, audio_dir: Union[Path, str] = None):
+        self.address = parse_address(address)
+        self.authkey = _authkey(self.address)  # refuse to start without one on TCP
+        self.model_name = model_name
+        self.backend = backend
+        if audio_dir is None:
+            from .summarizer import AUDIO_DIR as audio_dir
+        self.audio_dir = Path(audio_dir).resolve()
+        self._lock = threading.Lock()
+        self._listener = None
+
+    def _audio(self, payload) -> Union[str, np.ndarray]:
+        if isinstance(payload, np.ndarray):
+            return payload
+        if not isinstance(payload, str):
+            raise ValueError("expected audio samples or a file path")
+        path = Path(payload).resolve()
+        if not path.is_relative_to(self.audio_dir):
+            raise ValueError(f"{payload} is outside the audio directory")
+        return str(path)
+
+    def _handle(self, conn):
+        from .backends import get_backend
+        with conn:
+            try:
+                while True:
+                    try:
+                        command, payload = conn.recv()
+                    except EOFError:
+                        return
+                    if command == "ping":
+                        conn.send(("ok", self.model_name))
+                        continue
+                    if command != "transcribe":
+                        conn.send(("error", f"unknown command {command!r}"))
+                        continue
+                    try:
+                        audio = self._audio(payload)
+                        with self._lock:
+                            result = get_backend(self.model_name, self.backend).transcribe(audio)
+                        conn.send(("ok", result))
+                    except Exception as e:
+                        conn.send(("error", str(e)))
+            except (ConnectionResetError, BrokenPipeError):
+                return
+
+    def serve_forever(self):
+        from .backends import get_backend
+        # Pay the load once, before accepting clients
+        get_backend(self.model_name, self.backend)
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+        self._listener = Listener(self.address, authkey=self.authkey)
+        print(f"Whisper model server ({self.model_name}) listening on {self.address}")
+        try:
+            while True:
+                listener = self._listener
+                if listener is None:
+                    return
+                try:
+                    conn = listener.accept()
+                except OSError:
+                    if self._listener is None:
+                        return
+                    # A client failed authentication; keep serving the others
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self):
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+
+
+def main():
+    from .summarizer import TRANSCRIBE_BACKEND, WHISPER_MODEL
+    address = os.getenv("WHISPER_SERVER_ADDRESS", DEFAULT_ADDRESS)
+    ModelServer(address, WHISPER_MODEL, TRANSCRIBE_BACKEND).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
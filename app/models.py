@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, DDL, Index, event
 from .db import Base
 import datetime
 
@@ -9,14 +9,33 @@ class Recording(Base):
     platform = Column(String, index=True)            # "zoom" or "google_meet"
     meeting_id = Column(String, index=True)
     recording_url = Column(String)
+    recording_file_id = Column(String, default="", server_default="", nullable=False)  # Zoom recording file; "" if the event named none
     received_at = Column(DateTime, default=datetime.datetime.utcnow)
     transcript_fetched = Column(Boolean, default=False)
     transcript_path = Column(String, nullable=True)
     summary = Column(String, nullable=True) # Stores the GPT-4o summary
+    summary_status = Column(String, nullable=True, index=True)  # None (not tried), "done" or "failed"
+    summary_error = Column(String, nullable=True)               # Why the last summary attempt failed
+    audio_sha256 = Column(String, nullable=True, index=True)  # Transcript cache key (app/transcript_cache.py)
+    transcript_cache_hit = Column(Boolean, nullable=True)     # True if Whisper was skipped
+    vad_skipped_seconds = Column(Float, nullable=True)        # Non-speech audio not sent to Whisper
+
+    # Job state for multi-worker processing (see app/jobs.py)
+    status = Column(String, default="pending", server_default="pending", nullable=False, index=True)
+    lease_owner = Column(String, nullable=True)      # worker id holding the job
+    lease_expires_at = Column(DateTime, nullable=True)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    last_error = Column(String, nullable=True)
+    summary_attempts = Column(Integer, default=0, server_default="0", nullable=False)  # catch-up summary claims
 
     # Relationship to metrics
     # metrics = relationship("SummaryMetrics", back_populates="recording")
 
+# One row per recording file, however often Zoom delivers it (see app/ingest.py)
+Index("uq_recordings_platform_meeting_file", Recording.platform, Recording.meeting_id, Recording.recording_file_id,
+      unique=True)
+
+
 class SummaryMetrics(Base):
     __tablename__ = "summary_metrics"
 
@@ -26,4 +45,106 @@ class SummaryMetrics(Base):
     completion_tokens = Column(Integer, nullable=False)
     total_tokens = Column(Integer, nullable=False)
     cost = Column(Float, nullable=False)
+    cache_hits = Column(Integer, default=0, server_default="0", nullable=False)     # LLM calls answered by app/llm_cache.py
+    cached_tokens = Column(Integer, default=0, server_default="0", nullable=False)  # Tokens (and cost) those calls saved
+    compaction_saved_tokens = Column(Integer, default=0, server_default="0", nullable=False)  # Transcript tokens app/compaction.py removed
+    engine = Column(String, default="llm", server_default="llm", nullable=False)  # llm or extractive (app/extractive.py)
+    latency_seconds = Column(Float, nullable=True)                                # Wall time of the summary, including failed attempts
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+
+class SummaryCheckpoint(Base):
+    """Progress of an unfinished summary, so a retry resumes (see app/summary_checkpoint.py)."""
+    __tablename__ = "summary_checkpoints"
+
+    recording_id = Column(Integer, ForeignKey("recordings.id"), primary_key=True)
+    input_hash = Column(String(64), nullable=False)      # Model, strategy and chunks the state belongs to
+    steps_done = Column(Integer, nullable=False)
+    state = Column(Text, nullable=False)                 # JSON: running summary or finished chunk summaries
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow, nullable=False)
+
+
+class RateLimitState(Base):
+    """Shared OpenAI rate-limit buckets, pause and daily spend (see app/rate_limit.py)."""
+    __tablename__ = "rate_limit_state"
+
+    name = Column(String, primary_key=True)              # "requests", "tokens", "pause" or "spend:<date>"
+    level = Column(Float, nullable=False)                # Bucket level, pause deadline or dollars spent
+    updated_at = Column(Float, nullable=False)           # Unix time of the last refill
+
+
+class OutboxMessage(Base):
+    """A pending publication to Slack or Confluence, sent by the publisher worker (see app/outbox.py)."""
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True)
+    recording_id = Column(Integer, ForeignKey("recordings.id"), nullable=True, index=True)
+    destination = Column(String, nullable=False)                # "slack" or "confluence"
+    idempotency_key = Column(String, nullable=False, unique=True)  # Same publication, same key: queued once
+    payload = Column(Text, nullable=False)                      # JSON the destination's request is built from
+    status = Column(String, default="pending", server_default="pending", nullable=False)  # pending, sending, sent or failed
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    lease_expires_at = Column(DateTime, nullable=True)          # While sending; an expired lease is retried
+    last_error = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+
+Index("ix_outbox_status_next_attempt_at", OutboxMessage.status, OutboxMessage.next_attempt_at)
+
+
+class LLMCacheEntry(Base):
+    """A cached LLM response (see app/llm_cache.py)."""
+    __tablename__ = "llm_cache"
+
+    key = Column(String(64), primary_key=True)           # sha256 of the model parameters and the prompt
+    model = Column(String, nullable=False)
+    value = Column(Text, nullable=False)                 # Serialised generations
+    size = Column(Integer, nullable=False)               # Bytes of value, for size-based eviction
+    tokens = Column(Integer, nullable=False)             # Prompt + completion tokens a hit saves
+    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    last_used_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False, index=True)
+
+
+class SearchPassage(Base):
+    """A searchable stretch of a transcript, or a whole summary (see app/search.py)."""
+    __tablename__ = "search_passages"
+
+    id = Column(Integer, primary_key=True)
+    recording_id = Column(Integer, ForeignKey("recordings.id"), nullable=False, index=True)
+    kind = Column(String, nullable=False)                # "transcript" or "summary"
+    start_seconds = Column(Float, nullable=True)         # None for summaries
+    end_seconds = Column(Float, nullable=True)
+    body = Column(Text, nullable=False)
+
+
+# Full-text index over search_passages.body: an FTS5 table kept in sync by
+# triggers on SQLite, a generated tsvector column with a GIN index on Postgres.
+# The same statements run in the Alembic migration.
+SEARCH_INDEX_DDL = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_passages_fts USING fts5("
+        "body, content='search_passages', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS search_passages_ai AFTER INSERT ON search_passages BEGIN "
+        "INSERT INTO search_passages_fts(rowid, body) VALUES (new.id, new.body); END",
+        "CREATE TRIGGER IF NOT EXISTS search_passages_ad AFTER DELETE ON search_passages BEGIN "
+        "INSERT INTO search_passages_fts(search_passages_fts, rowid, body) VALUES ('delete', old.id, old.body); END",
+        "CREATE TRIGGER IF NOT EXISTS search_passages_au AFTER UPDATE ON search_passages BEGIN "
+        "INSERT INTO search_passages_fts(search_passages_fts, rowid, body) VALUES ('delete', old.id, old.body); "
+        "INSERT INTO search_passages_fts(rowid, body) VALUES (new.id, new.body); END",
+    ],
+    "postgresql": [
+        "ALTER TABLE search_passages ADD COLUMN IF NOT EXISTS body_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('english', body)) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_search_passages_body_tsv ON search_passages USING gin (body_tsv)",
+    ],
+}
+
+for _dialect, _statements in SEARCH_INDEX_DDL.items():
+    for _statement in _statements:
+        event.listen(SearchPassage.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(
+    SearchPassage.__table__, "before_drop",
+    DDL("DROP TABLE IF EXISTS search_passages_fts").execute_if(dialect="sqlite"),
+)
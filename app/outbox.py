@@ -0,0 +1,360 @@
+"""
+Durable outbox for publishing summaries to Slack and Confluence.
+
+Publishing a summary only inserts one ``outbox`` row per configured
+destination, in the transaction that stores the summary (store_summary), so
+the transcription pipeline never waits on a slow destination and a stored
+summary is always queued: if the insert fails, so does storing it. A
+publisher worker drains the table:
+
+- Due rows are claimed with a lease, as recordings are in app/jobs.py, so
+  several publishers can share the table and a crashed one's rows are retried
+  once their lease expires.
+- Requests go out concurrently on one pooled httpx.AsyncClient, with at most
+  OUTBOX_<DESTINATION>_CONCURRENCY in flight per destination, so a slow
+  Confluence can't hold up Slack.
+- 429, 5xx and connection errors are retried with exponential backoff and
+  jitter (or the Retry-After the destination asked for), up to
+  OUTBOX_MAX_ATTEMPTS; other 4xx fail at once, since retrying won't help.
+- With SLACK_DIGEST=1, Slack rows are claimed as one batch and posted as a
+  single digest (app.publishers.slack_digest_steps) once SLACK_DIGEST_MAX are
+  due or the oldest has waited SLACK_DIGEST_WINDOW_SECONDS. The rows stay
+  queued until then, and a stopping publisher flushes them, so nothing is
+  lost. A retried digest is posted again in full.
+- Each row carries an idempotency key, derived from the destination, the
+  recording and the summary. Queuing the same publication twice is a no-op,
+  and the key is sent as an Idempotency-Key header. A retried publication
+  starts over, and its steps are safe to repeat (see app/publishers.py).
+
+run_transcription_job runs a publisher on a background thread while it
+works; ``python -m app.outbox`` runs a standalone one.
+"""
+
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+import random
+import threading
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+from .models import OutboxMessage
+
+OUTBOX_PENDING = "pending"
+OUTBOX_SENDING = "sending"
+OUTBOX_SENT = "sent"
+OUTBOX_FAILED = "failed"
+
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_BACKOFF_SECONDS", "5"))      # doubles per attempt
+OUTBOX_MAX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", "3600"))
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+OUTBOX_BATCH = int(os.getenv("OUTBOX_BATCH", "50"))                           # rows in flight per publisher
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+OUTBOX_DRAIN_SECONDS = float(os.getenv("OUTBOX_DRAIN_SECONDS", "60"))         # run_transcription_job waits this long at the end
+# Digest mode: Slack summaries are combined into one post per window or per SLACK_DIGEST_MAX summaries
+SLACK_DIGEST = os.getenv("SLACK_DIGEST", "0") == "1"
+SLACK_DIGEST_WINDOW_SECONDS = float(os.getenv("SLACK_DIGEST_WINDOW_SECONDS", "300"))
+SLACK_DIGEST_MAX = int(os.getenv("SLACK_DIGEST_MAX", "20"))
+DEFAULT_CONCURRENCY = {"slack": 2, "confluence": 4}
+
+
+def concurrency(destination: str) -> int:
+    default = DEFAULT_CONCURRENCY.get(destination, 2)
+    return int(os.getenv(f"OUTBOX_{destination.upper()}_CONCURRENCY", str(default)))
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.utcnow()
+
+
+def enqueue(db: Session, destination: str, payload: dict, idempotency_key: str,
+            recording_id: Optional[int] = None) -> bool:
+    """
+    Queue one publication in the session's transaction; the caller commits.
+    Returns False if its key was already queued.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    # A key queued concurrently by another worker is skipped, not an error
+    statement = (
+        insert(OutboxMessage)
+        .values(recording_id=recording_id, destination=destination, idempotency_key=idempotency_key,
+                payload=json.dumps(payload))
+        .on_conflict_do_nothing(index_elements=[OutboxMessage.idempotency_key])
+        .returning(OutboxMessage.id)
+    )
+    return db.execute(statement).scalar() is not None
+
+
+def enqueue_summary(db: Session, meeting_id: str, summary: str, transcript_path: str,
+                    recording_id: Optional[int] = None) -> List[str]:
+    """Queue the summary for every configured destination, uncommitted; returns the destinations newly queued."""
+    from .publishers import destinations
+    digest = hashlib.sha256(summary.encode()).hexdigest()[:16]
+    payload = {"meeting_id": meeting_id, "summary": summary, "transcript_path": transcript_path}
+    return [d for d in destinations()
+            if enqueue(db, d, payload, f"{d}:{recording_id or meeting_id}:{digest}", recording_id)]
+
+
+def _due(now: datetime.datetime):
+    # Pending and due, or sending with an expired lease
+    return or_(
+        and_(OutboxMessage.status == OUTBOX_PENDING, OutboxMessage.next_attempt_at <= now),
+        and_(OutboxMessage.status == OUTBOX_SENDING, OutboxMessage.lease_expires_at < now),
+    )
+
+
+def _claim(db: Session, candidates, due, now: datetime.datetime, lease_seconds: Optional[int]) -> List[OutboxMessage]:
+    expires = now + datetime.timedelta(seconds=lease_seconds or OUTBOX_LEASE_SECONDS)
+    ids = list(db.scalars(
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(candidates), due)
+        .values(status=OUTBOX_SENDING, lease_expires_at=expires, attempts=OutboxMessage.attempts + 1)
+        .returning(OutboxMessage.id)
+        .execution_options(synchronize_session=False)
+    ))
+    db.commit()
+    claimed = db.query(OutboxMessage).filter(OutboxMessage.id.in_(ids)).order_by(OutboxMessage.id).all() if ids else []
+    for message in claimed:
+        db.expunge(message)
+    return claimed
+
+
+def claim_due(db: Session, limit: int, lease_seconds: Optional[int] = None,
+              exclude: tuple = ()) -> List[OutboxMessage]:
+    """Lease up to ``limit`` due messages (pending, or sending with an expired lease), except to ``exclude``. Commits."""
+    now = _utcnow()
+    due = _due(now)
+    if exclude:
+        due = and_(due, OutboxMessage.destination.not_in(exclude))
+    candidates = (
+        select(OutboxMessage.id).where(due).order_by(OutboxMessage.id).limit(limit).with_for_update(skip_locked=True)
+    )
+    return _claim(db, candidates, due, now, lease_seconds)
+
+
+def claim_digest(db: Session, destination: str, max_count: int, window_seconds: float, flush: bool = False,
+                 lease_seconds: Optional[int] = None) -> List[OutboxMessage]:
+    """
+    Lease up to ``max_count`` due messages to ``destination`` as one batch, once
+    that many are due, the oldest has waited ``window_seconds``, or on ``flush``.
+    Until then they stay queued and nothing is claimed. Commits.
+    """
+    now = _utcnow()
+    due = and_(_due(now), OutboxMessage.destination == destination)
+    rows = db.query(OutboxMessage.id, OutboxMessage.created_at).filter(due).order_by(OutboxMessage.id).limit(max_count).all()
+    db.commit()
+    if not rows:
+        return []
+    oldest = min(created_at for _, created_at in rows)
+    if not flush and len(rows) < max_count and oldest > now - datetime.timedelta(seconds=window_seconds):
+        return []
+    return _claim(db, [message_id for message_id, _ in rows], due, now, lease_seconds)
+
+
+def _finish(db: Session, message_id: int, values: dict):
+    db.execute(update(OutboxMessage).where(OutboxMessage.id == message_id, OutboxMessage.status == OUTBOX_SENDING)
+               .values(lease_expires_at=None, **values))
+    db.commit()
+
+
+def mark_sent(db: Session, message_id: int):
+    _finish(db, message_id, {"status": OUTBOX_SENT, "sent_at": _utcnow(), "last_error": None})
+
+
+def mark_retry(db: Session, message: OutboxMessage, error: str, retry_after: Optional[float] = None):
+    """Schedule another attempt after a backoff, or fail the message once it has used up its attempts."""
+    if message.attempts >= OUTBOX_MAX_ATTEMPTS:
+        mark_failed(db, message.id, error)
+        return
+    delay = min(OUTBOX_MAX_BACKOFF_SECONDS, OUTBOX_BACKOFF_SECONDS * 2 ** (message.attempts - 1))
+    delay = max(delay * (0.5 + random.random() / 2), retry_after or 0)
+    _finish(db, message.id, {"status": OUTBOX_PENDING, "last_error": error,
+                             "next_attempt_at": _utcnow() + datetime.timedelta(seconds=delay)})
+
+
+def mark_failed(db: Session, message_id: int, error: str):
+    _finish(db, message_id, {"status": OUTBOX_FAILED, "last_error": error})
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
+
+
+def _next_request(steps, response) -> Optional[dict]:
+    # StopIteration can't be passed through an asyncio future
+    try:
+        return steps.send(response)
+    except StopIteration:
+        return None
+
+
+async def _run(client: httpx.AsyncClient, steps, idempotency_key: str) -> tuple:
+    from .publishers import PublishError
+    response = None
+    try:
+        while True:
+            try:
+                # Building a request may read the transcript from disk
+                request = await asyncio.to_thread(_next_request, steps, response)
+            except PublishError as e:
+                return OUTBOX_FAILED, str(e), None
+            except Exception as e:
+                return OUTBOX_FAILED, f"Could not build the request: {e}", None
+            if request is None:
+                return OUTBOX_SENT, None, None
+            request = dict(request)
+            request["headers"] = dict(request.get("headers") or {}, **{"Idempotency-Key": idempotency_key})
+            try:
+                response = await client.request(request.pop("method"), request.pop("url"), **request)
+            except httpx.HTTPError as e:
+                return "retry", f"{type(e).__name__}: {e}", None
+            if response.status_code == 429 or response.status_code >= 500:
+                # The publication starts over; its steps are safe to repeat
+                return "retry", f"HTTP {response.status_code}: {response.text[:200]}", _retry_after(response)
+    finally:
+        steps.close()
+
+
+async def deliver(client: httpx.AsyncClient, message: OutboxMessage) -> tuple:
+    """Run one message's requests (app.publishers). Returns ("sent" | "retry" | "failed", error, retry_after)."""
+    from .publishers import STEPS
+    return await _run(client, STEPS[message.destination](json.loads(message.payload)), message.idempotency_key)
+
+
+async def deliver_digest(client: httpx.AsyncClient, messages: List[OutboxMessage]) -> tuple:
+    """Post a batch of Slack messages as one digest; the outcome applies to all of them."""
+    from .publishers import slack_digest_steps
+    keys = ",".join(m.idempotency_key for m in messages)
+    key = f"slack-digest:{hashlib.sha256(keys.encode()).hexdigest()[:16]}"
+    return await _run(client, slack_digest_steps([json.loads(m.payload) for m in messages]), key)
+
+
+async def drain(session_factory=None, client: httpx.AsyncClient = None, stop: threading.Event = None,
+                poll_seconds: float = None):
+    """
+    Deliver due messages concurrently. Without ``stop``, returns once nothing is
+    due or in flight; with it, keeps polling until it is set, then does the same.
+    """
+    if session_factory is None:
+        from .db import SessionLocal as session_factory
+    poll_seconds = OUTBOX_POLL_SECONDS if poll_seconds is None else poll_seconds
+    own_client = client is None
+    if own_client:
+        client = httpx.AsyncClient(limits=httpx.Limits(max_connections=OUTBOX_BATCH, max_keepalive_connections=20),
+                                   timeout=httpx.Timeout(30.0, connect=5.0))
+    semaphores: Dict[str, asyncio.Semaphore] = {}
+    digest = SLACK_DIGEST
+
+    def record(message: OutboxMessage, outcome: str, error: Optional[str], retry_after: Optional[float]):
+        db = session_factory()
+        try:
+            if outcome == OUTBOX_SENT:
+                mark_sent(db, message.id)
+                print(f"Published outbox message {message.id} to {message.destination}")
+            elif outcome == OUTBOX_FAILED:
+                mark_failed(db, message.id, error)
+                print(f"Outbox message {message.id} to {message.destination} failed: {error}")
+            else:
+                mark_retry(db, message, error, retry_after)
+                print(f"Outbox message {message.id} to {message.destination} will be retried: {error}")
+        finally:
+            db.close()
+
+    async def publish(messages: List[OutboxMessage], as_digest: bool):
+        destination = messages[0].destination
+        semaphore = semaphores.setdefault(destination, asyncio.Semaphore(concurrency(destination)))
+        try:
+            async with semaphore:
+                outcome = await (deliver_digest(client, messages) if as_digest else deliver(client, messages[0]))
+            for message in messages:
+                await asyncio.to_thread(record, message, *outcome)
+        except Exception as e:
+            # The lease runs out and the messages are claimed again
+            print(f"Outbox messages {[m.id for m in messages]} to {destination} not recorded: {e}")
+
+    def claim(limit: int, flush: bool) -> list:
+        # (messages, as_digest) per delivery
+        db = session_factory()
+        try:
+            if not digest:
+                return [([m], False) for m in claim_due(db, limit)]
+            batch = claim_digest(db, "slack", SLACK_DIGEST_MAX, SLACK_DIGEST_WINDOW_SECONDS, flush)
+            return [([m], False) for m in claim_due(db, limit, exclude=("slack",))] + ([(batch, True)] if batch else [])
+        finally:
+            db.close()
+
+    in_flight = set()
+    try:
+        while True:
+            # Queued digest summaries are flushed when there is no stop event or it is set
+            stopping = stop is None or stop.is_set()
+            claimed = await asyncio.to_thread(claim, OUTBOX_BATCH - len(in_flight), stopping) if len(in_flight) < OUTBOX_BATCH else []
+            in_flight |= {asyncio.create_task(publish(*batch)) for batch in claimed}
+            if claimed:
+                continue
+            if not in_flight:
+                if stopping:
+                    return
+                await asyncio.to_thread(stop.wait, poll_seconds)
+                continue
+            # With a digest, poll while waiting so that its window can close
+            _, in_flight = await asyncio.wait(in_flight, timeout=poll_seconds if digest else None,
+                                              return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        if own_client:
+            await client.aclose()
+
+
+def publish_pending(session_factory=None):
+    """Deliver everything that is due now, then return."""
+    asyncio.run(drain(session_factory))
+
+
+class Publisher:
+    """A publisher on a background thread, for the lifetime of a transcription run."""
+
+    def __init__(self, session_factory=None):
+        self.session_factory = session_factory
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="outbox-publisher", daemon=True)
+
+    def _run(self):
+        try:
+            asyncio.run(drain(self.session_factory, stop=self._stop))
+        except Exception as e:
+            print(f"Outbox publisher stopped: {e}")
+
+    def start(self) -> "Publisher":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        """Finish what is due and in flight, waiting at most ``timeout`` seconds; the rest stays queued."""
+        self._stop.set()
+        self._thread.join(OUTBOX_DRAIN_SECONDS if timeout is None else timeout)
+
+
+def main():
+    print("Outbox publisher running; Ctrl-C to stop")
+    try:
+        asyncio.run(drain(stop=threading.Event()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""
+Staged, concurrent processing pipeline for recordings.
+
+Every step of the transcription job (download, audio extraction, Whisper,
+summarisation) runs as its own stage with a dedicated worker pool. Publishing
+is not a stage: the summary stage queues the summary in the outbox as it
+stores it (app/outbox.py).
+Stages are connected by bounded queues, so recording N+1 downloads while
+recording N transcribes, and a slow stage applies back-pressure upstream
+instead of letting work pile up in memory.
+"""
+
+import concurrent.futures
+import itertools
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+# Sentinel pushed through the queues once all jobs have been fed in
+_DONE = object()
+
+# Recordings download into a directory per recording here, kept across retries so a failed download resumes
+DOWNLOAD_DIR = Path(os.getenv("DOWNLOAD_DIR") or Path(tempfile.gettempdir()) / "meetmate_downloads")
+# Streamed samples are spooled here for the transcribe worker; tmpfs where there is one (None: the temp dir)
+PCM_SPOOL_DIR = os.getenv("PCM_SPOOL_DIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
+# Process stages never touch the DB, so the parent renews the job's lease this often while they run
+LEASE_RENEW_SECONDS = float(os.getenv("JOB_LEASE_RENEW_SECONDS", "300"))
+
+
+@dataclass
+class Job:
+    """State of one recording as it moves through the pipeline."""
+    recording_id: int
+    meeting_id: str
+    recording_url: str
+    worker_id: Optional[str] = None
+    workdir: Optional[str] = None
+    video_path: Optional[str] = None
+    audio_path: Optional[str] = None
+    # Decoded 16 kHz float32 samples when streaming, spooled raw (app.audio.save_pcm) so the
+    # transcribe worker reads them from a file instead of having them pickled to it
+    pcm_path: Optional[str] = None
+    transcript_path: Optional[str] = None
+    audio_sha256: Optional[str] = None
+    transcript_cache_hit: Optional[bool] = None
+    vad_skipped_seconds: Optional[float] = None
+    summary: Optional[str] = None
+    error: Optional[str] = None
+    failed_stage: Optional[str] = None
+    timings: dict = field(default_factory=dict)
+
+    @classmethod
+    def from_recording(cls, rec, worker_id: Optional[str] = None) -> "Job":
+        return cls(recording_id=rec.id, meeting_id=rec.meeting_id, recording_url=rec.recording_url, worker_id=worker_id)
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+    def cleanup(self):
+        if self.workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
+
+
+class Stage:
+    """
+    One step of the pipeline. ``fn`` takes a Job and returns the (updated) Job.
+
+    Thread stages call ``fn`` directly from their worker threads. Process stages
+    keep the same number of feeder threads but run ``fn`` in a ProcessPoolExecutor,
+    so ``fn`` and the Job must be picklable; while ``fn`` runs, the feeder thread
+    renews the job's lease every LEASE_RENEW_SECONDS.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Job], Job], workers: int = 1, processes: bool = False):
+        if workers < 1:
+            raise ValueError(f"Stage {name} needs at least one worker, got {workers}")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.processes = processes
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self, mp_context=None):
+        if self.processes and self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=mp_context)
+            # Force the worker processes to start now, before the pipeline threads
+            # exist, so a fork-based context never forks a multi-threaded parent
+            self.executor.submit(int).result()
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def process(self, job: Job) -> Job:
+        if job.failed:
+            # Earlier stage failed: pass the job through untouched
+            return job
+        started = time.perf_counter()
+        try:
+            if self.executor is not None:
+                future = self.executor.submit(self.fn, job)
+                while True:
+                    try:
+                        job = future.result(timeout=LEASE_RENEW_SECONDS)
+                        break
+                    except concurrent.futures.TimeoutError:
+                        _renew_lease(job)
+            else:
+                job = self.fn(job)
+        except Exception as e:
+            job.error = str(e)
+            job.failed_stage = self.name
+        job.timings[self.name] = time.perf_counter() - started
+        return job
+
+
+class Pipeline:
+    def __init__(self, stages: List[Stage], queue_size: int = 2, mp_start_method: Optional[str] = None):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.mp_start_method = mp_start_method
+
+    def _worker(self, stage: Stage, in_q: queue.Queue, out_q: queue.Queue, remaining: list, lock: threading.Lock):
+        while True:
+            job = in_q.get()
+            if job is _DONE:
+                # Let sibling workers see the sentinel too; the last one forwards it
+                in_q.put(_DONE)
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    out_q.put(_DONE)
+                return
+            out_q.put(stage.process(job))
+
+    def run(self, jobs: Iterable[Job]) -> List[Job]:
+        """Push ``jobs`` through every stage and return them in completion order."""
+        jobs = iter(jobs)
+        first = next(jobs, None)
+        if first is None:
+            # Nothing to do: don't spin up worker processes
+            return []
+        jobs = itertools.chain([first], jobs)
+
+        mp_context = multiprocessing.get_context(self.mp_start_method)
+        # Spin up process pools before any threads exist
+        for stage in self.stages:
+            stage.start(mp_context)
+
+        # Bounded queues between stages; the final results queue is drained here
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        queues.append(queue.Queue())
+        threads = []
+        for i, stage in enumerate(self.stages):
+            remaining, lock = [stage.workers], threading.Lock()
+            for n in range(stage.workers):
+                t = threading.Thread(
+                    target=self._worker,
+                    args=(stage, queues[i], queues[i + 1], remaining, lock),
+                    name=f"pipeline-{stage.name}-{n}",
+                    daemon=True,
+                )
+                t.start()
+                threads.append(t)
+
+        results: List[Job] = []
+        try:
+            for job in jobs:
+                queues[0].put(job)
+            queues[0].put(_DONE)
+            while True:
+                job = queues[-1].get()
+                if job is _DONE:
+                    break
+                job.cleanup()
+                results.append(job)
+        finally:
+            for t in threads:
+                t.join()
+            for stage in self.stages:
+                stage.shutdown()
+        return results
+
+
+def run_serially(stages: List[Stage], jobs: Iterable[Job]) -> List[Job]:
+    """Process one job at a time through every stage (the pre-pipeline behaviour)."""
+    results = []
+    for job in jobs:
+        for stage in stages:
+            job = stage.process(job)
+        job.cleanup()
+        results.append(job)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Recording stages
+# ---------------------------------------------------------------------------
+
+def download_dir(recording_id: int) -> Path:
+    return DOWNLOAD_DIR / str(recording_id)
+
+
+def discard_download(recording_id: int):
+    """Delete a recording's (partial) download once it won't be retried."""
+    shutil.rmtree(download_dir(recording_id), ignore_errors=True)
+
+
+def download_stage(job: Job) -> Job:
+    from .summarizer import download_file
+    job.workdir = tempfile.mkdtemp(prefix=f"meetmate_{job.recording_id}_")
+    # Not in the workdir, which goes with the job: a retry resumes the .part file and its sidecar
+    directory = download_dir(job.recording_id)
+    directory.mkdir(parents=True, exist_ok=True)
+    video_file = directory / f"{job.meeting_id}_meeting.mp4"
+    if video_file.exists():
+        print(f"Reusing {video_file}, downloaded by an earlier attempt")
+    else:
+        print(f"Downloading video to {video_file} from {job.recording_url}")
+        download_file(job.recording_url, video_file)
+    job.video_path = str(video_file)
+    return job
+
+
+def _renew_lease(job: Job):
+    # Keep the job's lease alive across long stages so no other worker reclaims it
+    if job.worker_id is None:
+        return
+    from . import summarizer
+    from .jobs import renew_lease
+    db = summarizer.SessionLocal()
+    try:
+        if not renew_lease(db, job.recording_id, job.worker_id):
+            raise RuntimeError(f"Lease on recording {job.recording_id} was lost")
+    finally:
+        db.close()
+
+
+def extract_stage(job: Job) -> Job:
+    from .summarizer import extract_audio
+    _renew_lease(job)
+    audio_file = Path(job.workdir) / f"{job.meeting_id}_audio.wav"
+    print(f"Extracting audio to {audio_file}")
+    extract_audio(Path(job.video_path), audio_file)
+    # The video is no longer needed once the audio track is out
+    discard_download(job.recording_id)
+    job.audio_path = str(audio_file)
+    return job
+
+
+def stream_stage(job: Job) -> Job:
+    # Streaming mode: download straight into ffmpeg, no video or WAV on disk; the
+    # samples reach the transcribe worker through a PCM_SPOOL_DIR file
+    from .audio import load_audio, save_pcm
+    from .transcription import TRANSCRIBE_WINDOWED
+    if TRANSCRIBE_WINDOWED:
+        # The transcribe stage decodes the URL itself, one window at a time
+        _renew_lease(job)
+        return job
+    print(f"Streaming audio for {job.meeting_id} from {job.recording_url}")
+    samples = load_audio(job.recording_url)
+    job.workdir = tempfile.mkdtemp(prefix=f"meetmate_{job.recording_id}_", dir=PCM_SPOOL_DIR)
+    job.pcm_path = str(Path(job.workdir) / f"{job.meeting_id}_audio.f32")
+    save_pcm(samples, job.pcm_path)
+    _renew_lease(job)
+    return job
+
+
+def transcribe_stage(job: Job) -> Job:
+    # Runs in a worker process: only touches the filesystem, never the DB
+    from .summarizer import transcribe, AUDIO_DIR, TRANSCRIBE_BACKEND, WHISPER_MODEL
+    from .backends import model_tag as backend_model_tag
+    from .transcript_cache import get_transcript_cache
+    from .transcript_store import save_transcript, transcript_file
+
+    from . import transcription, vad
+
+    out_path = transcript_file(AUDIO_DIR, job.meeting_id)
+    # Transcripts from different engines are cached separately
+    model_tag = backend_model_tag(WHISPER_MODEL, TRANSCRIBE_BACKEND)
+    if transcription.TRANSCRIBE_WINDOWED and job.pcm_path is None:
+        return _transcribe_windowed(job, out_path, transcribe, model_tag)
+
+    if job.pcm_path is not None:
+        from .audio import read_pcm
+        audio = read_pcm(job.pcm_path)
+    else:
+        audio = Path(job.audio_path)
+
+    transcribe_fn = transcribe
+    if vad.VAD_ENABLED:
+        # Only speech regions go to Whisper; timestamps are mapped back afterwards
+        from .audio import decode_file
+        if isinstance(audio, Path):
+            audio = decode_file(audio)
+        speech = vad.SpeechFilter(audio)
+        job.vad_skipped_seconds = speech.skipped_seconds
+        print(f"VAD kept {speech.speech_seconds:.0f}s of {speech.total_seconds:.0f}s for {job.meeting_id}")
+        transcribe_fn, model_tag = speech.wrap(transcribe), f"{model_tag}+vad"
+
+    if os.getenv("TRANSCRIPT_CACHE", "1") == "1":
+        job.audio_sha256, job.transcript_cache_hit = get_transcript_cache().transcribe(
+            audio, out_path, transcribe_fn, model_tag
+        )
+        if job.transcript_cache_hit:
+            print(f"Reused cached transcript {job.audio_sha256[:12]} for {job.meeting_id}")
+    else:
+        print(f"Transcribing audio for {job.meeting_id}")
+        # Written aside and renamed: the old file may be a hard link into the transcript cache
+        save_transcript(transcribe_fn(audio), out_path)
+    print(f"Saved transcript to {out_path}")
+    job.transcript_path = str(out_path)
+    return job
+
+
+def _transcribe_windowed(job: Job, out_path: Path, transcribe: Callable, model_tag: str) -> Job:
+    """
+    Bounded-memory transcription: decode the extracted WAV (or, when streaming,
+    the recording URL) a window at a time and append segments to the transcript
+    file as each window finishes.
+    """
+    from .transcript_cache import get_transcript_cache, audio_key, link, new_digest, update_digest
+    from .transcription import transcribe_windowed
+    from . import vad
+
+    source = job.audio_path or job.recording_url
+    if vad.VAD_ENABLED:
+        model_tag = f"{model_tag}+vad"
+    cache = get_transcript_cache() if os.getenv("TRANSCRIPT_CACHE", "1") == "1" else None
+    key = None
+    if cache is not None and job.audio_path:
+        # A local WAV hashes in a single streaming pass, so check the cache before Whisper
+        key = audio_key(Path(job.audio_path), model_tag)
+        cached = cache.get(key, out_path.suffix)
+        if cached is not None:
+            link(cached, out_path)
+            job.audio_sha256, job.transcript_cache_hit = key, True
+            print(f"Reused cached transcript {key[:12]} for {job.meeting_id}")
+            job.transcript_path = str(out_path)
+            return job
+
+    digest = new_digest(model_tag)
+    hash_window = None
+    if cache is not None and key is None:
+        hash_window = lambda offset, samples: update_digest(digest, samples)
+    skipped = []
+
+    def transcribe_window(samples):
+        if not vad.VAD_ENABLED:
+            return transcribe(samples)
+        speech = vad.SpeechFilter(samples)
+        skipped.append(speech.skipped_seconds)
+        return speech.wrap(transcribe)(samples)
+
+    print(f"Transcribing {job.meeting_id} window by window from {source}")
+    writer = transcribe_windowed(source, out_path, transcribe_window, on_window=hash_window)
+    if vad.VAD_ENABLED:
+        job.vad_skipped_seconds = sum(skipped)
+    if cache is not None:
+        # Streamed URLs can't be looked up before transcribing, but later runs can reuse them
+        job.audio_sha256, job.transcript_cache_hit = key or digest.hexdigest(), False
+        cache.put_file(job.audio_sha256, out_path)
+    print(f"Saved {writer.segments} segments to {out_path}")
+    job.transcript_path = str(out_path)
+    return job
+
+
+def summarize_stage(job: Job) -> Job:
+    from . import summarizer
+    from .jobs import complete_job
+    from .models import Recording
+    from .search import try_index_recording, try_index_summary
+
+    _renew_lease(job)
+    db = summarizer.SessionLocal()
+    try:
+        rec = db.get(Recording, job.recording_id)
+        rec.transcript_fetched = True
+        rec.transcript_path = job.transcript_path
+        rec.audio_sha256 = job.audio_sha256
+        rec.transcript_cache_hit = job.transcript_cache_hit
+        rec.vad_skipped_seconds = job.vad_skipped_seconds
+        db.commit()
+        print(f"Transcription successful for {job.meeting_id}.")
+        try_index_recording(db, rec)
+
+        print(f"Generating summary for {job.meeting_id} using transcript {job.transcript_path}")
+        try:
+            summary_text = summarizer.generate_summary(job.transcript_path, job.recording_id)
+        except Exception as e:
+            # The transcript is saved: the job is done, and the catch-up loop in
+            # run_transcription_job retries the summary from its checkpoint.
+            # Whatever went wrong, the recording isn't downloaded and transcribed again.
+            print(f"Summary failed for {job.meeting_id}: {e}")
+        else:
+            summarizer.store_summary(db, rec, summary_text)
+            print(f"Summary generated for {job.meeting_id}: {summary_text[:100]}...")
+            try_index_summary(db, rec)
+            job.summary = summary_text
+        if job.worker_id is not None:
+            complete_job(db, job.recording_id, job.worker_id)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return job
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def build_recording_pipeline(
+    download_workers: Optional[int] = None,
+    extract_workers: Optional[int] = None,
+    transcribe_workers: Optional[int] = None,
+    summarize_workers: Optional[int] = None,
+    queue_size: Optional[int] = None,
+    streaming: Optional[bool] = None,
+) -> Pipeline:
+    """
+    Build the download → extract → transcribe → summarize pipeline.
+    Per-stage concurrency defaults to the PIPELINE_*_WORKERS env vars. With
+    ``streaming`` (default: STREAM_AUDIO env var) download and extraction are a
+    single in-memory stream stage.
+    """
+    if streaming is None:
+        streaming = os.getenv("STREAM_AUDIO", "0") == "1"
+    if streaming:
+        stages = [Stage("stream", stream_stage, download_workers or _env_int("PIPELINE_DOWNLOAD_WORKERS", 2))]
+    else:
+        stages = [
+            Stage("download", download_stage, download_workers or _env_int("PIPELINE_DOWNLOAD_WORKERS", 2)),
+            # ffmpeg already runs in its own OS process; a thread per call is enough to overlap it
+            Stage("extract", extract_stage, extract_workers or _env_int("PIPELINE_EXTRACT_WORKERS", 2)),
+        ]
+    stages += [
+        Stage("transcribe", transcribe_stage, transcribe_workers or _env_int("PIPELINE_TRANSCRIBE_WORKERS", 1), processes=True),
+        Stage("summarize", summarize_stage, summarize_workers or _env_int("PIPELINE_SUMMARIZE_WORKERS", 2)),
+    ]
+    return Pipeline(stages, queue_size=queue_size or _env_int("PIPELINE_QUEUE_SIZE", 2))
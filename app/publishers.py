@@ -1,10 +1,41 @@
+"""
+Slack and Confluence publishing.
+
+A publication is a generator of HTTP requests: it yields a request (a dict of
+method, url and requests/httpx keyword arguments), is sent back the response,
+and yields the next request until it is done. Most publications are a single
+request; a Confluence page for a long transcript is several (the page, then
+an attachment or child pages). The same steps are driven synchronously by
+publish_to_slack / publish_to_confluence and asynchronously, with retries, by
+the outbox publisher (app/outbox.py).
+
+Every step is safe to repeat, so a publication retried after a partial
+failure completes instead of duplicating pages: a page whose title already
+exists is looked up and reused, and attachments are uploaded with PUT, which
+replaces a file of the same name.
+"""
+
+import gzip
+import html
+import itertools
 import os
-import json
+import tempfile
+from typing import Generator, Iterable, Iterator, List
+
 import requests
-from pathlib import Path
+
+from .transcript_store import iter_segments
 
 # Slack configuration
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
+# Threading digest summaries needs a bot token (chat:write): webhooks don't return the message's ts
+SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
+SLACK_CHANNEL = os.getenv("SLACK_CHANNEL")                     # Channel ID the bot posts digests to
+SLACK_DIGEST_THREAD = os.getenv("SLACK_DIGEST_THREAD", "0") == "1"
+SLACK_API_URL = os.getenv("SLACK_API_URL", "https://slack.com/api")
+SLACK_SECTION_CHARS = 3000    # Block Kit limit on a section's text
+SLACK_MAX_BLOCKS = 50         # Block Kit limit on blocks per message
+SLACK_MESSAGE_CHARS = 12000   # Digest messages are split well under Slack's message size limit
 
 # Confluence configuration
 CONFLUENCE_BASE_URL = os.getenv("CONFLUENCE_BASE_URL")         # e.g. https://your-domain.atlassian.net/wiki
@@ -12,64 +43,353 @@ CONFLUENCE_USER = os.getenv("CONFLUENCE_USER")                 # Atlassian accou
 CONFLUENCE_API_TOKEN = os.getenv("CONFLUENCE_API_TOKEN")       # Atlassian API token
 CONFLUENCE_SPACE = os.getenv("CONFLUENCE_SPACE")               # Confluence space key
 CONFLUENCE_PARENT_ID = os.getenv("CONFLUENCE_PARENT_ID")       # Parent page ID for new pages
+# Transcripts whose page body would be larger go to an attachment or to child pages
+CONFLUENCE_MAX_BODY_BYTES = int(os.getenv("CONFLUENCE_MAX_BODY_BYTES", "1000000"))
+CONFLUENCE_LARGE_TRANSCRIPTS = os.getenv("CONFLUENCE_LARGE_TRANSCRIPTS", "attachment")  # attachment | pages
+PARAGRAPH_SECONDS = 60        # Transcript paragraphs, each headed by its start time
+PARAGRAPH_SEGMENTS = 20       # ... or this many segments, for transcripts without timestamps
+ATTACHMENT_NAME = "transcript.txt.gz"
 
+Steps = Generator[dict, object, None]
 
-def publish_to_slack(meeting_id: str, summary: str) -> None:
+
+class PublishError(Exception):
+    """The destination rejected a request; retrying it won't help."""
+
+
+def _check(response):
+    if not 200 <= response.status_code < 300:
+        raise PublishError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+
+def slack_request(meeting_id: str, summary: str) -> dict:
     """
-    Send the summary text to a Slack channel via Incoming Webhook.
+    The Incoming Webhook request that posts the summary to a Slack channel.
     """
     if not SLACK_WEBHOOK_URL:
         raise ValueError("SLACK_WEBHOOK_URL not set. Cannot post to Slack.")
     payload = {
         "text": f"*Meeting Summary ({meeting_id})*\n{summary}"
     }
-    resp = requests.post(SLACK_WEBHOOK_URL, json=payload, timeout=10)
-    resp.raise_for_status()
+    return {"method": "POST", "url": SLACK_WEBHOOK_URL, "json": payload, "timeout": 10}
 
 
-def publish_to_confluence(meeting_id: str, summary: str, transcript_path: str) -> None:
+def slack_steps(meeting_id: str, summary: str) -> Steps:
+    _check((yield slack_request(meeting_id, summary)))
+
+
+def _mrkdwn(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _sections(text: str) -> List[dict]:
+    """mrkdwn section blocks holding ``text``, split at line breaks to fit SLACK_SECTION_CHARS."""
+    n = SLACK_SECTION_CHARS
+    chunks = [""]
+    for line in _mrkdwn(text).splitlines():
+        for piece in [line[i:i + n] for i in range(0, max(len(line), 1), n)]:
+            if chunks[-1] and len(chunks[-1]) + 1 + len(piece) > n:
+                chunks.append(piece)
+            else:
+                chunks[-1] = f"{chunks[-1]}\n{piece}" if chunks[-1] else piece
+    return [{"type": "section", "text": {"type": "mrkdwn", "text": c}} for c in chunks if c.strip()]
+
+
+def _chars(blocks: List[dict]) -> int:
+    return sum(len(b.get("text", {}).get("text", "")) for b in blocks)
+
+
+def _split(groups: List[List[dict]], reserved: int = 0) -> List[List[dict]]:
     """
-    Create a new Confluence page with the meeting summary and full transcript.
+    Pack groups of blocks into messages within SLACK_MAX_BLOCKS (less
+    ``reserved``) and SLACK_MESSAGE_CHARS. A group is only split across
+    messages if it doesn't fit in one on its own.
+    """
+    messages, blocks = [], []
+
+    def fits(more):
+        return (len(blocks) + len(more) <= SLACK_MAX_BLOCKS - reserved
+                and _chars(blocks) + _chars(more) <= SLACK_MESSAGE_CHARS)
+
+    for group in groups:
+        if blocks and not fits(group):
+            messages.append(blocks)
+            blocks = []
+        for block in group:
+            if blocks and not fits([block]):
+                messages.append(blocks)
+                blocks = []
+            blocks.append(block)
+    if blocks:
+        messages.append(blocks)
+    return messages
+
+
+def _summary_title(meeting_id: str) -> str:
+    return f"*Meeting Summary ({meeting_id})*"
+
+
+def digest_messages(payloads: List[dict], threaded: bool = False) -> List[dict]:
+    """
+    Block Kit messages combining several summaries (outbox payloads), split to
+    fit Slack's limits. A threaded digest lists each meeting with the first
+    line of its summary; the full summaries go in the thread.
+    """
+    groups = []
+    for p in payloads:
+        summary = p["summary"]
+        if threaded:
+            summary = next((line for line in summary.splitlines() if line.strip()), "")
+        groups.append(_sections(f"{_summary_title(p['meeting_id'])}\n{summary}") + [{"type": "divider"}])
+    parts = _split(groups, reserved=1)
+    messages = []
+    for number, blocks in enumerate(parts, 1):
+        heading = f"Meeting summaries ({len(payloads)})"
+        if len(parts) > 1:
+            heading += f", part {number} of {len(parts)}"
+        if blocks[-1]["type"] == "divider":
+            blocks = blocks[:-1]
+        messages.append({"text": heading, "blocks": [{"type": "header", "text": {"type": "plain_text", "text": heading}}]
+                         + blocks})
+    return messages
+
+
+def _chat_post(message: dict) -> Generator[dict, object, str]:
+    """Post with chat.postMessage; returns the message's ts."""
+    response = yield {
+        "method": "POST",
+        "url": f"{SLACK_API_URL}/chat.postMessage",
+        "json": {"channel": SLACK_CHANNEL, **message},
+        "headers": {"Authorization": f"Bearer {SLACK_BOT_TOKEN}"},
+        "timeout": 10,
+    }
+    _check(response)
+    data = response.json()
+    if not data.get("ok"):
+        raise PublishError(f"Slack: {data.get('error')}")
+    return data["ts"]
+
+
+def slack_digest_steps(payloads: List[dict]) -> Steps:
+    """
+    Post several summaries as one digest (more than one message if it is too
+    big for one). With SLACK_DIGEST_THREAD, each full summary is then posted as
+    a reply in the digest's thread.
+    """
+    if not SLACK_DIGEST_THREAD:
+        if not SLACK_WEBHOOK_URL:
+            raise ValueError("SLACK_WEBHOOK_URL not set. Cannot post to Slack.")
+        for message in digest_messages(payloads):
+            _check((yield {"method": "POST", "url": SLACK_WEBHOOK_URL, "json": message, "timeout": 10}))
+        return
+    if not (SLACK_BOT_TOKEN and SLACK_CHANNEL):
+        raise ValueError("SLACK_BOT_TOKEN and SLACK_CHANNEL not set. Cannot thread the Slack digest.")
+    thread_ts = None
+    for message in digest_messages(payloads, threaded=True):
+        ts = yield from _chat_post(message)
+        thread_ts = thread_ts or ts
+    for p in payloads:
+        for blocks in _split([_sections(f"{_summary_title(p['meeting_id'])}\n{p['summary']}")]):
+            yield from _chat_post({"text": f"Meeting Summary ({p['meeting_id']})", "blocks": blocks,
+                                   "thread_ts": thread_ts})
+
+
+def _timestamp(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def transcript_paragraphs(segments: Iterable[dict]) -> Iterator[tuple]:
+    """(start time or None, text) per paragraph of about PARAGRAPH_SECONDS, read lazily from ``segments``."""
+    start, texts = None, []
+    for seg in segments:
+        if not texts:
+            start = seg.get("start")
+        texts.append(seg["text"].strip())
+        if start is None:
+            full = len(texts) >= PARAGRAPH_SEGMENTS
+        else:
+            full = seg.get("end", start) - start >= PARAGRAPH_SECONDS
+        if full:
+            yield start, " ".join(texts)
+            texts = []
+    if texts:
+        yield start, " ".join(texts)
+
+
+def storage_paragraph(start, text: str) -> str:
+    """One transcript paragraph in Confluence storage format, escaped."""
+    stamp = f"<strong>[{_timestamp(start)}]</strong> " if start is not None else ""
+    return f"<p>{stamp}{html.escape(text, quote=False)}</p>"
+
+
+def summary_storage(title: str, summary: str) -> str:
+    lines = "<br/>".join(html.escape(line, quote=False) for line in summary.splitlines())
+    return f"<h1>{html.escape(title, quote=False)}</h1><h2>Summary</h2><p>{lines}</p><h2>Transcript</h2>"
+
+
+def _transcript_segments(transcript_path: str) -> Iterator[dict]:
+    try:
+        segments = iter_segments(transcript_path)
+        first = next(segments, None)
+    except Exception as e:
+        raise RuntimeError(f"Failed to read transcript: {e}")
+    if first is None:
+        # Transcripts without segments: the text as one segment
+        from .transcript_store import load_text
+        text = load_text(transcript_path)
+        return iter([{"text": text}] if text.strip() else [])
+    return itertools.chain([first], segments)
+
+
+def _confluence_auth() -> dict:
+    return {"auth": (CONFLUENCE_USER, CONFLUENCE_API_TOKEN)}
+
+
+def confluence_page_exists(response) -> bool:
+    """True for the error Confluence returns when a page with the title is already in the space."""
+    return response.status_code == 400 and "already exists" in response.text
+
+
+def _create_page(title: str, body: str, parent_id) -> Generator[dict, object, str]:
+    """Create a page (or find the one an earlier attempt created); returns its id."""
+    response = yield {
+        "method": "POST",
+        "url": f"{CONFLUENCE_BASE_URL}/rest/api/content/",
+        "json": {
+            "type": "page",
+            "title": title,
+            "space": {"key": CONFLUENCE_SPACE},
+            "ancestors": [{"id": int(parent_id)}],
+            "body": {"storage": {"value": body, "representation": "storage"}},
+        },
+        "headers": {"Content-Type": "application/json"},
+        "timeout": 60,
+        **_confluence_auth(),
+    }
+    if not confluence_page_exists(response):
+        _check(response)
+        return response.json()["id"]
+    found = yield {
+        "method": "GET",
+        "url": f"{CONFLUENCE_BASE_URL}/rest/api/content",
+        "params": {"spaceKey": CONFLUENCE_SPACE, "title": title},
+        "timeout": 20,
+        **_confluence_auth(),
+    }
+    _check(found)
+    results = found.json().get("results") or []
+    if not results:
+        raise PublishError(f"Confluence reports page {title!r} exists but it was not found")
+    return results[0]["id"]
+
+
+def _attach_transcript(page_id, transcript_path: str) -> Steps:
+    # Compressed into a spooled file: kept in memory while small, on disk beyond that
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+        with gzip.GzipFile(fileobj=spool, mode="wb") as gz:
+            for start, text in transcript_paragraphs(_transcript_segments(transcript_path)):
+                stamp = f"[{_timestamp(start)}] " if start is not None else ""
+                gz.write(f"{stamp}{text}\n\n".encode("utf-8"))
+        spool.seek(0)
+        _check((yield {
+            "method": "PUT",
+            "url": f"{CONFLUENCE_BASE_URL}/rest/api/content/{page_id}/child/attachment",
+            "files": {"file": (ATTACHMENT_NAME, spool, "application/gzip")},
+            "headers": {"X-Atlassian-Token": "no-check"},
+            "timeout": 300,
+            **_confluence_auth(),
+        }))
+
+
+def confluence_steps(meeting_id: str, summary: str, transcript_path: str) -> Steps:
+    """
+    Create a Confluence page with the meeting summary and full transcript. The
+    body is built paragraph by paragraph from the segments, escaped, and stops
+    growing at CONFLUENCE_MAX_BODY_BYTES: a longer transcript is uploaded as a
+    gzip attachment, or split across child pages of at most that size.
     """
     # Validate env vars
     required = [CONFLUENCE_BASE_URL, CONFLUENCE_USER, CONFLUENCE_API_TOKEN, CONFLUENCE_SPACE, CONFLUENCE_PARENT_ID]
     if not all(required):
         raise ValueError("Confluence environment vars incomplete. Cannot post to Confluence.")
 
-    # Read transcript text
-    transcript_text = ""
+    title = f"Meeting Summary: {meeting_id}"
+    head = summary_storage(title, summary)
+    paragraphs = (storage_paragraph(start, text)
+                  for start, text in transcript_paragraphs(_transcript_segments(transcript_path)))
+    body, size = [head], len(head.encode("utf-8"))
+    for paragraph in paragraphs:
+        size += len(paragraph.encode("utf-8"))
+        body.append(paragraph)
+        if size > CONFLUENCE_MAX_BODY_BYTES:
+            break
+    else:
+        yield from _create_page(title, "".join(body), CONFLUENCE_PARENT_ID)
+        return
+
+    if CONFLUENCE_LARGE_TRANSCRIPTS == "pages":
+        page_id = yield from _create_page(
+            title, head + '<p>The transcript is in the child pages below.</p><ac:structured-macro ac:name="children"/>',
+            CONFLUENCE_PARENT_ID)
+        # The paragraphs read so far start the first part; the rest are read as parts fill up
+        number, part, size = 1, [], 0
+        for paragraph in itertools.chain(body[1:], paragraphs):
+            if part and size + len(paragraph.encode("utf-8")) > CONFLUENCE_MAX_BODY_BYTES:
+                yield from _create_page(f"{title} (transcript part {number})", "".join(part), page_id)
+                number, part, size = number + 1, [], 0
+            part.append(paragraph)
+            size += len(paragraph.encode("utf-8"))
+        yield from _create_page(f"{title} (transcript part {number})", "".join(part), page_id)
+        return
+    page_id = yield from _create_page(
+        title, head + f'<p>The full transcript is attached: <ac:link><ri:attachment ri:filename="{ATTACHMENT_NAME}"/>'
+                      f'</ac:link></p>', CONFLUENCE_PARENT_ID)
+    yield from _attach_transcript(page_id, transcript_path)
+
+
+def publish(steps: Steps) -> None:
+    """Run a publication's requests one after another with ``requests``."""
     try:
-        with open(transcript_path, 'r') as f:
-            data = json.load(f)
-            transcript_text = data.get("text", "")
-    except Exception as e:
-        raise RuntimeError(f"Failed to read transcript: {e}")
+        request = next(steps)
+        while True:
+            request = dict(request)
+            response = requests.request(request.pop("method"), request.pop("url"), **request)
+            if response.status_code == 429 or response.status_code >= 500:
+                response.raise_for_status()
+            request = steps.send(response)
+    except StopIteration:
+        pass
+    finally:
+        steps.close()
 
-    # Build page content in Confluence storage format
-    title = f"Meeting Summary: {meeting_id}"
-    # Wrap text in simple HTML
-    summary_html = summary.replace("\n", "<br/>")
-    transcript_html = transcript_text.replace("\n", "<br/>")
-    page_body = (
-        f"<h1>{title}</h1>"
-        f"<h2>Summary</h2><p>{summary_html}</p>"
-        f"<h2>Transcript</h2><p>{transcript_html}</p>"
-    )
-
-    url = f"{CONFLUENCE_BASE_URL}/rest/api/content/"
-    headers = {"Content-Type": "application/json"}
-    payload = {
-        "type": "page",
-        "title": title,
-        "space": {"key": CONFLUENCE_SPACE},
-        "ancestors": [{"id": int(CONFLUENCE_PARENT_ID)}],
-        "body": {"storage": {"value": page_body, "representation": "storage"}}
+
+def publish_to_slack(meeting_id: str, summary: str) -> None:
+    """
+    Send the summary text to a Slack channel via Incoming Webhook.
+    """
+    publish(slack_steps(meeting_id, summary))
+
+
+def publish_to_confluence(meeting_id: str, summary: str, transcript_path: str) -> None:
+    """
+    Create a new Confluence page with the meeting summary and full transcript.
+    """
+    publish(confluence_steps(meeting_id, summary, transcript_path))
+
+
+# Publications by outbox destination (app/outbox.py): payload -> steps
+STEPS = {
+    "slack": lambda p: slack_steps(p["meeting_id"], p["summary"]),
+    "confluence": lambda p: confluence_steps(p["meeting_id"], p["summary"], p["transcript_path"]),
+}
+
+
+def destinations() -> list:
+    """The destinations whose settings are present."""
+    configured = {
+        "slack": bool(SLACK_WEBHOOK_URL),
+        "confluence": all([CONFLUENCE_BASE_URL, CONFLUENCE_USER, CONFLUENCE_API_TOKEN, CONFLUENCE_SPACE,
+                           CONFLUENCE_PARENT_ID]),
     }
-    resp = requests.post(
-        url,
-        json=payload,
-        headers=headers,
-        auth=(CONFLUENCE_USER, CONFLUENCE_API_TOKEN),
-        timeout=20
-    )
-    resp.raise_for_status() 
\ No newline at end of file
+    return [name for name, ok in configured.items() if ok]
@@ -0,0 +1,403 @@
+"""
+Rate limiting and a daily cost budget for OpenAI calls.
+
+Every request the chat model sends goes through RateLimitedTransport, the httpx
+transport of the client openai_client() gives ChatOpenAI (cache hits never
+reach it). Before a request is
+sent its tokens are estimated (prompt plus max_tokens, which is what OpenAI
+counts against TPM) and taken from two token buckets, requests per minute and
+tokens per minute. The buckets live in this process by default, or in the
+``rate_limit_state`` table with RATE_LIMIT_BACKEND=db so every worker shares
+them.
+
+A 429 pauses all callers for as long as the response asks (Retry-After and
+the x-ratelimit-reset headers), or an exponential backoff, and halves the
+rate this process uses; successful requests win it back gradually. 5xx
+responses and connection errors are retried with the same backoff.
+
+With OPENAI_DAILY_BUDGET set (dollars, priced by OPENAI_COST_PER_TOKEN), a
+request's estimated cost is reserved before sending and settled to the
+actual usage after. A request that would go over the budget raises
+BudgetExhausted instead of being sent: the summary fails, keeping its
+transcript, and the catch-up loop retries it once the budget resets at
+midnight UTC, rather than the pipeline thread sleeping until then.
+"""
+
+import datetime
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import httpx
+
+OPENAI_RPM = float(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = float(os.getenv("OPENAI_TPM", "30000"))
+OPENAI_DAILY_BUDGET = float(os.getenv("OPENAI_DAILY_BUDGET", "0")) # dollars per UTC day; 0 = no budget
+OPENAI_RETRIES = int(os.getenv("OPENAI_RETRIES", "8"))             # 429/5xx retries per request
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")      # memory (per process) | db (all workers)
+MAX_BACKOFF_SECONDS = 60.0
+MIN_RATE_SCALE = 0.1
+
+# bucket name -> (amount to take, refill per second, capacity)
+Buckets = Dict[str, Tuple[float, float, float]]
+
+
+class BudgetExhausted(Exception):
+    """The daily budget has no room for the request; it can be retried after midnight UTC."""
+
+
+def _day(now: float) -> str:
+    return datetime.datetime.fromtimestamp(now, datetime.timezone.utc).date().isoformat()
+
+
+def _seconds_to_midnight(now: float) -> float:
+    return 86400 - now % 86400
+
+
+class MemoryState:
+    """Buckets, pause deadline and daily spend for this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._levels: Dict[str, Tuple[float, float]] = {}  # name -> (level, updated_at)
+        self._paused_until = 0.0
+        self._spend: Dict[str, float] = {}
+
+    def take(self, buckets: Buckets, now: float) -> float:
+        """Take from every bucket and return 0, or take nothing and return the seconds to wait."""
+        with self._lock:
+            levels, wait = {}, 0.0
+            for name, (amount, rate, capacity) in buckets.items():
+                level, updated = self._levels.get(name, (capacity, now))
+                level = min(capacity, level + (now - updated) * rate)
+                levels[name] = level
+                # A request larger than the whole bucket goes once the bucket is full
+                needed = min(amount, capacity)
+                if level < needed:
+                    wait = max(wait, (needed - level) / rate)
+            if wait == 0:
+                for name, (amount, _, _) in buckets.items():
+                    self._levels[name] = (levels[name] - amount, now)
+            return wait
+
+    def pause(self, until: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, until)
+
+    def paused_until(self) -> float:
+        return self._paused_until
+
+    def spent(self, day: str) -> float:
+        return self._spend.get(day, 0.0)
+
+    def reserve(self, day: str, cost: float, budget: float) -> bool:
+        with self._lock:
+            if self._spend.get(day, 0.0) + cost > budget:
+                return False
+            self._spend[day] = self._spend.get(day, 0.0) + cost
+            return True
+
+    def add_spend(self, day: str, cost: float):
+        with self._lock:
+            self._spend[day] = self._spend.get(day, 0.0) + cost
+
+
+class DBState:
+    """
+    The same state in the rate_limit_state table, shared by every worker. Each
+    operation is a conditional UPDATE, so it is atomic on Postgres (row locks
+    until commit) and on SQLite (one writer at a time), as in app/jobs.py.
+    """
+
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    def _ensure(self, db, name: str, level: float, now: float):
+        from sqlalchemy.exc import IntegrityError
+        from .models import RateLimitState
+        if db.get(RateLimitState, name) is None:
+            try:
+                db.add(RateLimitState(name=name, level=level, updated_at=now))
+                db.commit()
+            except IntegrityError:
+                db.rollback()  # another worker created it
+
+    def take(self, buckets: Buckets, now: float) -> float:
+        from sqlalchemy import case, update
+        from .models import RateLimitState
+        db = self.session_factory()
+        try:
+            for name, (_, _, capacity) in buckets.items():
+                self._ensure(db, name, capacity, now)
+            wait = 0.0
+            for name, (amount, rate, capacity) in buckets.items():
+                refilled = RateLimitState.level + (now - RateLimitState.updated_at) * rate
+                level = case((refilled > capacity, capacity), else_=refilled)
+                rows = db.execute(
+                    update(RateLimitState)
+                    .where(RateLimitState.name == name, level >= min(amount, capacity))
+                    .values(level=level - amount, updated_at=now)
+                ).rowcount
+                if rows != 1:
+                    current = db.get(RateLimitState, name)
+                    current_level = min(capacity, current.level + (now - current.updated_at) * rate)
+                    wait = max((min(amount, capacity) - current_level) / rate, 0.001)
+                    break
+            if wait:
+                db.rollback()
+            else:
+                db.commit()
+            return wait
+        finally:
+            db.close()
+
+    def pause(self, until: float):
+        from sqlalchemy import update
+        from .models import RateLimitState
+        db = self.session_factory()
+        try:
+            self._ensure(db, "pause", 0.0, until)
+            db.execute(update(RateLimitState).where(RateLimitState.name == "pause", RateLimitState.level < until)
+                       .values(level=until))
+            db.commit()
+        finally:
+            db.close()
+
+    def paused_until(self) -> float:
+        from .models import RateLimitState
+        db = self.session_factory()
+        try:
+            row = db.get(RateLimitState, "pause")
+            return row.level if row else 0.0
+        finally:
+            db.close()
+
+    def spent(self, day: str) -> float:
+        from .models import RateLimitState
+        db = self.session_factory()
+        try:
+            row = db.get(RateLimitState, f"spend:{day}")
+            return row.level if row else 0.0
+        finally:
+            db.close()
+
+    def reserve(self, day: str, cost: float, budget: float) -> bool:
+        from sqlalchemy import update
+        from .models import RateLimitState
+        db = self.session_factory()
+        try:
+            self._ensure(db, f"spend:{day}", 0.0, time.time())
+            rows = db.execute(
+                update(RateLimitState)
+                .where(RateLimitState.name == f"spend:{day}", RateLimitState.level + cost <= budget)
+                .values(level=RateLimitState.level + cost)
+            ).rowcount
+            db.commit()
+            return rows == 1
+        finally:
+            db.close()
+
+    def add_spend(self, day: str, cost: float):
+        from sqlalchemy import update
+        from .models import RateLimitState
+        db = self.session_factory()
+        try:
+            self._ensure(db, f"spend:{day}", 0.0, time.time())
+            db.execute(update(RateLimitState).where(RateLimitState.name == f"spend:{day}")
+                       .values(level=RateLimitState.level + cost))
+            db.commit()
+        finally:
+            db.close()
+
+
+def _duration(value: str) -> Optional[float]:
+    """Seconds in an x-ratelimit-reset value such as "20ms", "1.5s" or "6m0s"."""
+    parts = re.findall(r"([\d.]+)(ms|s|m|h)", value or "")
+    if not parts:
+        return None
+    unit = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * unit[suffix] for number, suffix in parts)
+
+
+class Limiter:
+    """Token buckets, 429 pauses and the daily budget, in front of every OpenAI request."""
+
+    def __init__(self, rpm: float = None, tpm: float = None, daily_budget: float = None, cost_per_token: float = None,
+                 state=None, clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        self.rpm = rpm if rpm is not None else OPENAI_RPM
+        self.tpm = tpm if tpm is not None else OPENAI_TPM
+        self.daily_budget = daily_budget if daily_budget is not None else OPENAI_DAILY_BUDGET
+        self.cost_per_token = (cost_per_token if cost_per_token is not None
+                               else float(os.getenv("OPENAI_COST_PER_TOKEN", "0")))
+        self.state = state or MemoryState()
+        self.clock = clock
+        self.sleep = sleep
+        self.scale = 1.0  # share of rpm/tpm used; halved on a 429
+        self._lock = threading.Lock()
+
+    def estimate(self, body: dict) -> int:
+        """Prompt tokens plus the completion limit, as OpenAI counts them against TPM."""
+        from .chunking import SUMMARY_MAX_OUTPUT_TOKENS, count_tokens
+        model = body.get("model", "gpt-4o")
+        prompt = 0
+        for message in body.get("messages", []):
+            content = message.get("content")
+            text = content if isinstance(content, str) else json.dumps(content)
+            prompt += count_tokens(text or "", model) + 4  # per-message framing
+        return prompt + int(body.get("max_tokens") or SUMMARY_MAX_OUTPUT_TOKENS)
+
+    def acquire(self, tokens: int) -> float:
+        """
+        Wait for the rate limits; returns the cost reserved against the budget.
+        Raises BudgetExhausted if the request would go over the daily budget.
+        """
+        cost = tokens * self.cost_per_token
+        while True:
+            now = self.clock()
+            wait = self.state.paused_until() - now
+            if wait <= 0 and self.daily_budget and self.state.spent(_day(now)) + cost > self.daily_budget:
+                hours = _seconds_to_midnight(now) / 3600
+                raise BudgetExhausted(f"Daily OpenAI budget of ${self.daily_budget:.2f} reached; "
+                                      f"retry after it resets at midnight UTC (in {hours:.1f}h)")
+            if wait <= 0:
+                buckets = {
+                    "requests": (1, self.rpm * self.scale / 60, self.rpm),
+                    "tokens": (tokens, self.tpm * self.scale / 60, self.tpm),
+                }
+                wait = self.state.take(buckets, now)
+                if wait <= 0:
+                    if not self.daily_budget or not cost:
+                        return 0.0
+                    if self.state.reserve(_day(now), cost, self.daily_budget):
+                        return cost
+                    continue  # another request got the last of the budget
+            self.sleep(wait)
+
+    def budget_exhausted(self) -> bool:
+        return bool(self.daily_budget) and self.state.spent(_day(self.clock())) >= self.daily_budget
+
+    def settle(self, reserved: float, total_tokens: Optional[int]):
+        """Replace a reservation by what the request actually cost."""
+        if total_tokens is None:
+            return
+        actual = total_tokens * self.cost_per_token
+        if self.daily_budget and reserved:
+            self.state.add_spend(_day(self.clock()), actual - reserved)
+        elif actual:
+            self.state.add_spend(_day(self.clock()), actual)
+        with self._lock:
+            self.scale = min(1.0, self.scale + 0.05)
+
+    def refund(self, reserved: float):
+        if reserved:
+            self.state.add_spend(_day(self.clock()), -reserved)
+
+    def backoff(self, response: Optional[httpx.Response], attempt: int, throttled: bool) -> float:
+        """Seconds to wait before retrying; a 429 also pauses every caller and slows this process down."""
+        delay = None
+        if response is not None:
+            headers = response.headers
+            if headers.get("retry-after-ms"):
+                delay = float(headers["retry-after-ms"]) / 1000
+            elif headers.get("retry-after", "").replace(".", "", 1).isdigit():
+                delay = float(headers["retry-after"])
+            else:
+                resets = [_duration(headers.get(h)) for h in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")]
+                resets = [r for r in resets if r is not None]
+                delay = max(resets) if resets else None
+        if delay is None:
+            delay = min(MAX_BACKOFF_SECONDS, 2 ** attempt) * (0.5 + random.random() / 2)
+        delay = min(delay, MAX_BACKOFF_SECONDS)
+        if throttled:
+            self.state.pause(self.clock() + delay)
+            with self._lock:
+                self.scale = max(MIN_RATE_SCALE, self.scale / 2)
+        return delay
+
+
+class RateLimitedTransport(httpx.BaseTransport):
+    """httpx transport that sends chat completions through a Limiter, retrying 429s and 5xx."""
+
+    def __init__(self, limiter: Limiter, transport: httpx.BaseTransport = None, retries: int = None):
+        self.limiter = limiter
+        self.transport = transport or httpx.HTTPTransport()
+        self.retries = retries if retries is not None else OPENAI_RETRIES
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not request.url.path.endswith("/chat/completions"):
+            return self.transport.handle_request(request)
+        body = json.loads(request.read() or b"{}")
+        tokens = self.limiter.estimate(body)
+        for attempt in range(self.retries + 1):
+            reserved = self.limiter.acquire(tokens)
+            try:
+                response = self.transport.handle_request(request)
+            except httpx.TransportError:
+                self.limiter.refund(reserved)
+                if attempt == self.retries:
+                    raise
+                self.limiter.sleep(self.limiter.backoff(None, attempt, throttled=False))
+                continue
+            retryable = response.status_code == 429 or response.status_code >= 500
+            if retryable and attempt < self.retries:
+                response.read()
+                response.close()
+                self.limiter.refund(reserved)
+                delay = self.limiter.backoff(response, attempt, throttled=response.status_code == 429)
+                print(f"OpenAI returned {response.status_code}; retrying in {delay:.1f}s")
+                if response.status_code != 429:
+                    self.limiter.sleep(delay)
+                continue
+            if response.status_code != 200:
+                self.limiter.refund(reserved)
+            elif not body.get("stream"):
+                # Streamed responses are left unread and carry no usage, so their estimate stays charged
+                response.read()
+                usage = json.loads(response.content or b"{}").get("usage") or {}
+                self.limiter.settle(reserved, usage.get("total_tokens"))
+            return response
+
+    def close(self):
+        self.transport.close()
+
+
+_limiter: Optional[Limiter] = None
+_http_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+def get_limiter() -> Limiter:
+    global _limiter
+    with _client_lock:
+        if _limiter is None:
+            state = None
+            if os.getenv("RATE_LIMIT_BACKEND", RATE_LIMIT_BACKEND) == "db":
+                from .db import SessionLocal
+                state = DBState(SessionLocal)
+            _limiter = Limiter(state=state)
+        return _limiter
+
+
+def get_http_client() -> httpx.Client:
+    """Process-wide httpx client whose requests are rate limited by get_limiter()."""
+    global _http_client
+    limiter = get_limiter()
+    with _client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(transport=RateLimitedTransport(limiter),
+                                        timeout=httpx.Timeout(600.0, connect=5.0))
+        return _http_client
+
+
+def openai_client(api_key: str):
+    """
+    Chat completions client for ChatOpenAI(client=...) that sends through get_http_client().
+    OpenAI's own retries are off: the transport retries, and pauses other callers too.
+    """
+    import openai
+    return openai.OpenAI(api_key=api_key, base_url=os.getenv("OPENAI_API_BASE") or None,
+                         max_retries=0, http_client=get_http_client()).chat.completions
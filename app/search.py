@@ -0,0 +1,235 @@
+"""
+Full-text search over transcripts and summaries.
+
+Transcripts are indexed as passages of consecutive segments (about
+SEARCH_PASSAGE_SECONDS each), so a match comes back with the time range it was
+said in; a summary is a single passage. Passages live in ``search_passages``
+and the database's own full-text engine indexes them: FTS5 on SQLite, a
+tsvector column with a GIN index on Postgres (see app/models.py). The index is
+updated as recordings are transcribed and summarised.
+
+Query cost is bounded however large the corpus grows: only the newest
+SEARCH_SCAN_LIMIT matching passages are ranked (which only matters for terms
+that occur nearly everywhere), and the SEARCH_MAX_CANDIDATES best of those are
+grouped by recording; pages beyond those candidates come back empty. When
+either limit cuts matches off, the response says ``truncated`` and its
+``total`` is a lower bound rather than the number of matching recordings.
+"""
+
+import os
+import re
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, delete, text
+from sqlalchemy.orm import Session
+
+from .models import Recording, SearchPassage
+
+SEARCH_PASSAGE_SECONDS = float(os.getenv("SEARCH_PASSAGE_SECONDS", "30"))
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "1000"))
+SEARCH_SCAN_LIMIT = int(os.getenv("SEARCH_SCAN_LIMIT", "5000"))
+SEARCH_HITS_PER_RECORDING = int(os.getenv("SEARCH_HITS_PER_RECORDING", "3"))
+
+KIND_TRANSCRIPT = "transcript"
+KIND_SUMMARY = "summary"
+
+
+def build_passages(segments: Iterable[dict], passage_seconds: float = None) -> List[Tuple[float, float, str]]:
+    """Group consecutive segments into (start, end, text) passages of about ``passage_seconds``."""
+    passage_seconds = passage_seconds or SEARCH_PASSAGE_SECONDS
+    passages = []
+    start = end = None
+    parts: List[str] = []
+    for seg in segments:
+        if parts and seg["end"] - start > passage_seconds:
+            passages.append((start, end, "".join(parts).strip()))
+            parts = []
+        if not parts:
+            start = seg["start"]
+        parts.append(seg["text"])
+        end = seg["end"]
+    if parts:
+        passages.append((start, end, "".join(parts).strip()))
+    return [p for p in passages if p[2]]
+
+
+def _replace_passages(db: Session, recording_id: int, kind: str, passages: List[Tuple[Optional[float], Optional[float], str]]):
+    db.execute(delete(SearchPassage).where(SearchPassage.recording_id == recording_id, SearchPassage.kind == kind))
+    db.add_all(
+        SearchPassage(recording_id=recording_id, kind=kind, start_seconds=start, end_seconds=end, body=body)
+        for start, end, body in passages
+    )
+
+
+def index_transcript(db: Session, recording_id: int, transcript_path: str):
+    """(Re)index a recording's transcript. Does not commit."""
+    from .transcript_store import load_segments
+    _replace_passages(db, recording_id, KIND_TRANSCRIPT, build_passages(load_segments(transcript_path)))
+
+
+def index_summary(db: Session, recording_id: int, summary: Optional[str]):
+    """(Re)index a recording's summary. Does not commit."""
+    passages = [(None, None, summary.strip())] if summary and summary.strip() else []
+    _replace_passages(db, recording_id, KIND_SUMMARY, passages)
+
+
+def index_recording(db: Session, rec: Recording):
+    """Bring the index up to date with a recording's transcript and summary, and commit."""
+    if rec.transcript_path:
+        index_transcript(db, rec.id, rec.transcript_path)
+    index_summary(db, rec.id, rec.summary)
+    db.commit()
+
+
+def try_index_recording(db: Session, rec: Recording):
+    """index_recording for the processing pipeline: search is best effort, never fails a job."""
+    try:
+        index_recording(db, rec)
+    except Exception as e:
+        print(f"Failed to update search index for {rec.meeting_id}: {e}")
+        db.rollback()
+
+
+def try_index_summary(db: Session, rec: Recording):
+    """Reindex just the summary of a recording whose transcript is already indexed; best effort, like try_index_recording."""
+    try:
+        index_summary(db, rec.id, rec.summary)
+        db.commit()
+    except Exception as e:
+        print(f"Failed to update search index for {rec.meeting_id}: {e}")
+        db.rollback()
+
+
+def reindex_all(db: Session) -> int:
+    """Rebuild the index for every recording; returns the number indexed."""
+    count = 0
+    for rec in db.query(Recording).filter((Recording.transcript_path != None) | (Recording.summary != None)):
+        try:
+            index_recording(db, rec)
+            count += 1
+        except FileNotFoundError:
+            print(f"Transcript for {rec.meeting_id} is missing; skipped")
+            db.rollback()
+    return count
+
+
+def query_terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+def _candidates(db: Session, terms: List[str]) -> Tuple[List[Tuple[int, int, float]], bool]:
+    """
+    (passage id, recording id, score) of the best matching passages, best
+    first, and whether the scan or candidate limit left matches out.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        # Only finds whether there are more matches than are ranked; counting them all would cost as much
+        over_scan = db.execute(
+            text("SELECT 1 FROM search_passages WHERE body_tsv @@ plainto_tsquery('english', :q) "
+                 "ORDER BY id DESC OFFSET :scan LIMIT 1"),
+            {"q": " ".join(terms), "scan": SEARCH_SCAN_LIMIT},
+        ).scalar() is not None
+        # ts_rank has to detoast each tsvector: rank only the newest matches
+        sql = text(
+            "SELECT id, recording_id, ts_rank(body_tsv, q) AS score FROM ("
+            "  SELECT p.id, p.recording_id, p.body_tsv, q FROM search_passages p, plainto_tsquery('english', :q) q"
+            "  WHERE p.body_tsv @@ q ORDER BY p.id DESC LIMIT :scan"
+            ") newest ORDER BY score DESC LIMIT :limit"
+        )
+        # One candidate more than is kept tells whether the limit cut any off
+        params = {"q": " ".join(terms), "scan": SEARCH_SCAN_LIMIT, "limit": SEARCH_MAX_CANDIDATES + 1}
+        rows = [tuple(row) for row in db.execute(sql, params)]
+        return rows[:SEARCH_MAX_CANDIDATES], over_scan or len(rows) > SEARCH_MAX_CANDIDATES
+
+    # Every term quoted, so user input can't form FTS5 query syntax
+    match = " ".join(f'"{t}"' for t in terms)
+    # Walking a doclist in rowid order is cheap, scoring every entry is not: find
+    # the rowid of the SEARCH_SCAN_LIMIT-th newest match and rank from there on
+    # (the one after it only tells whether older matches were left out)
+    oldest, *older = db.execute(
+        text("SELECT rowid FROM search_passages_fts WHERE search_passages_fts MATCH :q "
+             "ORDER BY rowid DESC LIMIT 2 OFFSET :scan"),
+        {"q": match, "scan": SEARCH_SCAN_LIMIT - 1},
+    ).scalars().all() or [None]
+    # bm25() is lower-is-better; negate it so both dialects rank higher-is-better
+    sql = text(
+        "SELECT h.id, p.recording_id, h.score FROM ("
+        "  SELECT rowid AS id, -bm25(search_passages_fts) AS score FROM search_passages_fts"
+        "  WHERE search_passages_fts MATCH :q AND rowid >= :oldest ORDER BY score DESC LIMIT :limit"
+        ") h JOIN search_passages p ON p.id = h.id ORDER BY h.score DESC"
+    )
+    params = {"q": match, "oldest": oldest or 0, "limit": SEARCH_MAX_CANDIDATES + 1}
+    rows = [tuple(row) for row in db.execute(sql, params)]
+    return rows[:SEARCH_MAX_CANDIDATES], bool(older) or len(rows) > SEARCH_MAX_CANDIDATES
+
+
+def _snippets(db: Session, terms: List[str], passage_ids: List[int]) -> dict:
+    """passage id -> (kind, start, end, highlighted snippet)."""
+    if not passage_ids:
+        return {}
+    if db.get_bind().dialect.name == "postgresql":
+        sql = text(
+            "SELECT id, kind, start_seconds, end_seconds, "
+            "ts_headline('english', body, plainto_tsquery('english', :q), "
+            "'StartSel=<b>, StopSel=</b>, MaxWords=30, MinWords=10') "
+            "FROM search_passages WHERE id IN :ids"
+        )
+        params = {"q": " ".join(terms)}
+    else:
+        sql = text(
+            "SELECT p.id, p.kind, p.start_seconds, p.end_seconds, "
+            "snippet(search_passages_fts, 0, '<b>', '</b>', '…', 24) "
+            "FROM search_passages_fts JOIN search_passages p ON p.id = search_passages_fts.rowid "
+            "WHERE search_passages_fts MATCH :q AND search_passages_fts.rowid IN :ids"
+        )
+        params = {"q": " ".join(f'"{t}"' for t in terms)}
+    sql = sql.bindparams(bindparam("ids", expanding=True))
+    return {row[0]: tuple(row[1:]) for row in db.execute(sql, dict(params, ids=passage_ids))}
+
+
+def search(db: Session, query: str, page: int = 1, page_size: int = 20) -> dict:
+    """
+    Recordings matching ``query`` (all terms must appear in one passage), best
+    first, with up to SEARCH_HITS_PER_RECORDING matching passages each. With
+    ``truncated`` set, more passages matched than were ranked and ``total``
+    only counts the recordings among those that were.
+    """
+    terms = query_terms(query)
+    response = {"query": query, "page": page, "page_size": page_size, "total": 0, "truncated": False,
+                "results": []}
+    if not terms:
+        return response
+
+    # Group candidate passages by recording, keeping the best-first order
+    grouped = {}
+    candidates, truncated = _candidates(db, terms)
+    for passage_id, recording_id, score in candidates:
+        entry = grouped.setdefault(recording_id, {"score": score, "passages": []})
+        entry["passages"].append(passage_id)
+    response["total"] = len(grouped)
+    response["truncated"] = truncated
+    page_ids = list(grouped)[(page - 1) * page_size:page * page_size]
+    if not page_ids:
+        return response
+
+    shown = [pid for rid in page_ids for pid in grouped[rid]["passages"][:SEARCH_HITS_PER_RECORDING]]
+    snippets = _snippets(db, terms, shown)
+    recordings = {rec.id: rec for rec in db.query(Recording).filter(Recording.id.in_(page_ids))}
+    for rid in page_ids:
+        rec = recordings.get(rid)
+        if rec is None:
+            continue
+        hits = []
+        for pid in grouped[rid]["passages"][:SEARCH_HITS_PER_RECORDING]:
+            kind, start, end, snippet = snippets[pid]
+            hits.append({"kind": kind, "start": start, "end": end, "snippet": snippet})
+        response["results"].append({
+            "recording_id": rid,
+            "meeting_id": rec.meeting_id,
+            "platform": rec.platform,
+            "received_at": rec.received_at.isoformat() if rec.received_at else None,
+            "score": grouped[rid]["score"],
+            "matches": len(grouped[rid]["passages"]),
+            "hits": hits,
+        })
+    return response
@@ -6,40 +6,65 @@ import ssl
 ssl._create_default_https_context = ssl._create_unverified_context
 
 import os
+import importlib
 import subprocess
-import tempfile
+import time
 from pathlib import Path
-import requests
+from typing import Callable, Union
+import numpy as np
 from sqlalchemy.orm import Session
-import whisper
-import json
-
-from langchain.chat_models import ChatOpenAI
-from langchain.chains.summarize import load_summarize_chain
-from langchain.docstore.document import Document
-from langchain.prompts import PromptTemplate
-from langchain.text_splitter import CharacterTextSplitter
-from langchain.callbacks import get_openai_callback
 
+from . import chunking
 from .db import SessionLocal
 from .models import Recording, SummaryMetrics
+from .transcript_store import load_text
 
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "tiny.en")
+TRANSCRIBE_BACKEND = os.getenv("TRANSCRIBE_BACKEND", "whisper") # whisper | whisper-int8 | faster-whisper (app.backends)
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o") # Or "gpt-3.5-turbo"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+SUMMARY_STRATEGY = os.getenv("SUMMARY_STRATEGY", "refine") # refine (sequential) | map_reduce (concurrent chunk summaries)
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4")) # map_reduce: LLM calls in flight at once
+SUMMARY_ENGINE = os.getenv("SUMMARY_ENGINE", "llm") # llm | extractive (local, app.extractive) | auto (route_engine)
+SUMMARY_EXTRACTIVE_MAX_MINUTES = float(os.getenv("SUMMARY_EXTRACTIVE_MAX_MINUTES", "10")) # auto: shorter meetings go extractive
+
+# Whisper weights load on first use (app.transcription.get_model) and LangChain is
+# imported on first summary, so importing this module stays cheap.
+_LANGCHAIN_IMPORTS = {
+    "ChatOpenAI": "langchain.chat_models",
+    "load_summarize_chain": "langchain.chains.summarize",
+    "Document": "langchain.docstore.document",
+    "PromptTemplate": "langchain.prompts",
+    "get_openai_callback": "langchain.callbacks",
+}
+
+
+def _load_langchain():
+    # Names already bound (e.g. patched by tests) are left alone
+    namespace = globals()
+    for name, module in _LANGCHAIN_IMPORTS.items():
+        if name not in namespace:
+            namespace[name] = getattr(importlib.import_module(module), name)
+
+
+def __getattr__(name):
+    if name in _LANGCHAIN_IMPORTS:
+        _load_langchain()
+        return globals()[name]
+    if name == "model":
+        from .transcription import get_model
+        return get_model(WHISPER_MODEL)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-model = whisper.load_model(WHISPER_MODEL)
 
 AUDIO_DIR = Path(os.getenv("AUDIO_DIR", "./audio_cache"))
 AUDIO_DIR.mkdir(exist_ok=True)
 
 
 def download_file(url: str, dest: Path):
-    resp = requests.get(url, stream=True, timeout=60)
-    resp.raise_for_status()
-    with open(dest, "wb") as f:
-        for chunk in resp.iter_content(1024 * 1024):
-            f.write(chunk)
+    # Pooled connections, concurrent ranges for large files, resume on failure
+    from .downloader import download
+    download(url, dest)
 
 
 def extract_audio(video_path: Path, audio_path: Path):
@@ -57,29 +82,283 @@ def extract_audio(video_path: Path, audio_path: Path):
     subprocess.run(cmd, check=True, capture_output=True)
 
 
-def transcribe(audio_path: Path) -> dict:
-    return model.transcribe(str(audio_path))
+def transcribe(audio: Union[Path, np.ndarray]) -> dict:
+    # Accepts a path to an audio file or 16 kHz mono float32 samples (see app.audio)
+    from . import transcription
+    from .backends import get_backend
+    if os.getenv("WHISPER_SERVER_ADDRESS"):
+        # Weights live in a long-lived model server on this host (app.model_server)
+        from .model_server import transcribe_remote
+        return transcribe_remote(audio)
+    if transcription.WHISPER_WORKERS > 1:
+        # Silence-aligned windows across a pool of model-loaded worker processes
+        return transcription.transcribe_chunked(audio, WHISPER_MODEL, backend=TRANSCRIBE_BACKEND)
+    return get_backend(WHISPER_MODEL, TRANSCRIBE_BACKEND).transcribe(audio)
+
+# Output format shared by the refine prompt and the map_reduce final reduce
+SUMMARY_FORMAT = (
+    "The final summary MUST be formatted as follows:\n"
+    "1.  A section titled '**Key Decisions (5 bullet points):**' listing exactly five key decisions made."
+    "    If fewer than five decisions are evident, note this explicitly.\n"
+    "2.  A section titled '**Action Items:**' listing all actionable tasks, with assigned owners if mentioned.\n"
+)
+
+COLLAPSE_TEMPLATE = """The following are summaries of consecutive parts of one meeting transcript:
+
+{text}
+
+Combine them into a single concise summary. Keep every decision and action item, with owners if mentioned.
 
-def generate_summary(transcript_path: str, recording_id: int = None) -> str:
+CONCISE SUMMARY:"""
+
+# map_reduce of a transcript that fits one chunk: summarised straight into the final format
+SINGLE_CHUNK_TEMPLATE = (
+    "Your job is to produce a final summary of a meeting transcript:\n"
+    "------------\n"
+    "{text}\n"
+    "------------\n"
+    + SUMMARY_FORMAT
+)
+
+REDUCE_TEMPLATE = (
+    "Your job is to produce a final summary of a meeting transcript.\n"
+    "Below are summaries of consecutive parts of the meeting, in order:\n"
+    "------------\n"
+    "{text}\n"
+    "------------\n"
+    "Write one summary covering the entire meeting.\n"
+    + SUMMARY_FORMAT
+)
+
+
+def _complete(llm, prompts: list, return_exceptions: bool = False) -> list:
+    # Runnable.batch runs the calls on a pool of SUMMARY_CONCURRENCY threads and
+    # carries the caller's callbacks (token counting) into them
+    concurrency = int(os.getenv("SUMMARY_CONCURRENCY", SUMMARY_CONCURRENCY))
+    replies = llm.batch(prompts, config={"max_concurrency": max(1, concurrency)}, return_exceptions=return_exceptions)
+    return [reply if isinstance(reply, Exception) else reply.content for reply in replies]
+
+
+def _collapse_groups(summaries: list, max_tokens: int, count_tokens: Callable[[str], int]) -> list:
+    """Pack consecutive summaries into groups of at most max_tokens (and at least two each)."""
+    groups, current, size = [], [], 0
+    for summary, tokens in zip(summaries, map(count_tokens, summaries)):
+        if len(current) >= 2 and size + tokens > max_tokens:
+            groups.append(current)
+            current, size = [], 0
+        current.append(summary)
+        size += tokens
+    if len(current) == 1 and groups:
+        groups[-1].extend(current)
+    elif current:
+        groups.append(current)
+    return groups
+
+
+def summarize_map_reduce(llm, texts: list, map_prompt, max_tokens: int, count_tokens: Callable[[str], int],
+                         checkpoint=None) -> str:
+    """
+    Summarise each chunk concurrently, then reduce the chunk summaries into the
+    Key Decisions / Action Items format. Summaries over ``max_tokens`` together
+    are first collapsed group by group (also concurrently), as often as needed.
+    Finished chunk summaries are checkpointed, so a retry only maps the rest.
+    A single chunk is summarised in one call, with no reduce.
+    """
+    if len(texts) == 1:
+        return _complete(llm, [SINGLE_CHUNK_TEMPLATE.format(text=texts[0])])[0]
+    state = (checkpoint.load() if checkpoint else None) or {"summaries": {}}
+    done = {int(i): summary for i, summary in state["summaries"].items()}
+    todo = [i for i in range(len(texts)) if i not in done]
+    if done:
+        print(f"Resuming map_reduce summary: {len(done)} of {len(texts)} chunks already summarised")
+    replies = _complete(llm, [map_prompt.format(text=texts[i]) for i in todo], return_exceptions=True)
+    done.update((i, reply) for i, reply in zip(todo, replies) if not isinstance(reply, Exception))
+    if checkpoint:
+        checkpoint.save(len(done), {"summaries": done})
+    errors = [reply for reply in replies if isinstance(reply, Exception)]
+    if errors:
+        raise errors[0]
+
+    summaries = [done[i] for i in range(len(texts))]
+    while len(summaries) > 1 and count_tokens("\n\n".join(summaries)) > max_tokens:
+        groups = _collapse_groups(summaries, max_tokens, count_tokens)
+        summaries = _complete(llm, [COLLAPSE_TEMPLATE.format(text="\n\n".join(g)) for g in groups])
+    return _complete(llm, [REDUCE_TEMPLATE.format(text="\n\n".join(summaries))])[0]
+
+
+def summarize_refine(llm, docs: list, prompt, refine_prompt, checkpoint=None) -> str:
+    """
+    The refine chain, one chunk at a time, checkpointing the running summary after
+    each so a retry continues from the last chunk that completed.
+    """
+    state = (checkpoint.load() if checkpoint else None) or {"done": 0, "summary": None}
+    done, summary = state["done"], state["summary"]
+    if done:
+        print(f"Resuming refine summary at chunk {done + 1} of {len(docs)}")
+    for i in range(done, len(docs)):
+        # Later chunks start from the running summary, exactly as the refine step would
+        question_prompt = prompt if summary is None else refine_prompt.partial(existing_answer=summary)
+        chain = load_summarize_chain(
+            llm,
+            chain_type="refine",
+            question_prompt=question_prompt,
+            refine_prompt=refine_prompt,
+            return_intermediate_steps=False, # Set to True to see intermediate steps
+            input_key="input_documents",
+            output_key="output_text",
+        )
+        summary = chain({"input_documents": [docs[i]]})["output_text"]
+        if checkpoint:
+            checkpoint.save(i + 1, {"done": i + 1, "summary": summary})
+    return summary
+
+
+class SummaryError(Exception):
+    """Summarisation failed; the recording is marked summary_status="failed" and retried later."""
+
+
+def _record_metrics(recording_id: int, cb, hits, compaction_saved: int = 0, engine: str = "llm",
+                    latency: float = None):
+    try:
+        session = SessionLocal()
+        cost_per_token = float(os.getenv("OPENAI_COST_PER_TOKEN", "0"))
+        session.add(SummaryMetrics(
+            recording_id=recording_id,
+            prompt_tokens=cb.prompt_tokens if cb else 0,
+            completion_tokens=cb.completion_tokens if cb else 0,
+            total_tokens=cb.total_tokens if cb else 0,
+            cost=cb.total_tokens * cost_per_token if cb else 0.0,  # cache hits are free
+            cache_hits=hits.hits if hits else 0,
+            cached_tokens=hits.tokens if hits else 0,
+            compaction_saved_tokens=compaction_saved,
+            engine=engine,
+            latency_seconds=latency,
+        ))
+        session.commit()
+    except Exception as e:
+        print(f"Failed to record metrics for {recording_id}: {e}")
+        session.rollback()
+    finally:
+        session.close()
+
+
+def _summary_failed(recording_id: int, error: str) -> SummaryError:
+    """Store the failure as the recording's state, not as summary text, so the catch-up loop retries it."""
+    if recording_id is None:
+        return SummaryError(error)
+    session = SessionLocal()
+    try:
+        session.query(Recording).filter(Recording.id == recording_id).update(
+            {"summary_status": "failed", "summary_error": error}, synchronize_session=False)
+        session.commit()
+    except Exception as e:
+        print(f"Failed to mark summary failed for {recording_id}: {e}")
+        session.rollback()
+    finally:
+        session.close()
+    return SummaryError(error)
+
+
+def _budget_exhausted(error: BaseException):
+    """The BudgetExhausted behind an error, if any; the OpenAI client wraps transport errors."""
+    from .rate_limit import BudgetExhausted
+    while error is not None:
+        if isinstance(error, BudgetExhausted):
+            return error
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def store_summary(db: Session, rec: Recording, summary_text: str):
+    """Save a finished summary on the recording and queue it for Slack and Confluence, in one commit."""
+    from .outbox import enqueue_summary
+    rec.summary = summary_text
+    rec.summary_status = "done"
+    rec.summary_error = None
+    # The outbox publisher sends it (app/outbox.py); a summary is never stored without being queued
+    queued = enqueue_summary(db, rec.meeting_id, summary_text, rec.transcript_path, rec.id)
+    db.commit()
+    print(f"Queued summary of {rec.meeting_id} for {', '.join(queued) or 'no new destinations'}")
+
+
+def meeting_minutes(segments: list) -> float:
+    """Length of the meeting from segment timestamps, or from the word count at 150 wpm without them."""
+    if segments and "end" in segments[-1]:
+        return (segments[-1]["end"] - segments[0].get("start", 0)) / 60
+    return sum(len(s["text"].split()) for s in segments) / 150
+
+
+def route_engine(segments: list, api_key: str) -> str:
+    """SUMMARY_ENGINE=auto: summarise locally when there is no key, the meeting is short or the budget is spent."""
+    if not api_key:
+        return "extractive"
+    if meeting_minutes(segments) < float(os.getenv("SUMMARY_EXTRACTIVE_MAX_MINUTES", SUMMARY_EXTRACTIVE_MAX_MINUTES)):
+        return "extractive"
+    from .rate_limit import get_limiter
+    if get_limiter().budget_exhausted():
+        print("Daily OpenAI budget spent; summarising extractively")
+        return "extractive"
+    return "llm"
+
+
+def generate_summary(transcript_path: str, recording_id: int = None,
+                     on_token: Callable[[int, str], None] = None) -> str:
+    """
+    Summarise a transcript. With ``on_token``, LLM responses are streamed and each
+    token is passed to it as it arrives (see app/summary_stream.py).
+    """
     # Read API key and model name at runtime to respect environment overrides
     api_key = os.getenv("OPENAI_API_KEY")
     model_name = os.getenv("OPENAI_MODEL", OPENAI_MODEL)
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not set. Cannot generate summary.")
+    engine = os.getenv("SUMMARY_ENGINE", SUMMARY_ENGINE)
+    # Configuration errors are summary failures too: the transcript is kept and the summary retried
+    if engine not in ("llm", "extractive", "auto"):
+        raise _summary_failed(recording_id, f"Unknown SUMMARY_ENGINE {engine!r}; expected llm, extractive or auto")
+    if engine == "llm" and not api_key:
+        raise _summary_failed(recording_id, "OPENAI_API_KEY not set. Cannot generate summary.")
+    strategy = os.getenv("SUMMARY_STRATEGY", SUMMARY_STRATEGY)
+    if strategy not in ("refine", "map_reduce"):
+        raise _summary_failed(recording_id, f"Unknown SUMMARY_STRATEGY {strategy!r}; expected refine or map_reduce")
+    if engine != "extractive":
+        _load_langchain()
+    started = time.perf_counter()
 
     try:
-        with open(transcript_path, 'r') as f:
-            transcript_data = json.load(f)
-        transcript_text = transcript_data.get("text", "")
+        # Compact transcripts read just the text; legacy .json files are parsed whole
+        transcript_text = load_text(transcript_path)
         if not transcript_text.strip():
             return "Transcript was empty or contained no text."
 
-        llm = ChatOpenAI(temperature=0, model_name=model_name, openai_api_key=api_key)
-
-        # Split text into manageable documents for refine chain
-        text_splitter = CharacterTextSplitter(chunk_size=8000, chunk_overlap=200) # Adjusted chunk_size for longer contexts
-        texts = text_splitter.split_text(transcript_text)
-        docs = [Document(page_content=t) for t in texts]
+        segments = chunking.transcript_segments(transcript_path)
+        if engine == "auto":
+            engine = route_engine(segments, api_key)
+        if engine == "extractive":
+            from .extractive import summarize_segments
+            summary_text = summarize_segments(segments)
+            if recording_id is not None:
+                _record_metrics(recording_id, None, None, engine="extractive", latency=time.perf_counter() - started)
+            return summary_text
+
+        from .rate_limit import BudgetExhausted, get_limiter
+        if get_limiter().budget_exhausted():
+            # Retried by the catch-up loop once the budget resets
+            raise BudgetExhausted("Daily OpenAI budget spent; retry after it resets at midnight UTC")
+
+        # Chunk-level calls are answered from the persistent LLM cache when the prompt repeats
+        from .llm_cache import get_llm_cache, track_hits
+        from .summary_checkpoint import Checkpoint, input_hash
+        from .compaction import compact_segments, compaction_enabled
+        from .rate_limit import openai_client
+        # Requests go through the shared rate limiter, which also does the retrying
+        stream = None
+        if on_token is not None:
+            from .summary_stream import TokenStream
+            stream = TokenStream(on_token, model_name)
+        llm = ChatOpenAI(temperature=0, model_name=model_name, openai_api_key=api_key,
+                         max_tokens=chunking.SUMMARY_MAX_OUTPUT_TOKENS,
+                         cache=get_llm_cache(SessionLocal, model_name),
+                         client=openai_client(api_key), max_retries=0,
+                         streaming=stream is not None, callbacks=[stream] if stream else None)
 
         # Initial prompt for the first chunk
         prompt_template = """Write a concise summary of the following meeting transcript:
@@ -99,141 +378,139 @@ CONCISE SUMMARY:"""
             "{text}\n"
             "------------\n"
             "Given the new context, refine the original summary to cover the entire transcript.\n"
-            "The final summary MUST be formatted as follows:\n"
-            "1.  A section titled '**Key Decisions (5 bullet points):**' listing exactly five key decisions made."
-            "    If fewer than five decisions are evident, note this explicitly.\n"
-            "2.  A section titled '**Action Items:**' listing all actionable tasks, with assigned owners if mentioned.\n"
+            + SUMMARY_FORMAT +
             "If the context isn't useful, return the original summary."
         )
         refine_prompt = PromptTemplate(
             input_variables=["existing_answer", "text"],
             template=refine_template,
         )
-        chain = load_summarize_chain(
-            llm,
-            chain_type="refine",
-            question_prompt=prompt,
-            refine_prompt=refine_prompt,
-            return_intermediate_steps=False, # Set to True to see intermediate steps
-            input_key="input_documents",
-            output_key="output_text",
-        )
+
+        # Chunks end on segment boundaries. Refine chunks are as large as the model's
+        # context window allows once the prompt and the running summary fit; map_reduce
+        # chunks are smaller, so they are summarised concurrently (chunking.chunk_budget)
+        count = lambda t: chunking.count_tokens(t, model_name)
+        if strategy == "map_reduce":
+            overhead = max(count(prompt_template), count(SINGLE_CHUNK_TEMPLATE))
+        else:
+            overhead = count(refine_template) + chunking.SUMMARY_MAX_OUTPUT_TOKENS
+        compaction_saved = 0
+        if compaction_enabled():
+            # Fillers, back-channel and repeated segments never reach the LLM (app.compaction)
+            compacted, stats = compact_segments(segments)
+            compaction_saved = count("".join(s["text"] for s in segments)) - count("".join(s["text"] for s in compacted))
+            print(f"Compacted transcript: dropped {stats}, {compaction_saved} prompt tokens saved")
+            segments = compacted
+        texts = chunking.pack_chunks([s["text"] for s in segments], model_name,
+                                     chunking.chunk_budget(model_name, overhead, concurrent=strategy == "map_reduce"))
+        docs = [Document(page_content=t) for t in texts]
+        checkpoint = Checkpoint(SessionLocal, recording_id, input_hash(model_name, strategy, texts))
+
         # Use callback to capture token usage
-        with get_openai_callback() as cb:
-            result = chain({"input_documents": docs})
-        summary_text = result["output_text"]
-        # Record metrics if recording_id provided
-        if recording_id is not None:
+        with get_openai_callback() as cb, track_hits() as hits:
             try:
-                session = SessionLocal()
-                cost_per_token = float(os.getenv("OPENAI_COST_PER_TOKEN", "0"))
-                session.add(SummaryMetrics(
-                    recording_id=recording_id,
-                    prompt_tokens=cb.prompt_tokens,
-                    completion_tokens=cb.completion_tokens,
-                    total_tokens=cb.total_tokens,
-                    cost=cb.total_tokens * cost_per_token
-                ))
-                session.commit()
-            except Exception as e:
-                print(f"Failed to record metrics for {recording_id}: {e}")
-                session.rollback()
+                if strategy == "map_reduce":
+                    reduce_budget = chunking.chunk_budget(model_name, count(REDUCE_TEMPLATE))
+                    summary_text = summarize_map_reduce(llm, texts, prompt, reduce_budget, count, checkpoint)
+                else:
+                    summary_text = summarize_refine(llm, docs, prompt, refine_prompt, checkpoint)
             finally:
-                session.close()
+                # Record metrics if recording_id provided; a failed attempt's tokens were paid for too
+                if recording_id is not None:
+                    # Streamed responses report no usage; the stream counted the tokens instead
+                    usage = stream if stream is not None and not cb.total_tokens else cb
+                    _record_metrics(recording_id, usage, hits, compaction_saved, latency=time.perf_counter() - started)
+        checkpoint.clear()
         return summary_text
 
-    except FileNotFoundError:
-        return "Error: Transcript file not found."
+    except FileNotFoundError as e:
+        raise _summary_failed(recording_id, "Transcript file not found.") from e
     except Exception as e:
         # Log the full error for debugging
         print(f"Error during summarization: {e}")
-        return f"Error generating summary: {str(e)}"
+        raise _summary_failed(recording_id, str(_budget_exhausted(e) or e)) from e
 
 
-def run_transcription_job():
-    db: Session = SessionLocal()
-    recs_to_process = db.query(Recording).filter_by(transcript_fetched=False).all()
-    
-    for rec in recs_to_process:
-        print(f"Processing transcription for recording ID: {rec.id}, Meeting ID: {rec.meeting_id}")
-        try:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                tmpdir_path = Path(tmpdir)
-                video_file = tmpdir_path / f"{rec.meeting_id}_meeting.mp4"
-                print(f"Downloading video to {video_file} from {rec.recording_url}")
-                download_file(rec.recording_url, video_file)
-
-                audio_file = tmpdir_path / f"{rec.meeting_id}_audio.wav"
-                print(f"Extracting audio to {audio_file}")
-                extract_audio(video_file, audio_file)
-
-                print(f"Transcribing audio file {audio_file}")
-                transcript_result = transcribe(audio_file)
-                
-                out_path = AUDIO_DIR / f"{rec.meeting_id}.json"
-                print(f"Saving transcript to {out_path}")
-                with open(out_path, "w") as f:
-                    json.dump(transcript_result, f, indent=2)
-
-                rec.transcript_fetched = True
-                rec.transcript_path = str(out_path)
-                db.commit()
-                print(f"Transcription successful for {rec.meeting_id}.")
-
-                # Now, attempt to summarize
-                print(f"Generating summary for {rec.meeting_id} using transcript {out_path}")
-                summary_text = generate_summary(str(out_path), rec.id)
-                rec.summary = summary_text
-                db.commit()
-                print(f"Summary generated for {rec.meeting_id}: {summary_text[:100]}...")
+def claim_pipeline_jobs(worker_id: str, batch_size: int = None):
+    """Lazily lease pending recordings to this worker as the pipeline has room for them."""
+    from .jobs import claim_jobs
+    from .pipeline import Job
 
-                # Publish summary to Slack and Confluence
-                try:
-                    from .publishers import publish_to_slack, publish_to_confluence
-                    publish_to_slack(rec.meeting_id, summary_text)
-                    print(f"Posted summary to Slack for {rec.meeting_id}")
-                except Exception as e:
-                    print(f"Failed to post to Slack for {rec.meeting_id}: {e}")
-
-                try:
-                    publish_to_confluence(rec.meeting_id, summary_text, rec.transcript_path)
-                    print(f"Posted summary to Confluence for {rec.meeting_id}")
-                except Exception as e:
-                    print(f"Failed to post to Confluence for {rec.meeting_id}: {e}")
-
-        except Exception as e:
-            print(f"Failed to process {rec.meeting_id}: {e}")
-            db.rollback() # Rollback all changes for this recording if any step failed
-            
-    # Separate loop for summaries if transcription was done previously but summarization failed or was skipped
-    recs_to_summarize = db.query(Recording).filter(Recording.transcript_fetched==True, Recording.summary==None).all()
-    for rec in recs_to_summarize:
-        if not rec.transcript_path:
-            print(f"Skipping summary for {rec.meeting_id}: transcript_path is missing.")
-            continue
-        
-        print(f"Attempting to generate summary for previously transcribed recording: {rec.meeting_id}")
+    batch_size = batch_size or int(os.getenv("JOB_CLAIM_BATCH", "1"))
+    while True:
+        db: Session = SessionLocal()
         try:
-            summary_text = generate_summary(rec.transcript_path, rec.id)
-            rec.summary = summary_text
-            db.commit()
-            print(f"Summary generated for {rec.meeting_id}: {summary_text[:100]}...")
-
-            # Publish summary to Slack and Confluence
+            claimed = claim_jobs(db, worker_id, limit=batch_size)
+            jobs = [Job.from_recording(rec, worker_id) for rec in claimed]
+        finally:
+            db.close()
+        if not jobs:
+            return
+        yield from jobs
+
+
+def run_transcription_job(worker_id: str = None):
+    from .jobs import JOB_FAILED, claim_summaries, default_worker_id, fail_job, release_summary
+    from .pipeline import build_recording_pipeline, discard_download
+    from .search import try_index_summary
+    from .transcript_cache import cache_stats
+
+    worker_id = worker_id or default_worker_id()
+    # Summaries are published from the outbox by a background publisher, never inline
+    publisher = None
+    if os.getenv("OUTBOX_PUBLISHER", "inline") == "inline":
+        from .outbox import Publisher
+        publisher = Publisher(SessionLocal).start()
+    # Download, ffmpeg, Whisper and summarisation run as overlapping stages.
+    # Recordings are claimed with a lease, so several workers can share one database.
+    jobs = build_recording_pipeline().run(claim_pipeline_jobs(worker_id))
+    for job in jobs:
+        if job.failed:
+            print(f"Failed to process {job.meeting_id} during {job.failed_stage}: {job.error}")
+            db = SessionLocal()
             try:
-                from .publishers import publish_to_slack, publish_to_confluence
-                publish_to_slack(rec.meeting_id, summary_text)
-                print(f"Posted summary to Slack for {rec.meeting_id}")
-            except Exception as e:
-                print(f"Failed to post to Slack for {rec.meeting_id}: {e}")
+                fail_job(db, job.recording_id, worker_id, f"{job.failed_stage}: {job.error}")
+                if db.get(Recording, job.recording_id).status == JOB_FAILED:
+                    # Out of attempts: nothing will resume the partial download
+                    discard_download(job.recording_id)
+            finally:
+                db.close()
+        else:
+            print(f"Finished recording ID: {job.recording_id}, Meeting ID: {job.meeting_id} in {sum(job.timings.values()):.1f}s of stage time")
+    # Counted here: every transcribe worker process has its own cache object
+    stats = cache_stats(job.transcript_cache_hit for job in jobs)
+    if stats["hits"] or stats["misses"]:
+        print(f"Transcript cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%})")
+
+    # Separate loop for summaries if transcription was done previously but summarization failed or was skipped
+    # (failed summaries keep summary=None with summary_status="failed", and resume from their checkpoint).
+    # Each is leased like a job, so workers don't summarise the same recording. A failure keeps its lease,
+    # so it is retried once that runs out, and is given up after SUMMARY_MAX_ATTEMPTS tries.
+    db = SessionLocal()
+    try:
+        while True:
+            claimed = claim_summaries(db, worker_id)
+            if not claimed:
+                break
+            rec = claimed[0]
 
+            print(f"Attempting to generate summary for previously transcribed recording: {rec.meeting_id}")
             try:
-                publish_to_confluence(rec.meeting_id, summary_text, rec.transcript_path)
-                print(f"Posted summary to Confluence for {rec.meeting_id}")
+                summary_text = generate_summary(rec.transcript_path, rec.id)
+                store_summary(db, rec, summary_text)
+                print(f"Summary generated for {rec.meeting_id}: {summary_text[:100]}...")
+                try_index_summary(db, rec)
             except Exception as e:
-                print(f"Failed to post to Confluence for {rec.meeting_id}: {e}")
-        except Exception as e:
-            print(f"Failed to generate summary for {rec.meeting_id} during catch-up: {e}")
-            db.rollback()
-            
-    db.close()
\ No newline at end of file
+                print(f"Failed to generate summary for {rec.meeting_id} during catch-up: {e}")
+                db.rollback()
+                if _budget_exhausted(e):
+                    # Every other summary would fail too; all of them are retried after the reset
+                    release_summary(db, rec.id, worker_id, count_attempt=False)
+                    break
+                continue
+            release_summary(db, rec.id, worker_id)
+    finally:
+        db.close()
+    if publisher is not None:
+        # Whatever isn't delivered in time stays queued for the next run or `python -m app.outbox`
+        publisher.stop()
@@ -0,0 +1,72 @@
+"""
+Checkpoints for resumable summaries.
+
+After every completed LLM step, generate_summary saves its progress for the
+recording: the running summary and the number of chunks folded into it
+(refine), or the chunk summaries finished so far (map_reduce). If a call fails
+part way (a timeout, a 429), the next attempt picks up from the last saved
+step instead of chunk 1. A checkpoint only applies to the same model, strategy
+and chunks it was made with, and is deleted once the summary is stored.
+"""
+
+import hashlib
+import json
+from typing import List, Optional
+
+from .models import SummaryCheckpoint
+
+
+def input_hash(model_name: str, strategy: str, chunks: List[str]) -> str:
+    digest = hashlib.sha256(f"{model_name}\0{strategy}".encode("utf-8"))
+    for chunk in chunks:
+        digest.update(b"\0" + chunk.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    """Saved progress of one recording's summary; a no-op when recording_id is None."""
+
+    def __init__(self, session_factory, recording_id: Optional[int], key: str):
+        self.session_factory = session_factory
+        self.recording_id = recording_id
+        self.key = key
+
+    def load(self) -> Optional[dict]:
+        if self.recording_id is None:
+            return None
+        db = self.session_factory()
+        try:
+            row = db.get(SummaryCheckpoint, self.recording_id)
+            if row is None or row.input_hash != self.key:
+                return None
+            return json.loads(row.state)
+        finally:
+            db.close()
+
+    def save(self, steps_done: int, state: dict):
+        if self.recording_id is None:
+            return
+        db = self.session_factory()
+        try:
+            db.merge(SummaryCheckpoint(recording_id=self.recording_id, input_hash=self.key,
+                                       steps_done=steps_done, state=json.dumps(state)))
+            db.commit()
+        except Exception as e:
+            # Losing a checkpoint only costs a longer retry
+            print(f"Failed to save summary checkpoint for {self.recording_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def clear(self):
+        if self.recording_id is None:
+            return
+        db = self.session_factory()
+        try:
+            db.query(SummaryCheckpoint).filter(SummaryCheckpoint.recording_id == self.recording_id).delete()
+            db.commit()
+        except Exception as e:
+            print(f"Failed to clear summary checkpoint for {self.recording_id}: {e}")
+            db.rollback()
+        finally:
+            db.close()
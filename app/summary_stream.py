@@ -0,0 +1,120 @@
+"""
+On-demand summaries streamed as server-sent events.
+
+POST /recordings/{id}/summary/stream runs generate_summary() on a worker
+thread with a streaming chat model. The LangChain callback below hands every
+token to the event loop (loop.call_soon_threadsafe), and the response sends it
+at once, so the client sees the first words after one model round trip
+instead of after the whole summary.
+
+Events:
+
+    event: token   data: {"call": 2, "token": "..."}
+    event: done    data: {"summary": "..."}
+    event: error   data: {"error": "..."}
+
+A summary can take several LLM calls (refine steps, map_reduce chunk
+summaries), numbered by ``call``; the summary is the text of the last call,
+and ``done`` carries it in full. The result is stored on the recording, in
+SummaryMetrics and in the search index exactly as the batch pipeline stores
+it. The endpoint leases the recording first (app.jobs.claim_summary), and the
+lease is released when the summary is stored or has failed.
+"""
+
+import asyncio
+import json
+import threading
+from typing import AsyncIterator, Callable, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class TokenStream(BaseCallbackHandler):
+    """Passes streamed tokens to ``on_token(call, token)`` and counts tokens, which streamed responses don't report."""
+
+    def __init__(self, on_token: Callable[[int, str], None], model_name: str):
+        self.on_token = on_token
+        self.model_name = model_name
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._calls: Dict[UUID, int] = {}
+        self._runs: Dict[UUID, list] = {}  # run -> [prompt tokens, streamed tokens]
+        self._lock = threading.Lock()
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs):
+        from .chunking import count_tokens
+        prompt = sum(count_tokens(str(m.content), self.model_name) + 4 for batch in messages for m in batch)
+        with self._lock:
+            self._calls[run_id] = len(self._calls) + 1
+            self._runs[run_id] = [prompt, 0]
+
+    def on_llm_new_token(self, token: str, *, run_id: UUID, **kwargs):
+        with self._lock:
+            self._runs.setdefault(run_id, [0, 0])[1] += 1  # one token per streamed delta
+            call = self._calls.get(run_id, 0)
+        if token:
+            self.on_token(call, token)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs):
+        # A call that streamed nothing was answered from the LLM cache and cost nothing
+        with self._lock:
+            prompt, streamed = self._runs.pop(run_id, (0, 0))
+            if streamed:
+                self.prompt_tokens += prompt
+                self.completion_tokens += streamed
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs):
+        self.on_llm_end(None, run_id=run_id)
+
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def summary_events(recording_id: int, transcript_path: str, worker_id: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    Summarise the recording on a thread, yielding SSE frames as tokens arrive.
+    A ``worker_id`` lease on the recording is released once the thread is done.
+    """
+    from . import summarizer
+    from .jobs import release_summary
+    from .models import Recording
+    from .search import try_index_summary
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def emit(event, data):
+        loop.call_soon_threadsafe(queue.put_nowait, (event, data))
+
+    def run():
+        db = summarizer.SessionLocal()
+        try:
+            summary_text = summarizer.generate_summary(
+                transcript_path, recording_id, on_token=lambda call, token: emit("token", {"call": call, "token": token}))
+            rec = db.get(Recording, recording_id)
+            summarizer.store_summary(db, rec, summary_text)
+            try_index_summary(db, rec)
+            emit("done", {"summary": summary_text})
+        except Exception as e:
+            db.rollback()
+            emit("error", {"error": str(e)})
+        finally:
+            try:
+                if worker_id is not None:
+                    release_summary(db, recording_id, worker_id)
+            finally:
+                db.close()
+                emit(None, None)
+
+    # The summary is stored even if the client disconnects before it is done
+    threading.Thread(target=run, name=f"summary-stream-{recording_id}", daemon=True).start()
+    while True:
+        event, data = await queue.get()
+        if event is None:
+            return
+        yield sse(event, data)
@@ -0,0 +1,145 @@
+"""
+Content-addressed cache of Whisper transcripts.
+
+Transcripts are stored under a hash of the extracted audio samples plus the
+Whisper model name, so a Zoom redelivery, a re-upload or a manual re-run of the
+same recording reuses the existing transcript instead of paying for Whisper
+again. The per-meeting transcript file is a hard link to the cached copy.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+import wave
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Tuple, Union
+
+import numpy as np
+
+from .transcript_store import COMPACT_SUFFIX, JSON_SUFFIX, load_transcript, save_transcript
+
+HASH_CHUNK_FRAMES = 1024 * 1024
+
+
+def _hash_pcm_file(path: Path, digest) -> None:
+    try:
+        with wave.open(str(path), "rb") as w:
+            while True:
+                frames = w.readframes(HASH_CHUNK_FRAMES)
+                if not frames:
+                    return
+                digest.update(frames)
+    except wave.Error:
+        # Not a WAV file: fall back to the raw bytes
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_FRAMES), b""):
+                digest.update(chunk)
+
+
+def new_digest(model_name: str):
+    return hashlib.sha256(model_name.encode() + b"\0")
+
+
+def update_digest(digest, samples: np.ndarray) -> None:
+    """Hash float samples as the 16-bit PCM they were decoded from."""
+    pcm = np.clip(np.round(samples * 32768.0), -32768, 32767).astype("<i2")
+    digest.update(pcm.tobytes())
+
+
+def audio_key(audio: Union[Path, str, np.ndarray], model_name: str) -> str:
+    """
+    sha256 over the model name and the 16-bit PCM samples. WAV files from
+    ``extract_audio`` and float arrays from ``app.audio`` hash to the same key,
+    as does a recording fed window by window through ``update_digest``.
+    """
+    digest = new_digest(model_name)
+    if isinstance(audio, np.ndarray):
+        update_digest(digest, audio)
+    else:
+        _hash_pcm_file(Path(audio), digest)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str, suffix: str = JSON_SUFFIX) -> Path:
+        return self.root / key[:2] / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str = JSON_SUFFIX) -> Optional[Path]:
+        path = self.path_for(key, suffix)
+        with self._lock:
+            if not path.exists():
+                # Cached in the other transcript format: convert instead of re-running Whisper
+                other = self.path_for(key, COMPACT_SUFFIX if suffix == JSON_SUFFIX else JSON_SUFFIX)
+                if other.exists():
+                    save_transcript(load_transcript(other), path)
+            return path if path.exists() else None
+
+    def put(self, key: str, transcript: dict, suffix: str = JSON_SUFFIX) -> Path:
+        path = self.path_for(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written to a temporary file and renamed, so concurrent workers never see a partial file
+        save_transcript(transcript, path)
+        return path
+
+    def put_file(self, key: str, transcript_path: Path) -> Path:
+        """Adopt an already-written transcript file as the cached copy for ``key``."""
+        transcript_path = Path(transcript_path)
+        path = self.path_for(key, transcript_path.suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        link(transcript_path, path)
+        return path
+
+    def transcribe(
+        self,
+        audio: Union[Path, np.ndarray],
+        dest: Path,
+        transcribe_fn: Callable[[Union[Path, np.ndarray]], dict],
+        model_name: str,
+    ) -> Tuple[str, bool]:
+        """
+        Write the transcript for ``audio`` to ``dest``, running ``transcribe_fn``
+        only on a cache miss. Returns (audio key, cache hit).
+        """
+        key = audio_key(audio, model_name)
+        # The cached copy is kept in the same format as ``dest``
+        suffix = Path(dest).suffix
+        cached = self.get(key, suffix)
+        hit = cached is not None
+        if not hit:
+            cached = self.put(key, transcribe_fn(audio), suffix)
+        link(cached, Path(dest))
+        return key, hit
+
+
+def cache_stats(hits: Iterable[Optional[bool]]) -> dict:
+    """Hit rate over jobs' transcript_cache_hit flags; None (cache not used) is left out."""
+    flags = [hit for hit in hits if hit is not None]
+    total = len(flags)
+    hit_count = sum(flags)
+    return {"hits": hit_count, "misses": total - hit_count, "hit_rate": hit_count / total if total else 0.0}
+
+
+def link(src: Path, dest: Path):
+    """Point ``dest`` at ``src``: a hard link where possible, otherwise a copy."""
+    tmp = dest.with_name(f"{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dest)
+
+
+_cache: Optional[TranscriptCache] = None
+
+
+def get_transcript_cache() -> TranscriptCache:
+    global _cache
+    if _cache is None:
+        from .summarizer import AUDIO_DIR
+        _cache = TranscriptCache(Path(os.getenv("TRANSCRIPT_CACHE_DIR", str(AUDIO_DIR / "cas"))))
+    return _cache
@@ -0,0 +1,347 @@
+"""
+Transcript files on disk.
+
+Two formats are readable, chosen by file suffix:
+
+``.json``        the Whisper result dict as written by ``json.dump`` (legacy)
+``.transcript``  compact binary format, the default for new transcripts
+                 (TRANSCRIPT_FORMAT=json keeps writing JSON)
+
+A compact file is one flat file, so it can be hard-linked into the transcript
+cache and replaced atomically like the JSON files were:
+
+    b"MMTR" | u32 version | u32 header length | header (JSON)
+    text        UTF-8 transcript text, which doubles as the segment text blob
+    segments    fixed-size SEGMENT_DTYPE records, 8-byte aligned
+    tokens      int32 token ids of all segments, back to back
+
+The header gives the offset and size of each region. ``load_text`` reads the
+text region only, and segment columns are memory-mapped, so a time-range lookup
+touches a few pages instead of parsing the whole file. Segment scores are kept
+as float32, and word timings (``word_timestamps=True``) aren't stored.
+"""
+
+import json
+import os
+import shutil
+import struct
+import threading
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+MAGIC = b"MMTR"
+VERSION = 1
+JSON_SUFFIX = ".json"
+COMPACT_SUFFIX = ".transcript"
+TRANSCRIPT_FORMAT = os.getenv("TRANSCRIPT_FORMAT", "compact")
+
+_PRELUDE = struct.Struct("<4sII")
+_ALIGN = 8
+
+SEGMENT_DTYPE = np.dtype([
+    ("start", "<f8"),
+    ("end", "<f8"),
+    ("seek", "<i8"),
+    ("text_start", "<u8"),
+    ("text_end", "<u8"),
+    ("token_start", "<u8"),
+    ("token_end", "<u8"),
+    ("temperature", "<f4"),
+    ("avg_logprob", "<f4"),
+    ("compression_ratio", "<f4"),
+    ("no_speech_prob", "<f4"),
+])
+SCORE_FIELDS = ("temperature", "avg_logprob", "compression_ratio", "no_speech_prob")
+
+
+def transcript_file(directory: Path, meeting_id: str) -> Path:
+    """Where a new transcript for ``meeting_id`` goes, in the configured format."""
+    suffix = JSON_SUFFIX if TRANSCRIPT_FORMAT == "json" else COMPACT_SUFFIX
+    return Path(directory) / f"{meeting_id}{suffix}"
+
+
+def is_compact(path: Union[Path, str]) -> bool:
+    return Path(path).suffix == COMPACT_SUFFIX
+
+
+def _tmp_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+class TranscriptWriter:
+    """
+    Writes a transcript one window of segments at a time, in the format given
+    by the suffix of ``path``. Only the running text is kept in memory (JSON)
+    or nothing at all (compact); the file appears at ``path`` atomically once
+    the writer is closed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.compact = is_compact(self.path)
+        self._tmp = _tmp_path(self.path)
+        self.segments = 0
+        self.language: Optional[str] = None
+        if self.compact:
+            # Regions are spooled to side files and concatenated on close
+            self._parts = [self._tmp.with_name(f"{self._tmp.name}.{part}") for part in ("text", "segments", "tokens")]
+            self._text, self._records, self._tokens = (open(part, "wb") for part in self._parts)
+            self._text_bytes = 0
+            self._token_count = 0
+        else:
+            self._file = open(self._tmp, "w")
+            self._file.write('{"segments": [')
+            self._text_parts: List[str] = []
+
+    def add_segments(self, segments: Iterable[dict]):
+        """Append segments that already carry their final timings."""
+        if self.compact:
+            self._add_compact(segments)
+            return
+        for seg in segments:
+            seg = dict(seg, id=self.segments)
+            self._file.write(",\n" if self.segments else "\n")
+            json.dump(seg, self._file)
+            self._text_parts.append(seg["text"])
+            self.segments += 1
+
+    def _add_compact(self, segments: Iterable[dict]):
+        segments = list(segments)
+        records = np.zeros(len(segments), dtype=SEGMENT_DTYPE)
+        texts = [seg["text"].encode("utf-8") for seg in segments]
+        tokens = [np.asarray(seg.get("tokens", []), dtype="<i4") for seg in segments]
+        text_ends = self._text_bytes + np.cumsum([len(t) for t in texts], dtype=np.uint64)
+        token_ends = self._token_count + np.cumsum([len(t) for t in tokens], dtype=np.uint64)
+        records["start"] = [seg["start"] for seg in segments]
+        records["end"] = [seg["end"] for seg in segments]
+        records["seek"] = [seg.get("seek", 0) for seg in segments]
+        records["text_end"], records["token_end"] = text_ends, token_ends
+        records["text_start"] = np.concatenate(([self._text_bytes], text_ends[:-1])) if segments else []
+        records["token_start"] = np.concatenate(([self._token_count], token_ends[:-1])) if segments else []
+        for name in SCORE_FIELDS:
+            records[name] = [seg.get(name, 0.0) or 0.0 for seg in segments]
+
+        self._text.write(b"".join(texts))
+        for ids in tokens:
+            self._tokens.write(ids.tobytes())
+        self._records.write(records.tobytes())
+        if segments:
+            self._text_bytes, self._token_count = int(text_ends[-1]), int(token_ends[-1])
+        self.segments += len(segments)
+
+    def add(self, result: dict, offset: int):
+        """Append one window's result, recorded ``offset`` samples into the recording."""
+        from .transcription import shift_segments
+        self.add_segments(shift_segments(result, offset, self.segments))
+        self.language = self.language or result.get("language")
+
+    def close(self):
+        if self.compact:
+            for part in (self._text, self._records, self._tokens):
+                part.close()
+            _assemble(self._tmp, self._parts, self.language, self.segments, self._token_count)
+            for part in self._parts:
+                part.unlink()
+        else:
+            self._file.write('\n], "text": ')
+            json.dump("".join(self._text_parts), self._file)
+            self._file.write(', "language": ')
+            json.dump(self.language, self._file)
+            self._file.write("}\n")
+            self._file.close()
+        # Replace rather than write through: the old file may be linked into the transcript cache
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        if self.compact:
+            for part, path in zip((self._text, self._records, self._tokens), self._parts):
+                part.close()
+                path.unlink(missing_ok=True)
+        else:
+            self._file.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+def _aligned(n: int) -> int:
+    return -(-n // _ALIGN) * _ALIGN
+
+
+def _assemble(dest: Path, parts: List[Path], language: Optional[str], segments: int, tokens: int):
+    text_path, segments_path, tokens_path = parts
+    text_bytes = text_path.stat().st_size
+    header = {"language": language, "segments": segments, "tokens": tokens, "text_bytes": text_bytes}
+    # Offsets depend on the header's own length: repeat until it stops changing
+    while True:
+        raw = json.dumps(header).encode()
+        text_offset = _PRELUDE.size + len(raw)
+        if header.get("text_offset") == text_offset:
+            break
+        header["text_offset"] = text_offset
+        header["segments_offset"] = _aligned(text_offset + text_bytes)
+        header["tokens_offset"] = header["segments_offset"] + segments * SEGMENT_DTYPE.itemsize
+
+    with open(dest, "wb") as out:
+        out.write(_PRELUDE.pack(MAGIC, VERSION, len(raw)))
+        out.write(raw)
+        for path, offset in ((text_path, header["text_offset"]), (segments_path, header["segments_offset"]),
+                             (tokens_path, header["tokens_offset"])):
+            out.write(b"\0" * (offset - out.tell()))
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, out)
+
+
+class CompactTranscript:
+    """Read side of a ``.transcript`` file; nothing beyond the header is read up front."""
+
+    def __init__(self, path: Union[Path, str]):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            magic, version, header_len = _PRELUDE.unpack(f.read(_PRELUDE.size))
+            if magic != MAGIC:
+                raise ValueError(f"{self.path} is not a compact transcript")
+            if version != VERSION:
+                raise ValueError(f"{self.path} has unsupported transcript version {version}")
+            self.header = json.loads(f.read(header_len))
+        self.language = self.header["language"]
+        self._segments = None
+
+    def __len__(self) -> int:
+        return self.header["segments"]
+
+    def _read(self, offset: int, size: int) -> bytes:
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return f.read(size)
+
+    def text(self) -> str:
+        return self._read(self.header["text_offset"], self.header["text_bytes"]).decode("utf-8")
+
+    @property
+    def columns(self) -> np.ndarray:
+        """Memory-mapped SEGMENT_DTYPE records, one per segment."""
+        if self._segments is None:
+            if len(self) == 0:
+                self._segments = np.zeros(0, dtype=SEGMENT_DTYPE)
+            else:
+                self._segments = np.memmap(self.path, dtype=SEGMENT_DTYPE, mode="r",
+                                           offset=self.header["segments_offset"], shape=(len(self),))
+        return self._segments
+
+    def segment_range(self, start: Optional[float] = None, end: Optional[float] = None) -> slice:
+        """Indices of the segments overlapping [start, end) seconds (segments are in time order)."""
+        columns = self.columns
+        lo = 0 if start is None else int(np.searchsorted(columns["end"], start, side="right"))
+        hi = len(self) if end is None else int(np.searchsorted(columns["start"], end, side="left"))
+        return slice(lo, max(lo, hi))
+
+    def segments(self, start: Optional[float] = None, end: Optional[float] = None) -> List[dict]:
+        """Segments overlapping [start, end) as Whisper-style dicts."""
+        return self._segments_at(self.segment_range(start, end))
+
+    def iter_segments(self, batch_size: int = 1000) -> Iterator[dict]:
+        """All segments in order, read ``batch_size`` at a time."""
+        for lo in range(0, len(self), batch_size):
+            yield from self._segments_at(slice(lo, min(lo + batch_size, len(self))))
+
+    def _segments_at(self, index: slice) -> List[dict]:
+        records = self.columns[index]
+        if len(records) == 0:
+            return []
+        text_lo, text_hi = int(records[0]["text_start"]), int(records[-1]["text_end"])
+        text = self._read(self.header["text_offset"] + text_lo, text_hi - text_lo)
+        token_lo, token_hi = int(records[0]["token_start"]), int(records[-1]["token_end"])
+        tokens = np.frombuffer(self._read(self.header["tokens_offset"] + token_lo * 4, (token_hi - token_lo) * 4), "<i4")
+        # Column-wise tolist() is far cheaper than touching numpy scalars per record
+        columns = {name: records[name].tolist() for name in SEGMENT_DTYPE.names}
+        result = []
+        for i in range(len(records)):
+            seg = {
+                "id": index.start + i,
+                "seek": columns["seek"][i],
+                "start": columns["start"][i],
+                "end": columns["end"][i],
+                "text": text[columns["text_start"][i] - text_lo:columns["text_end"][i] - text_lo].decode("utf-8"),
+                "tokens": tokens[columns["token_start"][i] - token_lo:columns["token_end"][i] - token_lo].tolist(),
+            }
+            for name in SCORE_FIELDS:
+                seg[name] = columns[name][i]
+            result.append(seg)
+        return result
+
+    def to_dict(self) -> dict:
+        return {"text": self.text(), "segments": self.segments(), "language": self.language}
+
+
+def save_transcript(result: dict, path: Union[Path, str]):
+    """Atomically write a Whisper result dict in the format given by the suffix of ``path``."""
+    path = Path(path)
+    if not is_compact(path):
+        tmp = _tmp_path(path)
+        with open(tmp, "w") as f:
+            json.dump(result, f, indent=2)
+        os.replace(tmp, path)
+        return
+    writer = TranscriptWriter(path)
+    writer.language = result.get("language")
+    try:
+        # The stored text is the concatenation of the segment texts, as in stitched transcripts
+        segments = result.get("segments") or []
+        if not segments and result.get("text"):
+            # Text without segment data is kept as one untimed segment, so load_text still returns it
+            segments = [{"start": 0.0, "end": 0.0, "text": result["text"]}]
+        writer.add_segments(segments)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+
+def load_transcript(path: Union[Path, str]) -> dict:
+    """The full Whisper result dict, from either format."""
+    if is_compact(path):
+        return CompactTranscript(path).to_dict()
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def load_text(path: Union[Path, str]) -> str:
+    """Only the transcript text; compact files don't parse any segment data."""
+    if is_compact(path):
+        return CompactTranscript(path).text()
+    with open(path, "r") as f:
+        return json.load(f).get("text", "")
+
+
+def load_segments(path: Union[Path, str], start: Optional[float] = None, end: Optional[float] = None) -> List[dict]:
+    """Segments overlapping [start, end) seconds, from either format."""
+    if is_compact(path):
+        return CompactTranscript(path).segments(start, end)
+    with open(path, "r") as f:
+        segments = json.load(f).get("segments", [])
+    return [
+        seg for seg in segments
+        if (start is None or seg["end"] > start) and (end is None or seg["start"] < end)
+    ]
+
+
+def iter_segments(path: Union[Path, str], batch_size: int = 1000) -> Iterator[dict]:
+    """All segments in order; compact files are read a batch at a time instead of all at once."""
+    if is_compact(path):
+        yield from CompactTranscript(path).iter_segments(batch_size)
+        return
+    yield from load_segments(path)
+
+
+def convert(path: Union[Path, str], remove: bool = False) -> Path:
+    """Write a compact copy of the JSON transcript at ``path``; returns the new path."""
+    path = Path(path)
+    result = load_transcript(path)
+    if any("words" in seg for seg in result.get("segments", [])):
+        raise ValueError(f"{path} has word timings, which the compact format doesn't keep")
+    dest = path.with_suffix(COMPACT_SUFFIX)
+    save_transcript(result, dest)
+    if remove:
+        path.unlink()
+    return dest
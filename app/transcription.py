@@ -0,0 +1,169 @@
+"""
+Parallel chunked Whisper transcription.
+
+Long recordings are cut into windows at silence boundaries and each window is
+transcribed in a pool of worker processes that load the model once. The window
+results are stitched back into a single transcript with the same schema as
+``model.transcribe`` (``text``, ``segments`` with global ``id``/``seek``/
+``start``/``end``, ``language``).
+
+``transcribe_windowed`` is the bounded-memory variant for multi-hour
+recordings: windows are read from ffmpeg's output one at a time and their
+segments are appended to the transcript file as soon as they are transcribed.
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .audio import SAMPLE_RATE, decode_file, find_split_points, pcm_windows
+from .backends import backend_name, get_backend
+from .transcript_store import TranscriptWriter
+
+WHISPER_WORKERS = int(os.getenv("WHISPER_WORKERS", "1"))
+WHISPER_WINDOW_SECONDS = float(os.getenv("WHISPER_WINDOW_SECONDS", "120"))
+# Decode and transcribe recordings a window at a time, writing segments as they come
+TRANSCRIBE_WINDOWED = os.getenv("TRANSCRIBE_WINDOWED", "0") == "1"
+
+# Whisper's mel frames are 10 ms apart; segment "seek" is counted in them
+HOP_LENGTH = 160
+
+# Loaded models, keyed by name; each process loads a given model at most once
+_models: Dict[str, object] = {}
+_models_lock = threading.Lock()
+
+# Backend and model held by each pool worker process
+_worker_key: Optional[Tuple[str, str]] = None
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_key: Optional[Tuple[str, str, int]] = None
+
+
+def get_model(name: str):
+    """Load Whisper model ``name`` on first use and reuse it afterwards."""
+    model = _models.get(name)
+    if model is None:
+        with _models_lock:
+            model = _models.get(name)
+            if model is None:
+                import whisper
+                print(f"Loading Whisper model {name}")
+                model = whisper.load_model(name)
+                _models[name] = model
+    return model
+
+
+def _init_worker(model_name: str, backend: str):
+    global _worker_key
+    _worker_key = (model_name, backend)
+    get_backend(model_name, backend)
+
+
+def _transcribe_window(samples: np.ndarray) -> dict:
+    return get_backend(*_worker_key).transcribe(samples)
+
+
+def get_pool(model_name: str, workers: int, backend: Optional[str] = None) -> ProcessPoolExecutor:
+    """A long-lived pool per (model, backend, size) so each worker loads the weights only once."""
+    global _pool, _pool_key
+    backend = backend or backend_name()
+    if _pool is None or _pool_key != (model_name, backend, workers):
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_name, backend))
+        _pool_key = (model_name, backend, workers)
+    return _pool
+
+
+def split_windows(audio: np.ndarray, window_seconds: float) -> List[Tuple[int, np.ndarray]]:
+    """Cut ``audio`` at silence near every ``window_seconds``; returns (offset, samples) pairs."""
+    bounds = [0] + find_split_points(audio, window_seconds) + [len(audio)]
+    return [(start, audio[start:end]) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def shift_segments(result: dict, offset: int, first_id: int) -> List[dict]:
+    """
+    Copies of a window's segments with ``start``/``end``/``seek`` (and word
+    timings, if present) moved by ``offset`` samples and ``id`` counting on
+    from ``first_id``.
+    """
+    shift = offset / SAMPLE_RATE
+    segments = []
+    for seg in result.get("segments", []):
+        seg = dict(seg)
+        seg["id"] = first_id + len(segments)
+        seg["seek"] = seg.get("seek", 0) + offset // HOP_LENGTH
+        seg["start"] = seg["start"] + shift
+        seg["end"] = seg["end"] + shift
+        if "words" in seg:
+            seg["words"] = [dict(w, start=w["start"] + shift, end=w["end"] + shift) for w in seg["words"]]
+        segments.append(seg)
+    return segments
+
+
+def stitch(results: List[dict], offsets: List[int]) -> dict:
+    """Merge per-window transcripts into one, with global timings and ``id``s."""
+    segments = []
+    for result, offset in zip(results, offsets):
+        segments += shift_segments(result, offset, len(segments))
+    language = next((r.get("language") for r in results if r.get("language")), None)
+    return {
+        "text": "".join(seg["text"] for seg in segments),
+        "segments": segments,
+        "language": language,
+    }
+
+
+def transcribe_chunked(
+    audio: Union[Path, np.ndarray],
+    model_name: str,
+    workers: Optional[int] = None,
+    window_seconds: Optional[float] = None,
+    backend: Optional[str] = None,
+) -> dict:
+    """Transcribe ``audio`` as silence-aligned windows across ``workers`` processes."""
+    workers = workers or WHISPER_WORKERS
+    window_seconds = window_seconds or WHISPER_WINDOW_SECONDS
+    if not isinstance(audio, np.ndarray):
+        audio = decode_file(Path(audio))
+
+    duration = len(audio) / SAMPLE_RATE
+    # Enough windows to keep every worker busy, but never shorter than ~30 s of context
+    window_seconds = min(window_seconds, max(30.0, duration / workers))
+    windows = split_windows(audio, window_seconds)
+    print(f"Transcribing {duration:.0f}s of audio as {len(windows)} windows on {workers} workers")
+
+    pool = get_pool(model_name, workers, backend)
+    results = list(pool.map(_transcribe_window, [samples for _, samples in windows]))
+    return stitch(results, [offset for offset, _ in windows])
+
+
+def transcribe_windowed(
+    source: Union[Path, str],
+    dest: Path,
+    transcribe_fn: Callable[[np.ndarray], dict],
+    window_seconds: Optional[float] = None,
+    on_window: Optional[Callable[[int, np.ndarray], None]] = None,
+) -> TranscriptWriter:
+    """
+    Transcribe ``source`` (a file or URL) window by window straight from
+    ffmpeg's output, appending each window's segments to ``dest`` as it
+    finishes. Memory stays bounded by one window, however long the recording.
+    ``on_window(offset, samples)`` sees every window before it is transcribed.
+    """
+    window_seconds = window_seconds or WHISPER_WINDOW_SECONDS
+    writer = TranscriptWriter(dest)
+    try:
+        for offset, samples in pcm_windows(source, window_seconds):
+            if on_window is not None:
+                on_window(offset, samples)
+            writer.add(transcribe_fn(samples), offset)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    return writer
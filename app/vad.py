@@ -0,0 +1,138 @@
+"""
+Energy-based voice activity detection ahead of Whisper.
+
+Waiting rooms, screen-share-only stretches and late starts are mostly silence;
+Whisper spends full compute on them and occasionally hallucinates text. The
+detector marks frames whose energy sits well above the recording's noise floor,
+smooths the result into speech regions, and only those regions are sent to the
+model. A timestamp map translates segment times in the speech-only audio back
+to the original recording.
+"""
+
+import os
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from .audio import SAMPLE_RATE, frame_rms
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "0") == "1"
+# Speech must be this many dB above the noise floor ...
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "12"))
+# ... and above this absolute level (dBFS), so a silent recording stays silent
+VAD_MIN_DB = float(os.getenv("VAD_MIN_DB", "-50"))
+
+FRAME_SECONDS = 0.03
+MIN_SPEECH_SECONDS = 0.25
+MIN_SILENCE_SECONDS = 1.0
+PAD_SECONDS = 0.3
+
+
+def _runs(mask: np.ndarray) -> np.ndarray:
+    """(start, end) frame indices of the True runs in ``mask``."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.stack([np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)], axis=1)
+
+
+def detect_speech(audio: np.ndarray) -> List[Tuple[int, int]]:
+    """Return speech regions of ``audio`` as (start, end) sample offsets."""
+    frame = int(FRAME_SECONDS * SAMPLE_RATE)
+    energy = frame_rms(audio, frame)
+    if len(energy) == 0:
+        return []
+    db = 20 * np.log10(np.maximum(energy, 1e-10))
+    noise_floor = np.percentile(db, 10)
+    mask = db > max(noise_floor + VAD_MARGIN_DB, VAD_MIN_DB)
+
+    runs = _runs(mask)
+    if len(runs) == 0:
+        return []
+    # Bridge short pauses between words, then drop isolated clicks
+    min_silence = int(MIN_SILENCE_SECONDS / FRAME_SECONDS)
+    merged = [list(runs[0])]
+    for start, end in runs[1:]:
+        if start - merged[-1][1] < min_silence:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    min_speech = int(MIN_SPEECH_SECONDS / FRAME_SECONDS)
+    pad = int(PAD_SECONDS * SAMPLE_RATE)
+
+    regions: List[Tuple[int, int]] = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        start = max(0, start * frame - pad)
+        end = min(len(audio), end * frame + pad)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return regions
+
+
+class SpeechMap:
+    """Maps times in the concatenated speech-only audio back to the original."""
+
+    def __init__(self, regions: List[Tuple[int, int]]):
+        self.regions = regions
+        self.original_starts = np.array([s for s, _ in regions], dtype=np.int64)
+        lengths = np.array([e - s for s, e in regions], dtype=np.int64)
+        self.compact_starts = np.concatenate(([0], np.cumsum(lengths)[:-1])) if regions else np.zeros(0, np.int64)
+        self.speech_samples = int(lengths.sum()) if regions else 0
+
+    def to_original(self, seconds: float, end: bool = False) -> float:
+        """
+        Translate a time in the speech-only audio. An ``end`` time that falls
+        exactly on a region boundary stays with the region before it.
+        """
+        if not self.regions:
+            return seconds
+        sample = seconds * SAMPLE_RATE
+        side = "left" if end else "right"
+        i = max(0, int(np.searchsorted(self.compact_starts, sample, side=side)) - 1)
+        return (self.original_starts[i] + sample - self.compact_starts[i]) / SAMPLE_RATE
+
+    def remap(self, result: dict) -> dict:
+        segments = []
+        for seg in result.get("segments", []):
+            seg = dict(seg)
+            seg["start"] = self.to_original(seg["start"])
+            seg["end"] = self.to_original(seg["end"], end=True)
+            if "seek" in seg:
+                seg["seek"] = int(round(self.to_original(seg["seek"] / 100) * 100))
+            if "words" in seg:
+                seg["words"] = [
+                    dict(w, start=self.to_original(w["start"]), end=self.to_original(w["end"], end=True))
+                    for w in seg["words"]
+                ]
+            segments.append(seg)
+        return dict(result, segments=segments)
+
+
+class SpeechFilter:
+    """Speech regions of one recording, and a transcribe wrapper that uses only them."""
+
+    def __init__(self, audio: np.ndarray):
+        self.total_seconds = len(audio) / SAMPLE_RATE
+        self.map = SpeechMap(detect_speech(audio))
+
+    @property
+    def speech_seconds(self) -> float:
+        return self.map.speech_samples / SAMPLE_RATE
+
+    @property
+    def skipped_seconds(self) -> float:
+        return self.total_seconds - self.speech_seconds
+
+    def compact(self, audio: np.ndarray) -> np.ndarray:
+        if not self.map.regions:
+            return np.zeros(0, dtype=audio.dtype)
+        return np.concatenate([audio[s:e] for s, e in self.map.regions])
+
+    def wrap(self, transcribe_fn: Callable[[np.ndarray], dict]) -> Callable[[np.ndarray], dict]:
+        def transcribe_speech(audio: np.ndarray) -> dict:
+            if not self.map.regions:
+                return {"text": "", "segments": [], "language": None}
+            return self.map.remap(transcribe_fn(self.compact(audio)))
+        return transcribe_speech
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Speed and accuracy of the transcription backends on docs/assets/sample.mp4.
+
+For each backend the model is loaded (timed separately), warmed on one second
+of audio, then used to transcribe the sample. Word error rate is measured
+against a reference transcript, by default audio_cache/demo123.json (the fp32
+tiny.en transcript of the same recording), so it reads as drift from the
+current output rather than absolute accuracy.
+
+    python scripts/bench_backends.py --backends whisper whisper-int8 faster-whisper
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.audio import SAMPLE_RATE, decode_file
+from app import backends
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE = ROOT / "docs" / "assets" / "sample.mp4"
+REFERENCE = ROOT / "audio_cache" / "demo123.json"
+
+
+def words(text: str):
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """(substitutions + deletions + insertions) / reference words."""
+    ref, hyp = words(reference), words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1] / max(len(ref), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.getenv("WHISPER_MODEL", "tiny.en"))
+    parser.add_argument("--backends", nargs="+", default=list(backends.BACKENDS))
+    parser.add_argument("--reference", type=Path, default=REFERENCE)
+    parser.add_argument("--runs", type=int, default=3, help="best of N transcriptions")
+    args = parser.parse_args()
+
+    audio = decode_file(SAMPLE)
+    duration = len(audio) / SAMPLE_RATE
+    reference = json.loads(args.reference.read_text())["text"]
+    print(f"{duration:.0f}s of audio, model {args.model}, reference {args.reference.name}")
+    print(f"{'backend':>15} {'load':>7} {'wall':>7} {'RTF':>7} {'WER':>7}")
+
+    for name in args.backends:
+        try:
+            started = time.perf_counter()
+            backend = backends.get_backend(args.model, name)
+            load = time.perf_counter() - started
+        except Exception as e:
+            print(f"{name:>15}  unavailable: {e}")
+            continue
+        backend.transcribe(audio[:SAMPLE_RATE])
+
+        best = None
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            result = backend.transcribe(audio)
+            wall = time.perf_counter() - started
+            best = wall if best is None else min(best, wall)
+        wer = word_error_rate(reference, result["text"])
+        print(f"{name:>15} {load:>6.1f}s {best:>6.1f}s {best / duration:>7.3f} {wer:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Chunk count and prompt tokens: the old 8000-character splitter against app.chunking.
+
+Long transcripts are built by repeating the segments of audio_cache/demo123.json
+(with shifted timestamps) up to each target length. Whisper text has no blank
+lines, so the old splitter (separator "\n\n") never actually splits it; the
+"words" rows show the same splitter cutting on spaces instead. For each one the
+script reports how many LLM calls each splitter makes, the transcript tokens sent
+(overlap included), the prompt tokens per call including the refine template,
+and whether every call fits the model's context window.
+
+    python scripts/bench_chunking.py --minutes 30 60 120 180 --models gpt-4o gpt-4
+"""
+import argparse
+import json
+import os
+import sys
+import warnings
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain.text_splitter import CharacterTextSplitter
+
+from app import chunking
+from app.chunking import chunk_budget, context_window, count_tokens, pack_chunks
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE = ROOT / "audio_cache" / "demo123.json"
+# Stand-in for the refine prompt around each chunk (app/summarizer.py)
+REFINE_OVERHEAD_TEXT = "Your job is to produce a final summary of a meeting transcript. " * 30
+
+
+def long_transcript(sample: dict, minutes: int) -> dict:
+    base, duration = sample["segments"], sample["segments"][-1]["end"]
+    segments, offset = [], 0.0
+    while offset < minutes * 60:
+        segments.extend(dict(seg, start=seg["start"] + offset, end=seg["end"] + offset) for seg in base)
+        offset += duration
+    return {"text": "".join(s["text"] for s in segments), "segments": segments}
+
+
+def report(name: str, chunks: list, model: str, overhead: int):
+    sizes = [count_tokens(c, model) for c in chunks]
+    fits = all(size + overhead + chunking.SUMMARY_MAX_OUTPUT_TOKENS <= context_window(model) for size in sizes)
+    total = sum(sizes) + overhead * len(chunks)
+    return f"{name:>10} {len(chunks):>6} {sum(sizes):>10} {total:>10} {max(sizes):>9} {'yes' if fits else 'NO':>5}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=int, nargs="+", default=[30, 60, 120, 180])
+    parser.add_argument("--models", nargs="+", default=["gpt-4o", "gpt-4"])
+    parser.add_argument("--sample", type=Path, default=SAMPLE)
+    args = parser.parse_args()
+
+    sample = json.loads(args.sample.read_text())
+    splitter = CharacterTextSplitter(chunk_size=8000, chunk_overlap=200)
+    word_splitter = CharacterTextSplitter(separator=" ", chunk_size=8000, chunk_overlap=200)
+    print(f"{'model':>7} {'minutes':>7} {'splitter':>10} {'calls':>6} {'transcript':>10} {'prompt':>10} {'max call':>9} {'fits':>5}")
+    for model in args.models:
+        overhead = count_tokens(REFINE_OVERHEAD_TEXT, model)
+        for minutes in args.minutes:
+            transcript = long_transcript(sample, minutes)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                old = splitter.split_text(transcript["text"])
+            words = word_splitter.split_text(transcript["text"])
+            new = pack_chunks([s["text"] for s in transcript["segments"]], model,
+                              chunk_budget(model, overhead + chunking.SUMMARY_MAX_OUTPUT_TOKENS))
+            print(f"{model:>7} {minutes:>7} {report('characters', old, model, overhead)}")
+            print(f"{model:>7} {minutes:>7} {report('words', words, model, overhead)}")
+            print(f"{model:>7} {minutes:>7} {report('tokens', new, model, overhead)}")
+
+
+if __name__ == "__main__":
+    main()
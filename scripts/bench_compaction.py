@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Speed and token savings of transcript compaction (app.compaction).
+
+Runs compact_segments() on audio_cache/demo123.json as is, then on synthetic
+transcripts of growing length: sentences drawn from its vocabulary, with the
+noise Whisper output typically has mixed in (fillers, back-channel segments and
+short hallucination loops). Reports time per transcript (it should grow linearly
+with segments) and prompt tokens before and after.
+
+    python scripts/bench_compaction.py --hours 0.5 1 3 12
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.chunking import count_tokens
+from app.compaction import compact_segments
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE = ROOT / "audio_cache" / "demo123.json"
+FILLERS = ["Um,", "Uh,", "You know,", "I mean,", "So, uh,"]
+BACKCHANNEL = [" Yeah.", " Mm-hmm.", " Okay.", " Right, right.", " Uh-huh."]
+SEGMENT_SECONDS = 4.0
+
+
+def noisy_transcript(vocabulary: list, hours: float, rng: random.Random) -> list:
+    segments = []
+    while len(segments) * SEGMENT_SECONDS < hours * 3600:
+        text = " " + " ".join(rng.choice(vocabulary) for _ in range(rng.randint(6, 16))) + "."
+        seg = {"text": text, "avg_logprob": -0.3, "no_speech_prob": 0.05}
+        roll = rng.random()
+        if roll < 0.10:
+            segments.append(dict(seg, text=rng.choice(BACKCHANNEL)))
+        elif roll < 0.40:
+            segments.append(dict(seg, text=f" {rng.choice(FILLERS)}{text}"))
+        elif roll < 0.41:
+            segments.extend([seg] * rng.randint(3, 8))  # hallucination loop
+        else:
+            segments.append(seg)
+    return segments
+
+
+def measure(segments: list, model: str, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        kept, stats = compact_segments(segments, drop_low_confidence=True)
+        timings.append(time.perf_counter() - started)
+    before = count_tokens("".join(s["text"] for s in segments), model)
+    after = count_tokens("".join(s["text"] for s in kept), model)
+    return min(timings) * 1000, before, after, stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, nargs="+", default=[0.5, 1, 3, 12])
+    parser.add_argument("--model", default="gpt-4o")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--sample", type=Path, default=SAMPLE)
+    args = parser.parse_args()
+
+    base = json.loads(args.sample.read_text())["segments"]
+    vocabulary = sorted({w.strip(".,").lower() for seg in base for w in seg["text"].split()})
+    rng = random.Random(0)
+    print(f"{'transcript':>12} {'segments':>8} {'time':>9} {'tokens':>8} {'after':>8} {'saved':>6}  dropped")
+    rows = [(args.sample.name, base)] + [(f"{h:g} h noisy", noisy_transcript(vocabulary, h, rng)) for h in args.hours]
+    for name, segments in rows:
+        ms, before, after, stats = measure(segments, args.model, args.runs)
+        dropped = {k: v for k, v in stats.items() if k != "segments"}
+        print(f"{name:>12} {len(segments):>8} {ms:>7.1f}ms {before:>8} {after:>8} {1 - after / before:>6.1%}  {dropped}")
+
+
+if __name__ == "__main__":
+    main()
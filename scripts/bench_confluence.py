@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Memory and payload size of Confluence publishing (app.publishers) by meeting length.
+
+Writes synthetic compact transcripts, one 4-second segment each, and drives
+the publication against fake 200 responses, serializing every request as
+the HTTP client would. "whole page" is the previous approach: load the full
+text, build one storage body and one JSON payload. "steps" builds the body
+paragraph by paragraph up to CONFLUENCE_MAX_BODY_BYTES and sends the rest as
+a gzip attachment (or child pages with --mode pages), so its peak memory
+should stay flat as meetings get longer.
+
+    python scripts/bench_confluence.py --hours 1 4 12 48
+    python scripts/bench_confluence.py --max-body-bytes 100000 --mode pages
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import publishers
+from app.transcript_store import TranscriptWriter, load_text
+
+SEGMENT_SECONDS = 4.0
+WORDS = "we need to ship the release on friday and check the <api> limits & the budget for next quarter".split()
+
+
+class Response:
+    status_code = 200
+    text = '{"id": "1"}'
+
+    def json(self):
+        return {"id": "1"}
+
+
+def write_transcript(path: Path, hours: float, rng: random.Random):
+    writer = TranscriptWriter(path)
+    writer.language = "en"
+    count = int(hours * 3600 / SEGMENT_SECONDS)
+    for lo in range(0, count, 10_000):
+        writer.add_segments(
+            {"id": i, "seek": 0, "start": i * SEGMENT_SECONDS, "end": (i + 1) * SEGMENT_SECONDS,
+             "text": " " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))) + ".", "tokens": [],
+             "temperature": 0.0, "avg_logprob": 0.0, "compression_ratio": 1.0, "no_speech_prob": 0.0}
+            for i in range(lo, min(lo + 10_000, count)))
+    writer.close()
+
+
+def whole_page(path: Path) -> int:
+    transcript_html = load_text(path).replace("\n", "<br/>")
+    body = f"<h1>Meeting Summary: m1</h1><h2>Summary</h2><p>Summary</p><h2>Transcript</h2><p>{transcript_html}</p>"
+    payload = {"type": "page", "title": "Meeting Summary: m1", "space": {"key": "MEET"}, "ancestors": [{"id": 42}],
+               "body": {"storage": {"value": body, "representation": "storage"}}}
+    return len(json.dumps(payload).encode())
+
+
+def steps(path: Path) -> int:
+    sent, response = 0, None
+    publication = publishers.confluence_steps("m1", "Summary", str(path))
+    try:
+        while True:
+            request = publication.send(response)
+            if "json" in request:
+                sent += len(json.dumps(request["json"]).encode())
+            if "files" in request:
+                f = request["files"]["file"][1]
+                while chunk := f.read(64 * 1024):
+                    sent += len(chunk)
+            response = Response()
+    except StopIteration:
+        return sent
+
+
+def measure(fn, path: Path) -> tuple:
+    tracemalloc.start()
+    try:
+        sent = fn(path)
+        return sent, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 4, 12, 48])
+    parser.add_argument("--mode", choices=["attachment", "pages"], default="attachment")
+    parser.add_argument("--max-body-bytes", type=int, default=publishers.CONFLUENCE_MAX_BODY_BYTES)
+    args = parser.parse_args()
+
+    settings = {"CONFLUENCE_BASE_URL": "https://wiki.example.com/wiki", "CONFLUENCE_USER": "bot",
+                "CONFLUENCE_API_TOKEN": "token", "CONFLUENCE_SPACE": "MEET", "CONFLUENCE_PARENT_ID": "42",
+                "CONFLUENCE_LARGE_TRANSCRIPTS": args.mode, "CONFLUENCE_MAX_BODY_BYTES": args.max_body_bytes}
+    rng = random.Random(0)
+    print(f"{'meeting':>8} {'whole page':>11} {'peak':>9} {'steps':>11} {'peak':>9}")
+    with tempfile.TemporaryDirectory() as tmp, patch.multiple(publishers, **settings):
+        for hours in args.hours:
+            path = Path(tmp) / f"{hours}h.transcript"
+            write_transcript(path, hours, rng)
+            old_sent, old_peak = measure(whole_page, path)
+            new_sent, new_peak = measure(steps, path)
+            print(f"{hours:>6g} h {old_sent / 1e6:>9.1f}MB {old_peak / 1e6:>7.1f}MB "
+                  f"{new_sent / 1e6:>9.1f}MB {new_peak / 1e6:>7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Latency of the extractive summarizer (app.extractive) by meeting length.
+
+Builds synthetic transcripts from audio_cache/demo123.json's vocabulary, one
+4-second segment per sentence, and times summarize_segments() on each. The
+TextRank step never builds the sentence-by-sentence matrix, so time should
+grow about linearly with length.
+
+    python scripts/bench_extractive.py --hours 0.1 0.5 1 3
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.extractive import summarize_segments
+
+ROOT = Path(__file__).resolve().parent.parent
+SAMPLE = ROOT / "audio_cache" / "demo123.json"
+SEGMENT_SECONDS = 4.0
+
+
+def synthetic(vocabulary: list, hours: float, rng: random.Random) -> list:
+    count = int(hours * 3600 / SEGMENT_SECONDS)
+    return [{"start": i * SEGMENT_SECONDS, "end": (i + 1) * SEGMENT_SECONDS,
+             "text": " " + " ".join(rng.choice(vocabulary) for _ in range(rng.randint(6, 16))).capitalize() + "."}
+            for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, nargs="+", default=[0.1, 0.5, 1, 3])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--sample", type=Path, default=SAMPLE)
+    args = parser.parse_args()
+
+    base = json.loads(args.sample.read_text())["segments"]
+    vocabulary = sorted({w.strip(".,").lower() for seg in base for w in seg["text"].split()})
+    rng = random.Random(0)
+    print(f"{'meeting':>10} {'segments':>8} {'time':>9}")
+    for hours in args.hours:
+        segments = synthetic(vocabulary, hours, rng)
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            summarize_segments(segments)
+            timings.append(time.perf_counter() - started)
+        print(f"{hours * 60:>8g} m {len(segments):>8} {min(timings) * 1000:>7.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Peak RSS of whole-file vs windowed transcription as recordings get longer.
+
+Long inputs are built by looping docs/assets/sample.mp4 with ffmpeg
+(``-stream_loop``, audio stream copied, so building them is quick). Each
+(mode, length) pair runs in a fresh interpreter that reports its own peak RSS:
+
+  full      decode the whole recording, transcribe it, json.dump the result
+            (the default transcribe_stage path)
+  windowed  transcription.transcribe_windowed: ffmpeg pipe read in windows,
+            segments appended to the transcript file as they finish
+
+With --dry-run the model is replaced by a stub that emits one segment per
+second of audio, which isolates the memory used by audio and transcript
+handling from the model's own footprint.
+
+    python scripts/bench_memory.py --loops 10 40 160 [--dry-run]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+SAMPLE = Path(__file__).resolve().parent.parent / "docs" / "assets" / "sample.mp4"
+SAMPLE_SECONDS = 41
+
+
+def stub_transcribe(samples):
+    seconds = int(len(samples) // 16000)
+    segments = [
+        {"id": i, "seek": 0, "start": float(i), "end": float(i + 1), "text": " word " * 3,
+         "tokens": list(range(50364, 50380)), "temperature": 0.0, "avg_logprob": -0.3,
+         "compression_ratio": 1.2, "no_speech_prob": 0.01}
+        for i in range(seconds)
+    ]
+    return {"text": "".join(s["text"] for s in segments), "segments": segments, "language": "en"}
+
+
+def child(mode: str, source: str, dest: str, model: str, dry_run: bool):
+    from app import transcription
+    from app.audio import decode_file
+
+    if dry_run:
+        transcribe_fn = stub_transcribe
+    else:
+        from app.backends import get_backend
+        transcribe_fn = get_backend(model).transcribe
+
+    started = time.perf_counter()
+    if mode == "full":
+        result = transcribe_fn(decode_file(Path(source)))
+        with open(dest, "w") as f:
+            json.dump(result, f, indent=2)
+    else:
+        transcription.transcribe_windowed(Path(source), Path(dest), transcribe_fn)
+    wall = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"peak_mb": peak_mb, "wall": wall}))
+
+
+def build_input(loops: int, workdir: Path) -> Path:
+    path = workdir / f"sample_x{loops}.mp4"
+    if not path.exists():
+        subprocess.run(
+            ["ffmpeg", "-y", "-stream_loop", str(loops - 1), "-i", str(SAMPLE), "-vn", "-c:a", "copy", str(path)],
+            check=True, capture_output=True,
+        )
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.getenv("WHISPER_MODEL", "tiny.en"))
+    parser.add_argument("--loops", type=int, nargs="+", default=[10, 40, 160])
+    parser.add_argument("--modes", nargs="+", default=["full", "windowed"])
+    parser.add_argument("--dry-run", action="store_true", help="stub out the model")
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "SOURCE", "DEST"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, args.model, args.dry_run)
+        return
+
+    print(f"model {'stub' if args.dry_run else args.model}")
+    print(f"{'mode':>9} {'audio':>8} {'peak RSS':>10} {'wall':>8}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workdir = Path(tmpdir)
+        for loops in args.loops:
+            source = build_input(loops, workdir)
+            minutes = loops * SAMPLE_SECONDS / 60
+            for mode in args.modes:
+                cmd = [sys.executable, __file__, "--model", args.model, "--child", mode, str(source), str(workdir / "out.json")]
+                if args.dry_run:
+                    cmd.append("--dry-run")
+                out = subprocess.run(cmd, capture_output=True, text=True, check=True)
+                stats = json.loads(out.stdout.strip().splitlines()[-1])
+                print(f"{mode:>9} {minutes:>6.0f}min {stats['peak_mb']:>8.0f}MB {stats['wall']:>7.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Real-time factor of chunked Whisper transcription against the number of workers.
+
+Builds a long input by looping docs/assets/sample.mp4, then transcribes it with
+a single model.transcribe call and with transcribe_chunked on 2, 4, ... workers.
+RTF = wall time / audio duration (lower is better). Model loading is excluded:
+each pool is warmed up before it is timed.
+
+    python scripts/bench_parallel_transcribe.py --loops 20 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.audio import SAMPLE_RATE, decode_file
+from app import transcription
+
+SAMPLE = Path(__file__).resolve().parent.parent / "docs" / "assets" / "sample.mp4"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.getenv("WHISPER_MODEL", "tiny.en"))
+    parser.add_argument("--loops", type=int, default=15, help="times to repeat sample.mp4")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--window-seconds", type=float, default=transcription.WHISPER_WINDOW_SECONDS)
+    args = parser.parse_args()
+
+    audio = np.tile(decode_file(SAMPLE), args.loops)
+    duration = len(audio) / SAMPLE_RATE
+    print(f"{duration:.0f}s of audio ({args.loops} x sample.mp4), model {args.model}")
+    print(f"{'workers':>8} {'wall':>9} {'RTF':>7} {'segments':>9}")
+
+    for workers in args.workers:
+        if workers == 1:
+            import whisper
+            model = whisper.load_model(args.model)
+            started = time.perf_counter()
+            result = model.transcribe(audio)
+        else:
+            # Warm the pool so every worker has its model loaded before timing
+            pool = transcription.get_pool(args.model, workers)
+            list(pool.map(transcription._transcribe_window, [audio[:SAMPLE_RATE]] * workers))
+            started = time.perf_counter()
+            result = transcription.transcribe_chunked(audio, args.model, workers, args.window_seconds)
+        wall = time.perf_counter() - started
+        print(f"{workers:>8} {wall:>8.1f}s {wall / duration:>7.3f} {len(result['segments']):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Throughput comparison: serial per-recording loop vs the staged pipeline.
+
+Stages are simulated so the benchmark runs without Zoom, ffmpeg or OpenAI:
+network-bound steps sleep, Whisper burns CPU in a worker process.
+
+    python scripts/bench_pipeline.py --recordings 12 --transcribe-workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.pipeline import Job, Stage, Pipeline, run_serially
+
+IO_SECONDS = {"download": 0.4, "extract": 0.2, "summarize": 0.5, "publish": 0.2}
+CPU_ITERATIONS = 3_000_000
+
+
+def io_stage(name):
+    def run(job):
+        time.sleep(IO_SECONDS[name])
+        return job
+    return run
+
+
+def cpu_transcribe(job):
+    # Stand-in for model.transcribe: pure-Python CPU work
+    acc = 0
+    for i in range(CPU_ITERATIONS):
+        acc += i * i
+    return job
+
+
+def build_stages(args, processes):
+    return [
+        Stage("download", io_stage("download"), args.download_workers),
+        Stage("extract", io_stage("extract"), args.extract_workers),
+        Stage("transcribe", cpu_transcribe, args.transcribe_workers, processes=processes),
+        Stage("summarize", io_stage("summarize"), args.summarize_workers),
+        Stage("publish", io_stage("publish"), args.publish_workers),
+    ]
+
+
+def make_jobs(n):
+    return [Job(recording_id=i, meeting_id=f"bench{i}", recording_url="") for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--recordings", type=int, default=8)
+    parser.add_argument("--download-workers", type=int, default=2)
+    parser.add_argument("--extract-workers", type=int, default=2)
+    parser.add_argument("--transcribe-workers", type=int, default=2)
+    parser.add_argument("--summarize-workers", type=int, default=2)
+    parser.add_argument("--publish-workers", type=int, default=2)
+    parser.add_argument("--queue-size", type=int, default=2)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    run_serially(build_stages(args, processes=False), make_jobs(args.recordings))
+    serial = time.perf_counter() - started
+
+    started = time.perf_counter()
+    Pipeline(build_stages(args, processes=True), queue_size=args.queue_size).run(make_jobs(args.recordings))
+    pipelined = time.perf_counter() - started
+
+    print(f"{args.recordings} recordings")
+    print(f"serial loop : {serial:6.2f}s  ({args.recordings / serial:.2f} recordings/s)")
+    print(f"pipeline    : {pipelined:6.2f}s  ({args.recordings / pipelined:.2f} recordings/s)")
+    print(f"speed-up    : {serial / pipelined:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Full-text search latency on a synthetic corpus.
+
+Generates transcripts from a Zipf-distributed vocabulary (so some terms are
+everywhere and some are rare), indexes them into a fresh SQLite database in
+steps, and after each step times app.search.search() (best passages, grouping,
+snippets and recording lookup) for terms of different frequency.
+
+    python scripts/bench_search.py --transcripts 1000 5000 10000
+    DATABASE_URL=postgresql://... python scripts/bench_search.py --database-url "$DATABASE_URL"
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Recording, SearchPassage
+from app.search import search
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "vo", "zi", "pe", "su", "do", "fa", "gu", "hi", "bo", "ce"]
+
+
+def vocabulary(size: int, rng) -> list:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES, size=rng.integers(2, 5))))
+    return sorted(words, key=lambda w: (len(w), w))
+
+
+def add_transcripts(db, start: int, count: int, words, weights, args, rng):
+    recordings = [{"id": start + i, "platform": "bench", "meeting_id": f"bench-{start + i}", "recording_url": "u"}
+                  for i in range(count)]
+    db.execute(insert(Recording), recordings)
+    passages = []
+    ids = rng.choice(len(words), p=weights, size=(count, args.passages, args.words))
+    for i in range(count):
+        for j in range(args.passages):
+            passages.append({
+                "recording_id": start + i, "kind": "transcript",
+                "start_seconds": j * 30.0, "end_seconds": j * 30.0 + 29.0,
+                "body": " ".join(words[k] for k in ids[i, j]),
+            })
+    db.execute(insert(SearchPassage), passages)
+    db.commit()
+
+
+def timed(db, query: str, runs: int):
+    timings, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = search(db, query, page=1, page_size=20)
+        timings.append(time.perf_counter() - started)
+    return np.percentile(timings, 50) * 1000, np.percentile(timings, 95) * 1000, result["total"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transcripts", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--passages", type=int, default=20, help="30 s passages per transcript")
+    parser.add_argument("--words", type=int, default=70, help="words per passage")
+    parser.add_argument("--vocabulary", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    words = vocabulary(args.vocabulary, rng)
+    weights = 1.0 / np.arange(1, len(words) + 1)
+    weights /= weights.sum()
+    queries = {
+        "common": words[0],
+        "medium": words[200],
+        "rare": words[8000],
+        "two terms": f"{words[50]} {words[3000]}",
+        "absent": "zzzz",
+    }
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(args.database_url or f"sqlite:///{tmpdir}/search.db")
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        print(f"{'transcripts':>11} {'query':>10} {'p50':>8} {'p95':>8} {'matches':>8}")
+        indexed = 0
+        for target in args.transcripts:
+            started = time.perf_counter()
+            add_transcripts(db, indexed + 1, target - indexed, words, weights, args, rng)
+            build = time.perf_counter() - started
+            print(f"{target:>11} indexed {target - indexed} transcripts in {build:.1f}s")
+            indexed = target
+            for name, query in queries.items():
+                p50, p95, total = timed(db, query, args.runs)
+                print(f"{target:>11} {name:>10} {p50:>6.1f}ms {p95:>6.1f}ms {total:>8}")
+        db.close()
+        Base.metadata.drop_all(bind=engine)
+
+
+if __name__ == "__main__":
+    main()
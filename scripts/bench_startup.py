@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Import time and cold-start time of the transcription worker.
+
+Each measurement runs in a fresh interpreter:
+
+  eager (old behaviour) : import whisper + LangChain and load the model, as
+                          app.summarizer used to do at import time
+  import app.summarizer : what unit tests, the demo script and summary-only
+                          processes now pay
+  cold start (lazy)     : import + first transcribe() of 1 s of audio, which
+                          loads the model through the registry
+  cold start (server)   : import + first transcribe() via a warm model server
+                          (only with --server-address)
+
+    python scripts/bench_startup.py [--server-address /tmp/meetmate-whisper.sock]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+EAGER = """
+import time
+t = time.perf_counter()
+import whisper
+from langchain.chat_models import ChatOpenAI
+from langchain.chains.summarize import load_summarize_chain
+whisper.load_model({model!r})
+print(time.perf_counter() - t)
+"""
+
+IMPORT_ONLY = """
+import time
+t = time.perf_counter()
+import app.summarizer
+print(time.perf_counter() - t)
+"""
+
+COLD_START = """
+import time
+t = time.perf_counter()
+import numpy as np
+import app.summarizer
+app.summarizer.transcribe(np.zeros(16000, dtype=np.float32))
+print(time.perf_counter() - t)
+"""
+
+
+def measure(code: str, runs: int, env=None) -> float:
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True,
+            env=dict(os.environ, **(env or {})),
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=os.getenv("WHISPER_MODEL", "tiny.en"))
+    parser.add_argument("--runs", type=int, default=3, help="best of N fresh interpreters")
+    parser.add_argument("--server-address", help="address of a running app.model_server")
+    args = parser.parse_args()
+
+    env = {"WHISPER_MODEL": args.model, "WHISPER_SERVER_ADDRESS": ""}
+    rows = [
+        ("eager (old behaviour)", measure(EAGER.format(model=args.model), args.runs)),
+        ("import app.summarizer", measure(IMPORT_ONLY, args.runs, env)),
+        ("cold start (lazy)", measure(COLD_START, args.runs, env)),
+    ]
+    if args.server_address:
+        rows.append(("cold start (server)", measure(COLD_START, args.runs, dict(env, WHISPER_SERVER_ADDRESS=args.server_address))))
+
+    for name, seconds in rows:
+        print(f"{name:24} {seconds:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
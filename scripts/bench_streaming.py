@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Disk bytes written and wall time: file-based extraction vs streaming decode.
+
+Serves docs/assets over a local HTTP server and fetches sample.mp4 both ways:
+
+  file path : download .mp4 to a temp dir → ffmpeg writes .wav → read .wav
+  streaming : HTTP response → ffmpeg stdin → PCM on stdout → NumPy array
+
+sample.mp4 keeps its moov index at the end, which can't be decoded from a pipe,
+so the streaming run uses a faststart remux of it (and the original is reported
+separately to show the fallback).
+
+    python scripts/bench_streaming.py [--transcribe]
+"""
+import argparse
+import functools
+import http.server
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import audio
+
+ASSETS = Path(__file__).resolve().parent.parent / "docs" / "assets"
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(directory: Path):
+    handler = functools.partial(QuietHandler, directory=str(directory))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def file_path_run(url: str, transcribe):
+    # Mirrors download_stage + extract_stage + transcribe_stage
+    with tempfile.TemporaryDirectory() as tmpdir:
+        video_file = Path(tmpdir) / "meeting.mp4"
+        audio_file = Path(tmpdir) / "audio.wav"
+        download_file(url, video_file)
+        extract_audio(video_file, audio_file)
+        written = video_file.stat().st_size + audio_file.stat().st_size
+        if transcribe:
+            transcribe(audio_file)
+        else:
+            audio.decode_file(audio_file)
+    return written
+
+
+def streaming_run(url: str, transcribe):
+    # Mirrors stream_stage + transcribe_stage; nothing is written locally
+    samples = audio.stream_audio(url)
+    if transcribe:
+        transcribe(samples)
+    return 0
+
+
+def fallback_run(url: str, transcribe):
+    # load_audio on a non-faststart file: only the downloaded container hits disk
+    samples = audio.load_audio(url)
+    if transcribe:
+        transcribe(samples)
+    return int(requests.head(url).headers["Content-Length"])
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transcribe", action="store_true", help="also run Whisper on the decoded audio")
+    args = parser.parse_args()
+
+    # Import up front so module load time isn't charged to the first run
+    global download_file, extract_audio
+    from app.summarizer import download_file, extract_audio
+    transcribe = None
+    if args.transcribe:
+        from app.summarizer import transcribe
+
+    with tempfile.TemporaryDirectory() as served:
+        served = Path(served)
+        shutil.copy(ASSETS / "sample.mp4", served / "sample.mp4")
+        subprocess.run(
+            ["ffmpeg", "-y", "-i", str(served / "sample.mp4"), "-c", "copy", "-movflags", "+faststart",
+             str(served / "sample_faststart.mp4")],
+            check=True, capture_output=True,
+        )
+        server = serve(served)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            rows = [
+                ("file path (sample.mp4)",) + timed(file_path_run, f"{base}/sample.mp4", transcribe),
+                ("streaming (faststart remux)",) + timed(streaming_run, f"{base}/sample_faststart.mp4", transcribe),
+                ("streaming → fallback (sample.mp4)",) + timed(fallback_run, f"{base}/sample.mp4", transcribe),
+            ]
+        finally:
+            server.shutdown()
+
+    print(f"{'mode':36} {'disk bytes written':>20} {'wall time':>10}")
+    for name, written, seconds in rows:
+        print(f"{name:36} {written:>20,} {seconds:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
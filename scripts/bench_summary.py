@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Summarisation latency of the refine and map_reduce strategies against a mock LLM.
+
+The mock answers every call after a fixed delay (standing in for an API
+round-trip) and reports fixed token usage, so the numbers isolate how many calls
+each strategy makes and how many of them wait on each other. Transcripts are
+synthetic, about 900 characters per minute of meeting.
+
+    python scripts/bench_summary.py --minutes 30 60 120 --delay 1.0 --concurrency 4 8
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app import summarizer
+
+CHARS_PER_MINUTE = 900
+SENTENCES = [
+    "We went through the release checklist and the open blockers.",
+    "Alice will follow up with the vendor about the contract renewal.",
+    "The team agreed to move the launch to the second week of the month.",
+    "Bob raised concerns about the test coverage of the billing service.",
+    "We decided to freeze new features until the migration is complete.",
+]
+
+
+class FixedDelayChatModel(BaseChatModel):
+    delay: float = 1.0
+    calls: int = 0
+    lock: Any = None
+
+    @property
+    def _llm_type(self):
+        return "fixed-delay"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.delay)
+        with self.lock:
+            self.calls += 1
+        reply = ("**Key Decisions (5 bullet points):**\n- Launch moves a week.\n\n**Action Items:**\n- Alice: vendor."
+                 if "Key Decisions" in messages[-1].content else " ".join(SENTENCES[:3]))
+        usage = {"prompt_tokens": len(messages[-1].content) // 4, "completion_tokens": 60}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))],
+                          llm_output={"token_usage": usage, "model_name": "gpt-4o"})
+
+
+def write_transcript(path: Path, minutes: int):
+    text, i = [], 0
+    while sum(len(s) + 1 for s in text) < minutes * CHARS_PER_MINUTE:
+        text.append(SENTENCES[i % len(SENTENCES)])
+        i += 1
+        if i % 20 == 0:
+            text.append("\n\n")
+    path.write_text(json.dumps({"text": " ".join(text)}))
+
+
+def run(path: Path, strategy: str, concurrency: int, delay: float):
+    llm = FixedDelayChatModel(delay=delay, lock=threading.Lock())
+    summarizer.ChatOpenAI = lambda **kwargs: llm
+    os.environ.update(SUMMARY_STRATEGY=strategy, SUMMARY_CONCURRENCY=str(concurrency))
+    started = time.perf_counter()
+    summary = summarizer.generate_summary(str(path))
+    elapsed = time.perf_counter() - started
+    assert "**Action Items:**" in summary, summary
+    return elapsed, llm.calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=int, nargs="+", default=[30, 60, 120])
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds per mock LLM call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 8])
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "bench")
+    summarizer._load_langchain()
+    print(f"{'minutes':>7} {'strategy':>18} {'calls':>6} {'latency':>9}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for minutes in args.minutes:
+            path = Path(tmpdir) / f"{minutes}.json"
+            write_transcript(path, minutes)
+            runs = [("refine", 1)] + [("map_reduce", c) for c in args.concurrency]
+            for strategy, concurrency in runs:
+                elapsed, calls = run(path, strategy, concurrency, args.delay)
+                label = strategy if strategy == "refine" else f"map_reduce x{concurrency}"
+                print(f"{minutes:>7} {label:>18} {calls:>6} {elapsed:>8.2f}s")
+
+
+if __name__ == "__main__":
+    main()
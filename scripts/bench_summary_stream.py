@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Time to first token and total time of streamed summaries (app.summary_stream)
+against a local mock OpenAI server.
+
+The mock answers chat completions like the API does: a fixed delay before the
+first token (--first-token), then one word every --token-delay seconds, or the
+whole reply at the end when the request isn't streamed. Each meeting length
+is summarised twice with the refine strategy: once blocking, as the batch
+pipeline does (the first word shows when everything is done), and once
+through summary_events(), the generator behind
+POST /recordings/{id}/summary/stream. For the stream it reports the first
+token of any call and the first token of the last call, which is the one
+that becomes the summary.
+
+    python scripts/bench_summary_stream.py --minutes 5 30 60 --chunk-tokens 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import chunking, summarizer
+from app.models import Base, Recording
+from app.summary_stream import summary_events
+
+CHARS_PER_MINUTE = 900
+SENTENCES = [
+    "We went through the release checklist and the open blockers.",
+    "Alice will follow up with the vendor about the contract renewal.",
+    "The team agreed to move the launch to the second week of the month.",
+    "Bob raised concerns about the test coverage of the billing service.",
+    "We decided to freeze new features until the migration is complete.",
+]
+REPLY = ("**Key Decisions (5 bullet points):**\n- Launch moves a week.\n- Features frozen.\n- Vendor renewal.\n"
+         "- Billing tests.\n- Checklist reviewed.\n\n**Action Items:**\n- Alice: follow up with the vendor.")
+
+
+class MockOpenAI(BaseHTTPRequestHandler):
+    first_token = 0.5
+    token_delay = 0.02
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        words = REPLY.split(" ")
+        time.sleep(self.first_token)
+        if not body.get("stream"):
+            time.sleep(self.token_delay * (len(words) - 1))
+            data = json.dumps({
+                "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 1000, "completion_tokens": len(words), "total_tokens": 1000 + len(words)},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for i, word in enumerate(words):
+            if i:
+                time.sleep(self.token_delay)
+            chunk = {"id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                     "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, *args):
+        pass
+
+
+def synthetic_transcript(minutes: int, directory: Path) -> str:
+    sentences, size = [], 0
+    while size < minutes * CHARS_PER_MINUTE:
+        sentence = SENTENCES[len(sentences) % len(SENTENCES)]
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    path = directory / f"stream_{minutes}m.json"
+    path.write_text(json.dumps({"text": " ".join(sentences)}))
+    return str(path)
+
+
+async def streamed(recording_id: int, path: str):
+    started = time.perf_counter()
+    first = last_call_first = None
+    last_call = 0
+    async for frame in summary_events(recording_id, path):
+        now = time.perf_counter() - started
+        event, data = frame.split("\n")[0][len("event: "):], json.loads(frame.split("\n")[1][len("data: "):])
+        if event == "token":
+            first = first if first is not None else now
+            if data["call"] > last_call:
+                last_call, last_call_first = data["call"], now
+        elif event == "error":
+            raise RuntimeError(data["error"])
+    return first, last_call_first, time.perf_counter() - started, last_call
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--minutes", type=int, nargs="+", default=[5, 30, 60])
+    parser.add_argument("--first-token", type=float, default=0.5, help="Seconds before the mock's first token")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Seconds between the mock's tokens")
+    parser.add_argument("--chunk-tokens", type=int, default=2000)
+    args = parser.parse_args()
+
+    MockOpenAI.first_token, MockOpenAI.token_delay = args.first_token, args.token_delay
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ.update({
+        "OPENAI_API_KEY": "bench", "OPENAI_MODEL": "gpt-4o", "SUMMARY_STRATEGY": "refine", "SUMMARY_ENGINE": "llm",
+        "LLM_CACHE_ENABLED": "0", "SUMMARY_CHUNK_TOKENS": str(args.chunk_tokens),
+        "OPENAI_API_BASE": f"http://127.0.0.1:{server.server_port}/v1",
+        # Measure the mock, not the rate limiter
+        "OPENAI_RPM": "100000", "OPENAI_TPM": "100000000",
+    })
+    chunking.get_encoder("gpt-4o")  # load the tokenizer outside the timings
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    summarizer.SessionLocal = sessionmaker(bind=engine)
+
+    print(f"{'minutes':>7} {'calls':>5} {'blocking':>9} {'first token':>11} {'final call':>10} {'stream total':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        summarizer.generate_summary(synthetic_transcript(1, Path(tmp)))  # imports and client setup, untimed
+        for minutes in args.minutes:
+            path = synthetic_transcript(minutes, Path(tmp))
+            db = summarizer.SessionLocal()
+            rec = Recording(platform="bench", meeting_id=f"stream-{minutes}", recording_url="", transcript_path=path)
+            db.add(rec)
+            db.commit()
+            recording_id = rec.id
+            db.close()
+
+            started = time.perf_counter()
+            summarizer.generate_summary(path)
+            blocking = time.perf_counter() - started
+            first, final_first, total, calls = asyncio.run(streamed(recording_id, path))
+            print(f"{minutes:>7} {calls:>5} {blocking:>8.2f}s {first:>10.2f}s {final_first:>9.2f}s {total:>11.2f}s")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
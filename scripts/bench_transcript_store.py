@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Size and load time of JSON vs compact transcripts.
+
+Builds a long synthetic transcript by repeating the segments of
+audio_cache/demo123.json (shifted in time) and writes it in both formats.
+Load times are best of N for:
+
+  full text   what generate_summary / publish_to_confluence need
+  full load   the complete result dict
+  10 min      segments overlapping a ten-minute range in the middle
+
+    python scripts/bench_transcript_store.py --hours 3
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.transcript_store import load_segments, load_text, load_transcript, save_transcript
+
+REFERENCE = Path(__file__).resolve().parent.parent / "audio_cache" / "demo123.json"
+
+
+def build_transcript(hours: float) -> dict:
+    base = json.loads(REFERENCE.read_text())
+    period = base["segments"][-1]["end"]
+    segments = []
+    while not segments or segments[-1]["end"] < hours * 3600:
+        shift = len(segments) // len(base["segments"]) * period
+        for seg in base["segments"]:
+            segments.append(dict(seg, id=len(segments), start=seg["start"] + shift, end=seg["end"] + shift,
+                                 seek=seg["seek"] + int(shift * 100)))
+    return {"text": "".join(s["text"] for s in segments), "segments": segments, "language": "en"}
+
+
+def best_of(runs: int, fn) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    transcript = build_transcript(args.hours)
+    middle = args.hours * 1800
+    print(f"{args.hours:g}h synthetic transcript, {len(transcript['segments'])} segments")
+    print(f"{'format':>11} {'size':>10} {'full text':>10} {'full load':>10} {'10 min':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name in ("meeting.json", "meeting.transcript"):
+            path = Path(tmpdir) / name
+            save_transcript(transcript, path)
+            text = best_of(args.runs, lambda: load_text(path))
+            full = best_of(args.runs, lambda: load_transcript(path))
+            window = best_of(args.runs, lambda: load_segments(path, middle, middle + 600))
+            print(f"{path.suffix:>11} {path.stat().st_size / 1024:>8.0f}KiB "
+                  f"{text * 1000:>8.1f}ms {full * 1000:>8.1f}ms {window * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Convert legacy JSON transcripts to the compact ``.transcript`` format.
+
+Walks the given files and directories (default: $AUDIO_DIR, including the
+transcript cache under it) and writes a ``.transcript`` next to every Whisper
+``.json`` transcript. Files that were hard links to each other (meeting file
+and cached copy) stay linked after conversion. With --update-db, recordings
+whose transcript_path points at a converted file are repointed; --remove then
+deletes the JSON originals.
+
+    python scripts/convert_transcripts.py [paths ...] [--update-db [--remove]]
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.transcript_store import convert
+from app.transcript_cache import link
+
+
+def find_transcripts(paths):
+    for path in paths:
+        path = Path(path)
+        candidates = sorted(path.rglob("*.json")) if path.is_dir() else [path]
+        for candidate in candidates:
+            if candidate.name.endswith(".part.json"):
+                # Download progress sidecars, not transcripts
+                continue
+            yield candidate
+
+
+def is_transcript(path: Path) -> bool:
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return isinstance(data, dict) and "text" in data and "segments" in data
+
+
+def update_db(converted: dict):
+    from app.db import SessionLocal
+    from app.models import Recording
+
+    db = SessionLocal()
+    try:
+        updated = 0
+        for rec in db.query(Recording).filter(Recording.transcript_path.like("%.json")):
+            new = converted.get(Path(rec.transcript_path).resolve())
+            if new is not None:
+                rec.transcript_path = str(Path(rec.transcript_path).with_suffix(new.suffix))
+                updated += 1
+        db.commit()
+        return updated
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*", default=[os.getenv("AUDIO_DIR", "./audio_cache")])
+    parser.add_argument("--update-db", action="store_true", help="repoint Recording.transcript_path")
+    parser.add_argument("--remove", action="store_true", help="delete the JSON files afterwards")
+    args = parser.parse_args()
+    if args.remove and not args.update_db:
+        parser.error("--remove needs --update-db, or recordings would point at deleted files")
+
+    converted = {}
+    by_inode = {}
+    before = after = 0
+    for path in find_transcripts(args.paths):
+        if not is_transcript(path):
+            continue
+        stat = path.stat()
+        inode = (stat.st_dev, stat.st_ino)
+        if inode in by_inode:
+            dest = path.with_suffix(by_inode[inode].suffix)
+            link(by_inode[inode], dest)
+        else:
+            try:
+                dest = convert(path)
+            except ValueError as e:
+                print(f"Skipping {path}: {e}")
+                continue
+            by_inode[inode] = dest
+            before += stat.st_size
+            after += dest.stat().st_size
+        converted[path.resolve()] = dest
+        print(f"{path} -> {dest.name}")
+
+    print(f"Converted {len(converted)} transcripts: {before / 1024:.1f} KiB -> {after / 1024:.1f} KiB")
+    if args.update_db:
+        print(f"Repointed {update_db(converted)} recordings")
+    if args.remove:
+        for path in converted:
+            path.unlink()
+
+
+if __name__ == "__main__":
+    main()
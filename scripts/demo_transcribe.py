@@ -7,12 +7,11 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 #os.environ["SKIP_DOTENV"] = "1"
 # Override the database URL to use an in-memory SQLite for demo purposes
 #os.environ["DATABASE_URL"] = "sqlite:///:memory:"
-# Provide a dummy OpenAI API key for the demo if not set, to avoid ValueError
+# Without an OpenAI API key, summarise with the local extractive engine (app.extractive)
 if not os.getenv("OPENAI_API_KEY"):
-    print("Warning: OPENAI_API_KEY not found in environment. Using a dummy key for demo.")
-    print("Summaries will be generated by a mock and may not be meaningful.")
-    print("Set your actual OPENAI_API_KEY in .env for real summaries.")
-    os.environ["OPENAI_API_KEY"] = "sk-dummykeyforlocaltestingonly12345"
+    print("Warning: OPENAI_API_KEY not found in environment. Using the extractive summarizer for the demo.")
+    print("Set your actual OPENAI_API_KEY in .env for LLM summaries.")
+    os.environ["SUMMARY_ENGINE"] = "extractive"
 
 try:
     import json
@@ -20,6 +19,7 @@ try:
     from app.db import Base, engine, SessionLocal
     from app.models import Recording
     from app.summarizer import run_transcription_job, AUDIO_DIR # generate_summary is part of this job
+    from app.transcript_store import load_text
     from sqlalchemy import create_engine # Keep this for explicit engine override
     from sqlalchemy.pool import StaticPool
     from sqlalchemy.orm import sessionmaker
@@ -75,8 +75,11 @@ if not recording:
 else:
     print(f"Using existing recording: {meeting_id_for_demo}. Clearing transcript/summary for re-run.")
     recording.transcript_fetched = False
+    recording.status = "pending"
     recording.transcript_path = None
     recording.summary = None
+    recording.summary_status = None
+    recording.summary_error = None
     db.commit()
 
 # Cache the ID before closing the session for insert/update
@@ -94,7 +97,7 @@ except Exception as e:
     print(f"1. HTTP server is running: python3 -m http.server {server_port} --directory docs/assets")
     print("2. sample.mp4 exists in docs/assets")
     print("3. ffmpeg is installed (e.g., brew install ffmpeg or sudo apt-get install ffmpeg)")
-    print("4. OPENAI_API_KEY is set in your .env file for real summaries, or a dummy is used.")
+    print("4. OPENAI_API_KEY is set in your .env file for LLM summaries, or the extractive engine is used.")
     sys.exit(1)
 
 # Re-fetch the recording to get the summary
@@ -103,14 +106,14 @@ final_recording = db.query(Recording).filter_by(id=db_recording_id).first()
 db.close()
 
 # Locate and print the transcript and summary
-transcript_file = AUDIO_DIR / f"{db_meeting_id}.json"
-print(f"\nTranscript JSON path: {transcript_file}")
+transcript_file = Path(final_recording.transcript_path) if final_recording and final_recording.transcript_path else None
+print(f"\nTranscript path: {transcript_file}")
 
-if transcript_file.exists():
+if transcript_file and transcript_file.exists():
     try:
-        transcript_data = json.loads(transcript_file.read_text())
+        transcript_text = load_text(transcript_file)
         print("Transcription successful!")
-        print(f"Transcript text (first 200 chars):\n{transcript_data.get('text', '<no text key>')[:200]}...")
+        print(f"Transcript text (first 200 chars):\n{transcript_text[:200]}...")
     except Exception as e:
         print(f"Error reading transcript file: {e}")
 else:
@@ -119,6 +122,8 @@ else:
 if final_recording and final_recording.summary:
     print("\nSummary generation successful!")
     print(f"Summary:\n{final_recording.summary}")
+elif final_recording and final_recording.summary_status == "failed":
+    print(f"\nSummary failed for {final_recording.meeting_id}: {final_recording.summary_error}")
 elif final_recording:
     print(f"\nSummary not found for {final_recording.meeting_id}. Check logs for errors.")
 else:
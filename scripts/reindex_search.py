@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Rebuild the full-text search index from every recording's transcript and summary.
+
+New recordings are indexed as they are processed; run this once after the
+search migration, or whenever the index needs rebuilding.
+
+    python scripts/reindex_search.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.db import SessionLocal
+from app.search import reindex_all
+
+
+def main():
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        count = reindex_all(db)
+    finally:
+        db.close()
+    print(f"Indexed {count} recordings in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
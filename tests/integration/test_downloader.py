@@ -0,0 +1,177 @@
+import functools
+import http.server
+import re
+import threading
+from pathlib import Path
+
+import pytest
+
+from app import downloader
+from app.downloader import download
+
+ASSETS = Path(__file__).resolve().parents[2] / "docs" / "assets"
+SAMPLE = ASSETS / "sample.mp4"
+PART_SIZE = 64 * 1024
+
+
+class RangeRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """http.server with single-range support, request logging and fault injection."""
+
+    requests_seen = []
+    # Range starts whose first request is cut off halfway through the body
+    fail_once = set()
+    # Range starts that always fail
+    fail_always = set()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        self.requests_seen.append(self.headers.get("Range"))
+        if not match:
+            return super().do_GET()
+        path = Path(self.translate_path(self.path))
+        data = path.read_bytes()
+        start = int(match.group(1))
+        if start >= len(data):
+            self.send_error(416)
+            return
+        end = int(match.group(2)) if match.group(2) else len(data) - 1
+        body = data[start:end + 1]
+
+        if start in self.fail_always:
+            self.send_error(503)
+            return
+        truncate = start in self.fail_once
+        self.fail_once.discard(start)
+
+        self.send_response(206)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Range", f"bytes {start}-{start + len(body) - 1}/{len(data)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body[: len(body) // 2] if truncate else body)
+        if truncate:
+            self.close_connection = True
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def serve(handler_cls):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(handler_cls, directory=str(ASSETS)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def range_server():
+    RangeRequestHandler.requests_seen = []
+    RangeRequestHandler.fail_once = set()
+    RangeRequestHandler.fail_always = set()
+    server = serve(RangeRequestHandler)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(downloader.time, "sleep", lambda s: None)
+
+
+def test_large_file_is_fetched_as_concurrent_ranges(range_server, tmp_path):
+    dest = tmp_path / "sample.mp4"
+    size = download(f"{range_server}/sample.mp4", dest, part_size=PART_SIZE, concurrency=4)
+
+    assert size == SAMPLE.stat().st_size
+    assert dest.read_bytes() == SAMPLE.read_bytes()
+    expected_parts = -(-size // PART_SIZE)
+    # One probe plus one request per part
+    assert len(RangeRequestHandler.requests_seen) == expected_parts + 1
+    assert not (tmp_path / "sample.mp4.part").exists()
+    assert not (tmp_path / "sample.mp4.part.json").exists()
+
+
+def test_truncated_range_is_retried(range_server, tmp_path):
+    RangeRequestHandler.fail_once = {PART_SIZE * 3}
+    dest = tmp_path / "sample.mp4"
+    download(f"{range_server}/sample.mp4", dest, part_size=PART_SIZE, concurrency=4)
+
+    assert dest.read_bytes() == SAMPLE.read_bytes()
+    assert RangeRequestHandler.requests_seen.count(f"bytes={PART_SIZE * 3}-{PART_SIZE * 4 - 1}") == 2
+
+
+def test_interrupted_download_resumes_from_finished_parts(range_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(downloader, "DOWNLOAD_RETRIES", 0)
+    RangeRequestHandler.fail_always = {PART_SIZE * 5}
+    dest = tmp_path / "sample.mp4"
+    url = f"{range_server}/sample.mp4"
+
+    with pytest.raises(Exception):
+        download(url, dest, part_size=PART_SIZE, concurrency=2)
+    assert (tmp_path / "sample.mp4.part.json").exists()
+    assert not dest.exists()
+
+    RangeRequestHandler.fail_always = set()
+    RangeRequestHandler.requests_seen = []
+    download(url, dest, part_size=PART_SIZE, concurrency=2)
+
+    assert dest.read_bytes() == SAMPLE.read_bytes()
+    total_parts = -(-SAMPLE.stat().st_size // PART_SIZE)
+    # Only the parts that never finished are fetched again
+    assert 1 < len(RangeRequestHandler.requests_seen) - 1 < total_parts
+
+
+def test_sidecar_without_its_partial_file_starts_over(range_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(downloader, "DOWNLOAD_RETRIES", 0)
+    RangeRequestHandler.fail_always = {PART_SIZE * 5}
+    dest = tmp_path / "sample.mp4"
+    url = f"{range_server}/sample.mp4"
+    with pytest.raises(Exception):
+        download(url, dest, part_size=PART_SIZE, concurrency=2)
+    (tmp_path / "sample.mp4.part").unlink()
+
+    RangeRequestHandler.fail_always = set()
+    download(url, dest, part_size=PART_SIZE, concurrency=2)
+
+    # The finished ranges the sidecar lists went with the partial file, so they aren't trusted
+    assert dest.read_bytes() == SAMPLE.read_bytes()
+
+
+def test_server_without_range_support_falls_back_to_single_stream(tmp_path):
+    server = serve(QuietHandler)
+    try:
+        dest = tmp_path / "sample.mp4"
+        size = download(f"http://127.0.0.1:{server.server_address[1]}/sample.mp4", dest, part_size=PART_SIZE)
+    finally:
+        server.shutdown()
+    assert size == SAMPLE.stat().st_size
+    assert dest.read_bytes() == SAMPLE.read_bytes()
+
+
+@pytest.mark.parametrize("leftover", [b"", b"trailing garbage"])
+def test_single_stream_resumes_from_a_complete_or_oversized_partial_file(range_server, tmp_path, leftover):
+    dest = tmp_path / "sample.mp4"
+    (tmp_path / "sample.mp4.part").write_bytes(SAMPLE.read_bytes() + leftover)
+
+    # A part size this large makes the file a single stream
+    size = download(f"{range_server}/sample.mp4", dest, part_size=SAMPLE.stat().st_size)
+
+    assert size == SAMPLE.stat().st_size
+    assert dest.read_bytes() == SAMPLE.read_bytes()
+    # A complete partial file needs no request beyond the probe; an oversized one is fetched again in full
+    assert RangeRequestHandler.requests_seen[1:] == ([] if not leftover else [None])
+
+
+def test_single_stream_starts_over_when_the_server_rejects_the_resume_range(range_server, tmp_path):
+    part = tmp_path / "sample.mp4.part"
+    part.write_bytes(SAMPLE.read_bytes())
+
+    # Without a probed size the partial file is resumed blindly, and the server answers 416
+    downloader._download_stream(f"{range_server}/sample.mp4", downloader.get_session(), part, True, None)
+
+    assert part.read_bytes() == SAMPLE.read_bytes()
+    assert RangeRequestHandler.requests_seen == [f"bytes={SAMPLE.stat().st_size}-", None]
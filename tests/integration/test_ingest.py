@@ -0,0 +1,105 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import CompileError
+from sqlalchemy.orm import sessionmaker
+
+from app.ingest import QueueFull, RecordingWriter, insert_new
+from app.models import Base, Recording
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'ingest.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def gated(engine):
+    """
+    A session factory whose first session waits for ``gate``, so that rows
+    queue up behind it; ``writing`` is set once the writer is waiting.
+    """
+    Session = sessionmaker(bind=engine)
+    gate, writing = threading.Event(), threading.Event()
+
+    def factory():
+        if not writing.is_set():
+            writing.set()
+            gate.wait(5)
+        return Session()
+    return factory, gate, writing
+
+
+def test_queued_rows_share_a_commit(engine):
+    commits = []
+    event.listen(engine, "commit", lambda conn: commits.append(1))
+    factory, gate, writing = gated(engine)
+    writer = RecordingWriter(factory, maxsize=100)
+
+    futures = [writer.submit({"platform": "zoom", "meeting_id": "m0", "recording_url": "u"})]
+    writing.wait(5)
+    futures += [writer.submit({"platform": "zoom", "meeting_id": f"m{i}", "recording_url": "u"}) for i in range(1, 50)]
+    gate.set()
+    ids = [f.result(5) for f in futures]
+    writer.stop()
+
+    assert len(set(ids)) == 50
+    # The first row on its own, then the 49 that queued while it was written
+    assert len(commits) == 2
+    assert sessionmaker(bind=engine)().query(Recording).count() == 50
+
+
+def test_bad_row_does_not_fail_the_batch(engine):
+    factory, gate, writing = gated(engine)
+    writer = RecordingWriter(factory)
+
+    first = writer.submit({"platform": "zoom", "meeting_id": "m0", "recording_url": "u"})
+    writing.wait(5)
+    good = writer.submit({"platform": "zoom", "meeting_id": "m1", "recording_url": "u"})
+    bad = writer.submit({"platform": "zoom", "no_such_column": "x"})
+    gate.set()
+
+    assert first.result(5) and good.result(5)
+    with pytest.raises(CompileError):
+        bad.result(5)
+    writer.stop()
+
+
+def test_full_queue_is_refused(engine):
+    factory, gate, writing = gated(engine)
+    writer = RecordingWriter(factory, maxsize=2)
+
+    writer.submit({"platform": "zoom", "meeting_id": "m0", "recording_url": "u"})
+    writing.wait(5)
+    writer.submit({"platform": "zoom", "meeting_id": "m1", "recording_url": "u"})
+    writer.submit({"platform": "zoom", "meeting_id": "m2", "recording_url": "u"})
+    with pytest.raises(QueueFull):
+        writer.submit({"platform": "zoom", "meeting_id": "m3", "recording_url": "u"})
+    gate.set()
+    writer.stop()
+    assert sessionmaker(bind=engine)().query(Recording).count() == 3
+
+
+def test_duplicate_recording_files_are_stored_once(engine):
+    factory, gate, writing = gated(engine)
+    writer = RecordingWriter(factory)
+    row = {"platform": "zoom", "meeting_id": "m0", "recording_url": "u", "recording_file_id": "f1"}
+
+    first = writer.submit(row)
+    writing.wait(5)
+    # Both in the next batch: one repeats the stored row, the other is another file of the meeting
+    again, other = writer.submit(row), writer.submit(dict(row, recording_file_id="f2"))
+    gate.set()
+
+    assert first.result(5) and other.result(5) and again.result(5) is None
+    assert writer.submit(row).result(5) is None
+    writer.stop()
+    assert sessionmaker(bind=engine)().query(Recording).count() == 2
+
+
+def test_insert_is_an_upsert_on_postgres():
+    sql = str(insert_new("postgresql").values(platform="zoom").compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (platform, meeting_id, recording_file_id) DO NOTHING RETURNING recordings.id" in sql
@@ -0,0 +1,159 @@
+import datetime
+import threading
+from collections import Counter
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base
+from app.models import Recording
+from app.jobs import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_PROCESSING,
+    claim_jobs,
+    claim_summaries,
+    complete_job,
+    fail_job,
+    release_summary,
+)
+
+NUM_RECORDINGS = 60
+NUM_WORKERS = 6
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    # A file-backed database so each worker gets its own real connection
+    url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return url
+
+
+def seed(url, n):
+    engine = create_engine(url)
+    db = sessionmaker(bind=engine)()
+    db.add_all(Recording(platform="zoom", meeting_id=f"m{i}", recording_url=f"http://x/{i}.mp4") for i in range(n))
+    db.commit()
+    db.close()
+    engine.dispose()
+
+
+def test_concurrent_workers_never_process_a_recording_twice(db_url):
+    seed(db_url, NUM_RECORDINGS)
+    processed = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(NUM_WORKERS)
+
+    def worker(n):
+        engine = create_engine(db_url, connect_args={"timeout": 30})
+        db = sessionmaker(bind=engine)()
+        worker_id = f"worker-{n}"
+        barrier.wait()
+        while True:
+            claimed = claim_jobs(db, worker_id, limit=3)
+            if not claimed:
+                break
+            for rec in claimed:
+                with lock:
+                    processed.append(rec.id)
+                assert complete_job(db, rec.id, worker_id)
+        db.close()
+        engine.dispose()
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(NUM_WORKERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    counts = Counter(processed)
+    assert len(counts) == NUM_RECORDINGS
+    assert [rid for rid, c in counts.items() if c > 1] == []
+
+    engine = create_engine(db_url)
+    db = sessionmaker(bind=engine)()
+    assert {r.status for r in db.query(Recording).all()} == {JOB_DONE}
+    db.close()
+
+
+def test_expired_lease_is_reclaimed(db_url):
+    seed(db_url, 1)
+    engine = create_engine(db_url)
+    db = sessionmaker(bind=engine)()
+
+    [rec] = claim_jobs(db, "crashed-worker")
+    assert rec.status == JOB_PROCESSING
+    # A live lease is not claimable by anyone else
+    assert claim_jobs(db, "other-worker") == []
+
+    rec.lease_expires_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+    db.commit()
+
+    [reclaimed] = claim_jobs(db, "other-worker")
+    assert reclaimed.id == rec.id
+    assert reclaimed.lease_owner == "other-worker"
+    assert reclaimed.attempts == 2
+    # The crashed worker lost its lease and can no longer finish the job
+    assert not complete_job(db, rec.id, "crashed-worker")
+    assert complete_job(db, rec.id, "other-worker")
+    db.close()
+
+
+def test_failed_job_is_retried_until_max_attempts(db_url, monkeypatch):
+    monkeypatch.setattr("app.jobs.JOB_MAX_ATTEMPTS", 2)
+    seed(db_url, 1)
+    engine = create_engine(db_url)
+    db = sessionmaker(bind=engine)()
+
+    [rec] = claim_jobs(db, "w")
+    assert fail_job(db, rec.id, "w", "download: timeout")
+    db.refresh(rec)
+    assert rec.status == JOB_PENDING
+    assert rec.last_error == "download: timeout"
+
+    [rec] = claim_jobs(db, "w")
+    assert fail_job(db, rec.id, "w", "download: timeout")
+    db.refresh(rec)
+    assert rec.status == JOB_FAILED
+    assert claim_jobs(db, "w") == []
+    db.close()
+
+
+def test_summaries_are_claimed_once_and_given_up_after_max_attempts(db_url, monkeypatch):
+    monkeypatch.setattr("app.jobs.SUMMARY_MAX_ATTEMPTS", 2)
+    seed(db_url, 3)
+    engine = create_engine(db_url)
+    db = sessionmaker(bind=engine)()
+
+    [summarising, transcribed, pathless] = claim_jobs(db, "pipeline", limit=3)
+    for rec in (summarising, transcribed, pathless):
+        rec.transcript_fetched = True
+    summarising.transcript_path = transcribed.transcript_path = "t.transcript"
+    db.commit()
+    assert complete_job(db, transcribed.id, "pipeline")
+    # Without a transcript there is nothing to summarise, so it is never claimed
+    assert complete_job(db, pathless.id, "pipeline")
+    # The other one's summary is still being generated in the pipeline
+    [rec] = claim_summaries(db, "w1")
+    assert rec.id == transcribed.id
+    assert claim_summaries(db, "w2") == []
+
+    # A spent budget gives the attempt back
+    assert release_summary(db, rec.id, "w1", count_attempt=False)
+    [rec] = claim_summaries(db, "w2")
+    assert rec.summary_attempts == 1
+    rec.lease_expires_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+    db.commit()
+
+    # A failure keeps the lease until it runs out, then the summary is retried until SUMMARY_MAX_ATTEMPTS
+    [rec] = claim_summaries(db, "w1")
+    assert rec.summary_attempts == 2
+    assert not release_summary(db, rec.id, "w2")
+    assert release_summary(db, rec.id, "w1")
+    assert claim_summaries(db, "w1") == []
+    db.close()
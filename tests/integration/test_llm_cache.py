@@ -0,0 +1,123 @@
+import datetime
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult, Generation
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.llm_cache import LLMCache, track_hits
+from app.models import Base, LLMCacheEntry, Recording, SummaryMetrics
+from app.summarizer import generate_summary
+
+
+class CountingChatModel(BaseChatModel):
+    calls: int = 0
+
+    @property
+    def _llm_type(self):
+        return "counting"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        reply = "**Key Decisions (5 bullet points):**\n- Ship.\n\n**Action Items:**\n- Bob: tests."
+        usage = {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))],
+                          llm_output={"token_usage": usage, "model_name": "gpt-4o"})
+
+
+@pytest.fixture
+def Session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.mark.parametrize("strategy", ["refine", "map_reduce"])
+def test_second_summary_is_served_from_cache(Session, tmp_path, strategy):
+    db = Session()
+    rec = Recording(platform="zoom", meeting_id="m1", recording_url="u")
+    db.add(rec)
+    db.commit()
+    path = tmp_path / "t.json"
+    path.write_text(json.dumps({"text": " ".join(f"Point {i} was discussed at length." for i in range(300))}))
+    models = []
+
+    def chat_model(**kwargs):
+        models.append(CountingChatModel(cache=kwargs["cache"]))
+        return models[-1]
+
+    env = {"OPENAI_API_KEY": "k", "OPENAI_MODEL": "gpt-4o", "SUMMARY_STRATEGY": strategy,
+           "SUMMARY_CHUNK_TOKENS": "500", "OPENAI_COST_PER_TOKEN": "0.01"}
+    with patch.dict(os.environ, env), patch("app.summarizer.ChatOpenAI", chat_model), \
+            patch("app.summarizer.SessionLocal", Session):
+        first = generate_summary(str(path), rec.id)
+        second = generate_summary(str(path), rec.id)
+
+    assert first == second
+    assert models[0].calls > 1 and models[1].calls == 0
+    paid, cached = db.query(SummaryMetrics).order_by(SummaryMetrics.id).all()
+    assert (paid.cache_hits, paid.total_tokens) == (0, 120 * models[0].calls)
+    assert (cached.cache_hits, cached.total_tokens, cached.cost) == (models[0].calls, 0, 0)
+    assert cached.cached_tokens > 0
+    db.close()
+
+
+def test_lookup_misses_on_different_model_parameters(Session):
+    cache = LLMCache(Session, "gpt-4o")
+    cache.update("prompt", "temperature=0", [Generation(text="answer")])
+
+    with track_hits() as hits:
+        assert cache.lookup("prompt", "temperature=0")[0].text == "answer"
+        assert cache.lookup("prompt", "temperature=1") is None
+        assert cache.lookup("other prompt", "temperature=0") is None
+    assert hits.hits == 1
+
+
+def test_least_recently_used_entries_are_evicted_over_max_size(Session):
+    cache = LLMCache(Session, "gpt-4o")
+    cache.update("a", "m", [Generation(text="x" * 100)])
+    entry_size = Session().query(LLMCacheEntry.size).scalar()
+    cache.max_bytes = entry_size * 2
+    cache.update("b", "m", [Generation(text="x" * 100)])
+    cache.lookup("a", "m")  # "b" is now least recently used
+
+    cache.update("c", "m", [Generation(text="x" * 100)])
+
+    assert cache.lookup("a", "m") is not None and cache.lookup("c", "m") is not None
+    assert cache.lookup("b", "m") is None
+
+
+def test_inserts_under_the_limit_do_not_measure_the_table(Session, monkeypatch):
+    monkeypatch.setattr("app.llm_cache.LLM_CACHE_EVICT_EVERY", 3)
+    cache = LLMCache(Session, "gpt-4o")
+    passes = []
+    evict = cache._evict
+    monkeypatch.setattr(cache, "_evict", lambda db: (passes.append(db), evict(db)))
+
+    for i in range(7):
+        cache.update(f"p{i}", "m", [Generation(text="x" * 100)])
+
+    # The first insert measures the table; after that only every third insert does
+    assert len(passes) == 3
+    # Other workers' inserts are only seen at a pass, so the cap still holds
+    cache.max_bytes = 1
+    cache.update("last", "m", [Generation(text="x")])
+    assert len(passes) == 4 and Session().query(LLMCacheEntry).count() == 0
+
+
+def test_expired_entries_are_misses(Session):
+    cache = LLMCache(Session, "gpt-4o", ttl=datetime.timedelta(hours=1))
+    cache.update("a", "m", [Generation(text="old")])
+    db = Session()
+    db.query(LLMCacheEntry).update({"created_at": datetime.datetime.utcnow() - datetime.timedelta(hours=2)})
+    db.commit()
+
+    assert cache.lookup("a", "m") is None
+    assert db.query(LLMCacheEntry).count() == 0
+    db.close()
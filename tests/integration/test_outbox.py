@@ -0,0 +1,235 @@
+import asyncio
+import datetime
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import outbox, publishers
+from app.models import Base, OutboxMessage, Recording
+from app.outbox import claim_digest, drain, enqueue_summary
+from app.summarizer import store_summary
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Records requests; answers from ``script`` (status codes, in order), then 200 with ``reply``, after ``delay``."""
+    reply = b'{"id": "123"}'
+    requests = []
+    script = []
+    delay = 0.0
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+            cls.requests.append((self.headers.get("Idempotency-Key"), body))
+            status = cls.script.pop(0) if cls.script else 200
+        time.sleep(cls.delay)
+        with cls.lock:
+            cls.active -= 1
+        data = cls.reply if status == 200 else b'{"message": "try again"}'
+        self.send_response(status)
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def stand_in(name):
+    handler = type(name, (StandIn,), {"requests": [], "script": [], "delay": 0.0, "active": 0, "peak": 0,
+                                      "lock": threading.Lock()})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, handler
+
+
+@pytest.fixture
+def servers(tmp_path):
+    (slack, Slack), (confluence, Confluence) = stand_in("Slack"), stand_in("Confluence")
+    settings = {
+        "SLACK_WEBHOOK_URL": f"http://127.0.0.1:{slack.server_port}/hook",
+        "CONFLUENCE_BASE_URL": f"http://127.0.0.1:{confluence.server_port}/wiki",
+        "CONFLUENCE_USER": "bot@example.com", "CONFLUENCE_API_TOKEN": "token",
+        "CONFLUENCE_SPACE": "MEET", "CONFLUENCE_PARENT_ID": "42",
+    }
+    with patch.multiple(publishers, **settings), patch.object(outbox, "OUTBOX_BACKOFF_SECONDS", 0):
+        yield Slack, Confluence
+    slack.shutdown()
+    confluence.shutdown()
+
+
+@pytest.fixture
+def Session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def queue_recordings(Session, tmp_path, count):
+    db = Session()
+    for i in range(count):
+        rec = Recording(platform="zoom", meeting_id=f"m{i}", recording_url="u")
+        db.add(rec)
+        db.commit()
+        path = tmp_path / f"m{i}.json"
+        path.write_text(json.dumps({"text": f"Transcript of meeting {i}."}))
+        enqueue_summary(db, rec.meeting_id, f"Summary {i}", str(path), rec.id)
+        db.commit()
+    db.close()
+
+
+def statuses(Session):
+    db = Session()
+    try:
+        return {(m.destination, m.recording_id): (m.status, m.attempts) for m in db.query(OutboxMessage)}
+    finally:
+        db.close()
+
+
+def test_publishing_retries_429_and_5xx_with_the_same_idempotency_key(servers, Session, tmp_path):
+    Slack, Confluence = servers
+    Slack.script, Confluence.script = [429], [503, 503]
+    queue_recordings(Session, tmp_path, 1)
+
+    asyncio.run(drain(Session))
+
+    assert statuses(Session) == {("slack", 1): ("sent", 2), ("confluence", 1): ("sent", 3)}
+    assert len({key for key, _ in Slack.requests}) == 1 and len(Slack.requests) == 2
+    assert Slack.requests[0][1]["text"] == "*Meeting Summary (m0)*\nSummary 0"
+    page = Confluence.requests[-1][1]
+    assert page["space"] == {"key": "MEET"} and "Transcript of meeting 0." in page["body"]["storage"]["value"]
+
+
+def test_destinations_have_their_own_concurrency_limits(servers, Session, tmp_path):
+    Slack, Confluence = servers
+    Confluence.delay = 0.2
+    queue_recordings(Session, tmp_path, 6)
+
+    started = time.perf_counter()
+    with patch.dict("os.environ", {"OUTBOX_CONFLUENCE_CONCURRENCY": "2", "OUTBOX_SLACK_CONCURRENCY": "3"}):
+        asyncio.run(drain(Session))
+    elapsed = time.perf_counter() - started
+
+    assert all(status == "sent" for status, _ in statuses(Session).values())
+    assert Confluence.peak == 2 and Slack.peak <= 3
+    # Six slow pages two at a time, not one after another
+    assert 0.6 <= elapsed < 1.2
+
+
+def test_client_errors_fail_without_retrying(servers, Session, tmp_path):
+    Slack, Confluence = servers
+    Slack.script = [404]
+    queue_recordings(Session, tmp_path, 1)
+
+    asyncio.run(drain(Session))
+
+    db = Session()
+    slack = db.query(OutboxMessage).filter_by(destination="slack").one()
+    assert (slack.status, slack.attempts) == ("failed", 1) and "HTTP 404" in slack.last_error
+
+
+def test_summary_is_queued_with_it_once_and_publishing_does_not_block(servers, Session, tmp_path):
+    Slack, Confluence = servers
+    Confluence.delay = 1.0
+    path = tmp_path / "m0.json"
+    path.write_text(json.dumps({"text": "Transcript."}))
+    db = Session()
+    rec = Recording(platform="zoom", meeting_id="m0", recording_url="u", transcript_path=str(path))
+    db.add(rec)
+    db.commit()
+
+    started = time.perf_counter()
+    store_summary(db, rec, "Summary")
+    store_summary(db, rec, "Summary")
+    assert time.perf_counter() - started < 0.5
+    assert db.query(OutboxMessage).count() == 2
+    assert not Slack.requests and not Confluence.requests
+    db.close()
+
+
+def test_summary_is_not_stored_if_it_cannot_be_queued(servers, Session, tmp_path):
+    db = Session()
+    rec = Recording(platform="zoom", meeting_id="m0", recording_url="u", transcript_path=str(tmp_path / "m0.json"))
+    db.add(rec)
+    db.commit()
+
+    with patch.object(outbox, "enqueue", side_effect=RuntimeError("outbox is down")), \
+            pytest.raises(RuntimeError, match="outbox is down"):
+        store_summary(db, rec, "Summary")
+    db.rollback()
+
+    db.refresh(rec)
+    assert rec.summary is None
+    db.close()
+
+
+def test_slack_digest_combines_summaries_and_flushes_when_full(servers, Session, tmp_path):
+    Slack, Confluence = servers
+    queue_recordings(Session, tmp_path, 5)
+
+    with patch.multiple(outbox, SLACK_DIGEST=True, SLACK_DIGEST_MAX=3):
+        asyncio.run(drain(Session))
+
+    assert all(status == "sent" for status, _ in statuses(Session).values())
+    assert len(Confluence.requests) == 5 and len(Slack.requests) == 2
+    first, second = (body["blocks"] for _, body in Slack.requests)
+    assert first[0]["text"]["text"] == "Meeting summaries (3)"
+    assert [b["text"]["text"] for b in first if b["type"] == "section"] == [
+        f"*Meeting Summary (m{i})*\nSummary {i}" for i in range(3)]
+    assert "Meeting Summary (m4)" in second[-1]["text"]["text"]
+
+
+def test_slack_digest_waits_for_its_window(servers, Session, tmp_path):
+    queue_recordings(Session, tmp_path, 2)
+    db = Session()
+
+    assert claim_digest(db, "slack", max_count=3, window_seconds=300) == []
+    db.query(OutboxMessage).update({"created_at": outbox._utcnow() - datetime.timedelta(seconds=301)})
+    db.commit()
+    assert len(claim_digest(db, "slack", max_count=3, window_seconds=300)) == 2
+    assert claim_digest(db, "slack", max_count=3, window_seconds=300, flush=True) == []
+
+
+def test_stopping_publisher_flushes_the_digest(servers, Session, tmp_path):
+    Slack, _ = servers
+    queue_recordings(Session, tmp_path, 2)
+
+    with patch.multiple(outbox, SLACK_DIGEST=True, SLACK_DIGEST_WINDOW_SECONDS=300):
+        publisher = outbox.Publisher(Session)
+        with patch.object(outbox, "OUTBOX_POLL_SECONDS", 0.05):
+            publisher.start()
+            time.sleep(0.3)
+            assert not Slack.requests
+            publisher.stop(timeout=5)
+
+    assert len(Slack.requests) == 1 and statuses(Session)[("slack", 1)] == ("sent", 1)
+
+
+def test_slack_digest_threads_full_summaries(servers, Session, tmp_path):
+    Slack, _ = servers
+    Slack.reply = b'{"ok": true, "ts": "1700000000.000100"}'
+    queue_recordings(Session, tmp_path, 2)
+    settings = {"SLACK_DIGEST_THREAD": True, "SLACK_BOT_TOKEN": "xoxb-1", "SLACK_CHANNEL": "C1",
+                "SLACK_API_URL": publishers.SLACK_WEBHOOK_URL.rsplit("/", 1)[0]}
+
+    with patch.multiple(publishers, **settings), patch.object(outbox, "SLACK_DIGEST", True):
+        asyncio.run(drain(Session))
+
+    digest, *replies = [body for _, body in Slack.requests]
+    assert digest["channel"] == "C1" and "thread_ts" not in digest
+    assert [r["thread_ts"] for r in replies] == ["1700000000.000100"] * 2
+    assert replies[1]["blocks"][0]["text"]["text"] == "*Meeting Summary (m1)*\nSummary 1"
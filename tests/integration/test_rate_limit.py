@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import rate_limit
+from app.models import Base
+from app.rate_limit import DBState, Limiter, RateLimitedTransport
+from app.summarizer import SummaryError, generate_summary
+
+
+class FakeOpenAI(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions that answer the first ``throttle`` requests with a 429."""
+    throttle = 0
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append(body)
+        if len(self.requests) <= self.throttle:
+            data = b'{"error": {"message": "Rate limit reached", "code": "rate_limit_exceeded"}}'
+            self.send_response(429)
+            self.send_header("retry-after-ms", "50")
+        else:
+            reply = "**Key Decisions (5 bullet points):**\n- ship it\n\n**Action Items:**\n- none"
+            data = json.dumps({
+                "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 90, "completion_tokens": 10, "total_tokens": 100},
+            }).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_openai():
+    FakeOpenAI.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+class FakeClock:
+    def __init__(self, now: float):
+        self.now = now
+        self.slept = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+        self.slept += seconds
+
+
+def test_summary_retries_429s_instead_of_storing_them(fake_openai, tmp_path):
+    FakeOpenAI.throttle = 2
+    limiter = Limiter(rpm=600, tpm=100000, daily_budget=1.0, cost_per_token=0.0001)
+    client = httpx.Client(transport=RateLimitedTransport(limiter))
+    path = tmp_path / "t.json"
+    path.write_text(json.dumps({"text": "We agreed to ship the release on Friday."}))
+    env = {"OPENAI_API_KEY": "k", "OPENAI_MODEL": "gpt-4o", "LLM_CACHE_ENABLED": "0",
+           "OPENAI_API_BASE": f"http://127.0.0.1:{fake_openai.server_port}/v1"}
+
+    with patch.dict(os.environ, env), patch.object(rate_limit, "_http_client", client):
+        summary = generate_summary(str(path))
+
+    assert "ship it" in summary
+    assert len(FakeOpenAI.requests) == 3
+    assert limiter.scale < 1.0
+    # Only the request that went through is charged, at its actual usage
+    assert limiter.state.spent(rate_limit._day(limiter.clock())) == pytest.approx(100 * 0.0001)
+
+
+def test_token_bucket_paces_requests():
+    clock = FakeClock(1_000_000.0)
+    limiter = Limiter(rpm=60, tpm=1200, state=None, clock=clock, sleep=clock.sleep)
+
+    limiter.acquire(1200)
+    assert clock.slept == 0
+    # 1200 tokens a minute refill 20 a second
+    limiter.acquire(400)
+    assert clock.slept == pytest.approx(20)
+    # A request larger than the bucket waits for a full bucket rather than forever
+    limiter.acquire(5000)
+    assert clock.slept == pytest.approx(80)
+
+
+def test_over_budget_request_fails_until_next_day():
+    midnight = 20000 * 86400.0
+    clock = FakeClock(midnight - 300)
+    limiter = Limiter(rpm=1000, tpm=1_000_000, daily_budget=0.01, cost_per_token=0.00001,
+                      clock=clock, sleep=clock.sleep)
+
+    reserved = limiter.acquire(1000)
+    limiter.settle(reserved, 1000)
+    # Refused straight away rather than holding the pipeline thread until midnight
+    with pytest.raises(rate_limit.BudgetExhausted):
+        limiter.acquire(500)
+    assert clock.slept == 0
+    assert limiter.state.spent(rate_limit._day(midnight - 1)) == pytest.approx(0.01)
+
+    clock.now = midnight
+    limiter.acquire(500)
+    assert limiter.state.spent(rate_limit._day(midnight)) == pytest.approx(0.005)
+
+
+def test_summary_over_budget_fails_with_the_budget_error(fake_openai, tmp_path):
+    limiter = Limiter(rpm=600, tpm=100000, daily_budget=0.001, cost_per_token=0.0001)
+    client = httpx.Client(transport=RateLimitedTransport(limiter))
+    path = tmp_path / "t.json"
+    path.write_text(json.dumps({"text": "We agreed to ship the release on Friday."}))
+    env = {"OPENAI_API_KEY": "k", "OPENAI_MODEL": "gpt-4o", "LLM_CACHE_ENABLED": "0",
+           "OPENAI_API_BASE": f"http://127.0.0.1:{fake_openai.server_port}/v1"}
+
+    with patch.dict(os.environ, env), patch.object(rate_limit, "_http_client", client), \
+            patch.object(rate_limit, "_limiter", limiter), pytest.raises(SummaryError, match="budget"):
+        generate_summary(str(path))
+
+    assert FakeOpenAI.requests == []
+
+
+def test_db_state_is_shared_between_workers(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'limits.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    clock = FakeClock(1_000_000.0)
+    workers = [Limiter(rpm=60, tpm=600, state=DBState(Session), clock=clock, sleep=clock.sleep) for _ in range(2)]
+
+    workers[0].acquire(600)
+    workers[1].acquire(300)
+    assert clock.slept == pytest.approx(30)
+
+    # A 429 seen by one worker pauses the other
+    response = httpx.Response(429, headers={"retry-after": "7"})
+    workers[1].backoff(response, attempt=0, throttled=True)
+    before = clock.now
+    workers[0].acquire(1)
+    assert clock.now - before >= 7
@@ -0,0 +1,130 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import main
+from app.models import Base, Recording, SearchPassage
+from app.search import build_passages, index_recording, search, try_index_summary
+from app.transcript_store import save_transcript
+
+
+def transcript(*lines):
+    """Segments of 10 s each with the given texts."""
+    segments = [
+        {"id": i, "seek": i * 1000, "start": i * 10.0, "end": i * 10.0 + 9.5, "text": f" {line}", "tokens": []}
+        for i, line in enumerate(lines)
+    ]
+    return {"text": "".join(s["text"] for s in segments), "segments": segments, "language": "en"}
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+    Base.metadata.drop_all(bind=engine)
+
+
+def add_recording(db, tmp_path, meeting_id, lines, summary=None):
+    path = tmp_path / f"{meeting_id}.transcript"
+    save_transcript(transcript(*lines), path)
+    rec = Recording(platform="zoom", meeting_id=meeting_id, recording_url="u", transcript_path=str(path), summary=summary)
+    db.add(rec)
+    db.commit()
+    index_recording(db, rec)
+    return rec
+
+
+def test_passages_group_consecutive_segments():
+    passages = build_passages(transcript("a", "b", "c", "d")["segments"], passage_seconds=25)
+    assert passages == [(0.0, 19.5, "a b"), (20.0, 39.5, "c d")]
+
+
+def test_search_returns_recordings_with_timestamps(db, tmp_path):
+    add_recording(db, tmp_path, "infra", ["Welcome everyone.", "Filler talk here.", "Filler again.",
+                                          "We are migrating the billing cluster to Kubernetes."],
+                  summary="**Key Decisions:** migrate billing to Kubernetes")
+    add_recording(db, tmp_path, "sales", ["Quarterly numbers look good.", "Kubernetes was mentioned once."])
+    add_recording(db, tmp_path, "hr", ["Holiday calendar review."])
+
+    result = search(db, "kubernetes migration")
+
+    assert result["total"] == 1
+    hit = result["results"][0]
+    assert hit["meeting_id"] == "infra"
+    kinds = {h["kind"]: h for h in hit["hits"]}
+    # Porter stemming: "migration" matches "migrating"
+    assert kinds["transcript"]["start"] == 30.0
+    assert "<b>Kubernetes</b>" in kinds["transcript"]["snippet"]
+    assert kinds["summary"]["start"] is None
+
+    assert {r["meeting_id"] for r in search(db, "Kubernetes")["results"]} == {"infra", "sales"}
+    assert search(db, 'kubernetes" OR *')["results"] == search(db, "kubernetes OR")["results"]
+    assert search(db, "!!!")["total"] == 0
+
+
+def test_reindexing_replaces_old_passages(db, tmp_path):
+    rec = add_recording(db, tmp_path, "m1", ["Old topic."], summary="old summary")
+    save_transcript(transcript("New topic."), rec.transcript_path)
+    rec.summary = "new summary"
+    db.commit()
+
+    index_recording(db, rec)
+
+    assert search(db, "old")["total"] == 0
+    assert search(db, "new")["total"] == 1
+    assert db.query(SearchPassage).count() == 2
+
+
+def test_storing_a_summary_reindexes_only_the_summary(db, tmp_path):
+    rec = add_recording(db, tmp_path, "m1", ["Budget review."], summary="old summary")
+    transcript_ids = [p.id for p in db.query(SearchPassage).filter_by(kind="transcript")]
+    rec.summary = "new summary"
+    db.commit()
+
+    try_index_summary(db, rec)
+
+    assert [p.id for p in db.query(SearchPassage).filter_by(kind="transcript")] == transcript_ids
+    assert search(db, "old")["total"] == 0 and search(db, "new")["total"] == 1
+
+
+def test_pagination(db, tmp_path):
+    for i in range(5):
+        add_recording(db, tmp_path, f"m{i}", [f"Roadmap review number {i}."])
+
+    first, last = search(db, "roadmap", page=1, page_size=2), search(db, "roadmap", page=3, page_size=2)
+
+    assert first["total"] == 5 and not first["truncated"]
+    assert len(first["results"]) == 2 and len(last["results"]) == 1
+    assert search(db, "roadmap", page=4, page_size=2)["results"] == []
+
+
+@pytest.mark.parametrize("limit", ["SEARCH_SCAN_LIMIT", "SEARCH_MAX_CANDIDATES"])
+def test_total_is_flagged_when_a_limit_cuts_matches_off(db, tmp_path, monkeypatch, limit):
+    for i in range(5):
+        add_recording(db, tmp_path, f"m{i}", [f"Roadmap review number {i}."])
+
+    monkeypatch.setattr(f"app.search.{limit}", 5)
+    assert search(db, "roadmap")["truncated"] is False
+    monkeypatch.setattr(f"app.search.{limit}", 3)
+    result = search(db, "roadmap")
+
+    assert result["truncated"] is True and result["total"] == 3
+
+
+def test_search_endpoint(db, tmp_path, monkeypatch):
+    add_recording(db, tmp_path, "infra", ["Budget approved for the data platform."])
+    monkeypatch.setattr(main, "SessionLocal", sessionmaker(bind=db.get_bind()))
+    client = TestClient(main.app)
+
+    response = client.get("/search", params={"q": "budget", "page_size": 5})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1 and body["page_size"] == 5
+    assert body["results"][0]["hits"][0]["start"] == 0.0
+    assert client.get("/search", params={"q": "budget", "page": 0}).status_code == 422
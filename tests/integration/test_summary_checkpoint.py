@@ -0,0 +1,156 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Recording, SummaryCheckpoint, SummaryMetrics
+from app.summarizer import SummaryError, generate_summary, store_summary
+
+
+class FlakyChatModel(BaseChatModel):
+    """Fails on prompts containing ``fail_on``; otherwise echoes which part it saw."""
+    fail_on: str = ""
+    prompts: list = []
+
+    @property
+    def _llm_type(self):
+        return "flaky"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = messages[-1].content
+        self.prompts.append(prompt)
+        if self.fail_on and self.fail_on in prompt:
+            raise TimeoutError("Request timed out")
+        parts = sorted(set(w for w in prompt.split() if w.startswith("part-")))
+        reply = "**Key Decisions (5 bullet points):**\n- " + " ".join(parts) + "\n\n**Action Items:**\n- none"
+        usage = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))],
+                          llm_output={"token_usage": usage, "model_name": "gpt-4o"})
+
+
+@pytest.fixture
+def Session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'summary.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine)
+    Base.metadata.drop_all(bind=engine)
+
+
+def summarise(Session, path, recording_id, strategy, fail_on=""):
+    llm = FlakyChatModel(fail_on=fail_on, prompts=[])
+    env = {"OPENAI_API_KEY": "k", "OPENAI_MODEL": "gpt-4o", "SUMMARY_STRATEGY": strategy,
+           "SUMMARY_CHUNK_TOKENS": "300", "LLM_CACHE_ENABLED": "0"}
+    with patch.dict(os.environ, env), patch("app.summarizer.ChatOpenAI", lambda **kwargs: llm), \
+            patch("app.summarizer.SessionLocal", Session):
+        try:
+            return generate_summary(str(path), recording_id), llm
+        except SummaryError:
+            return None, llm
+
+
+@pytest.mark.parametrize("strategy", ["refine", "map_reduce"])
+def test_failed_summary_resumes_from_checkpoint(Session, tmp_path, strategy):
+    db = Session()
+    rec = Recording(platform="zoom", meeting_id="m1", recording_url="u", transcript_fetched=True)
+    db.add(rec)
+    db.commit()
+    path = tmp_path / "t.json"
+    # Six sentences of about 165 tokens: one chunk each at 300 tokens a chunk
+    path.write_text(json.dumps({"text": " ".join(f"part-{i} " + "budget talk " * 80 + "." for i in range(6))}))
+
+    summary, failed = summarise(Session, path, rec.id, strategy, fail_on="part-3 ")
+
+    assert summary is None
+    db.refresh(rec)
+    assert rec.summary is None and rec.summary_status == "failed"
+    assert "timed out" in rec.summary_error
+    checkpoint = db.get(SummaryCheckpoint, rec.id)
+    # refine stops at part 3; map_reduce finishes every chunk but part 3
+    assert checkpoint.steps_done == (3 if strategy == "refine" else 5)
+
+    summary, retried = summarise(Session, path, rec.id, strategy)
+    store_summary(db, rec, summary)
+
+    assert all(f"part-{i}" in summary for i in range(6))
+    # Only the unfinished chunk(s) and, for map_reduce, the reduce are sent again
+    chunk_calls = [p for p in retried.prompts if "Below are summaries" not in p]
+    assert len(chunk_calls) == (3 if strategy == "refine" else 1)
+    assert "part-3 " in chunk_calls[0]
+    assert rec.summary_status == "done" and rec.summary_error is None
+    assert db.get(SummaryCheckpoint, rec.id) is None
+    # Tokens of the failed attempt are recorded too
+    assert db.query(SummaryMetrics).filter_by(recording_id=rec.id).count() == 2
+    db.close()
+
+
+def test_checkpoint_is_ignored_when_transcript_changes(Session, tmp_path):
+    db = Session()
+    rec = Recording(platform="zoom", meeting_id="m1", recording_url="u", transcript_fetched=True)
+    db.add(rec)
+    db.commit()
+    path = tmp_path / "t.json"
+    path.write_text(json.dumps({"text": " ".join(f"part-{i}. " + "budget talk " * 80 + "." for i in range(4))}))
+    summarise(Session, path, rec.id, "refine", fail_on="part-2 ")
+
+    path.write_text(json.dumps({"text": " ".join(f"part-{i}. " + "hiring talk " * 80 + "." for i in range(4))}))
+    summary, llm = summarise(Session, path, rec.id, "refine")
+
+    assert len(llm.prompts) == 4
+    db.close()
+
+
+def test_misconfigured_summary_keeps_the_transcript(Session, tmp_path):
+    from app.pipeline import Job, summarize_stage
+    db = Session()
+    rec = Recording(platform="zoom", meeting_id="m1", recording_url="u")
+    db.add(rec)
+    db.commit()
+    path = tmp_path / "m1.json"
+    path.write_text(json.dumps({"text": "We agreed to ship."}))
+
+    job = Job(recording_id=rec.id, meeting_id="m1", recording_url="u", transcript_path=str(path))
+    with patch.dict(os.environ, {"SUMMARY_ENGINE": "lmm"}), patch("app.summarizer.SessionLocal", Session):
+        assert summarize_stage(job).summary is None
+
+    db.refresh(rec)
+    assert rec.transcript_fetched and rec.summary is None
+    assert rec.summary_status == "failed" and "Unknown SUMMARY_ENGINE" in rec.summary_error
+
+
+def test_catch_up_retries_a_failed_summary_once_per_lease(Session, tmp_path):
+    from app.summarizer import run_transcription_job
+    db = Session()
+    path = tmp_path / "m1.json"
+    path.write_text(json.dumps({"text": "part-0. We agreed to ship."}))
+    rec = Recording(platform="zoom", meeting_id="m1", recording_url="u", transcript_fetched=True,
+                    transcript_path=str(path), status="done", summary_status="failed")
+    db.add(rec)
+    db.commit()
+
+    def catch_up(fail_on):
+        llm = FlakyChatModel(fail_on=fail_on, prompts=[])
+        env = {"OPENAI_API_KEY": "k", "OPENAI_MODEL": "gpt-4o", "LLM_CACHE_ENABLED": "0",
+               "OUTBOX_PUBLISHER": "off", "SEARCH_INDEX_ENABLED": "0"}
+        with patch.dict(os.environ, env), patch("app.summarizer.ChatOpenAI", lambda **kwargs: llm), \
+                patch("app.summarizer.SessionLocal", Session):
+            run_transcription_job("w")
+        return llm
+
+    assert len(catch_up("part-0").prompts) == 1
+    # Still leased after the failure: the next run leaves it alone until the lease runs out
+    assert catch_up("").prompts == []
+    db.refresh(rec)
+    assert rec.summary is None and rec.summary_attempts == 1
+
+    rec.lease_expires_at = None
+    db.commit()
+    assert len(catch_up("").prompts) == 1
+    db.refresh(rec)
+    assert "part-0" in rec.summary
+    assert rec.lease_owner is None and rec.summary_attempts == 2
@@ -0,0 +1,136 @@
+import asyncio
+import datetime
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.models import Base, Recording, SearchPassage, SummaryMetrics
+from app.summary_stream import summary_events
+
+REPLY = "**Key Decisions (5 bullet points):**\n- Ship on Friday\n\n**Action Items:**\n- Sarah: release notes"
+TOKEN_DELAY = 0.02
+
+
+class StreamingOpenAI(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completions that stream REPLY a word at a time."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        assert body["stream"] is True
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for word in REPLY.split(" "):
+            time.sleep(TOKEN_DELAY)
+            chunk = {"id": "chatcmpl-1", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                     "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StreamingOpenAI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def Session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with patch("app.main.SessionLocal", Session), patch("app.summarizer.SessionLocal", Session):
+        yield Session
+
+
+def add_recording(Session, transcript_path=None, meeting_id="m1", **fields) -> int:
+    db = Session()
+    rec = Recording(platform="zoom", meeting_id=meeting_id, recording_url="u", transcript_path=transcript_path,
+                    transcript_fetched=transcript_path is not None, status="done", **fields)
+    db.add(rec)
+    db.commit()
+    return rec.id
+
+
+def test_summary_streams_tokens_and_is_stored(server, Session, tmp_path):
+    path = tmp_path / "t.json"
+    path.write_text(json.dumps({"text": "We agreed to ship on Friday. Sarah will write the release notes."}))
+    recording_id = add_recording(Session, str(path))
+    env = {"OPENAI_API_KEY": "k", "OPENAI_MODEL": "gpt-4o", "LLM_CACHE_ENABLED": "0",
+           "OPENAI_API_BASE": f"http://127.0.0.1:{server.server_port}/v1"}
+
+    events = []
+    with patch.dict(os.environ, env), TestClient(app).stream("POST", f"/recordings/{recording_id}/summary/stream") as r:
+        assert r.headers["content-type"].startswith("text/event-stream")
+        event = None
+        for line in r.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                events.append((event, json.loads(line[len("data: "):])))
+
+    tokens = [data["token"] for event, data in events if event == "token"]
+    assert len(tokens) == len(REPLY.split(" "))
+    assert events[-1][0] == "done" and events[-1][1]["summary"].strip() == REPLY
+
+    db = Session()
+    rec = db.get(Recording, recording_id)
+    assert rec.summary.strip() == REPLY and rec.summary_status == "done"
+    metrics = db.query(SummaryMetrics).filter_by(recording_id=recording_id).one()
+    assert metrics.completion_tokens == len(tokens) and metrics.prompt_tokens > 0
+    assert "Friday" in db.query(SearchPassage).filter_by(recording_id=recording_id, kind="summary").one().body
+    # The lease taken for the stream is released
+    assert rec.lease_owner is None and rec.lease_expires_at is None
+
+
+def test_tokens_are_yielded_while_the_model_generates(server, Session, tmp_path):
+    path = tmp_path / "t.json"
+    path.write_text(json.dumps({"text": "We agreed to ship on Friday."}))
+    recording_id = add_recording(Session, str(path))
+    env = {"OPENAI_API_KEY": "k", "OPENAI_MODEL": "gpt-4o", "LLM_CACHE_ENABLED": "0",
+           "OPENAI_API_BASE": f"http://127.0.0.1:{server.server_port}/v1"}
+
+    async def arrivals():
+        return [(frame.split("\n")[0], time.perf_counter()) async for frame in summary_events(recording_id, str(path))]
+
+    with patch.dict(os.environ, env):
+        frames = asyncio.run(arrivals())
+
+    assert frames[0][0] == "event: token" and frames[-1][0] == "event: done"
+    # The first token arrives long before the last one was generated
+    assert frames[-1][1] - frames[0][1] >= TOKEN_DELAY * (len(frames) - 3)
+
+
+def test_summary_stream_needs_a_transcript(Session):
+    client = TestClient(app)
+    assert client.post("/recordings/999/summary/stream").status_code == 404
+    recording_id = add_recording(Session)
+    assert client.post(f"/recordings/{recording_id}/summary/stream").status_code == 409
+
+
+def test_summary_stream_refuses_recordings_it_would_race_or_overwrite(Session, tmp_path):
+    client = TestClient(app)
+    summarised = add_recording(Session, str(tmp_path / "t.json"), summary="Done already")
+    leased = add_recording(Session, str(tmp_path / "t.json"), meeting_id="m2", lease_owner="worker-1",
+                           lease_expires_at=datetime.datetime.utcnow() + datetime.timedelta(hours=1))
+
+    assert client.post(f"/recordings/{summarised}/summary/stream").status_code == 409
+    assert client.post(f"/recordings/{leased}/summary/stream").status_code == 409
+    assert client.post(f"/recordings/{leased}/summary/stream?regenerate=true").status_code == 409
+    assert Session().get(Recording, leased).lease_owner == "worker-1"
@@ -2,9 +2,12 @@ import os
 import json
 import hmac
 import hashlib
+from unittest.mock import patch
 import pytest
 from fastapi.testclient import TestClient
+from app import main
 from app.main import app
+from app.ingest import INGEST_RETRY_AFTER_SECONDS, QueueFull
 from app.db import SessionLocal, engine
 from app.models import Base, Recording
 
@@ -15,6 +18,7 @@ def setup_db():
     # Reset DB schema before each test
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    main.recent_events.clear()
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -57,3 +61,49 @@ def test_zoom_webhook_records_entry():
     rec = recs[0]
     assert rec.meeting_id == "test-uuid-123"
     assert rec.recording_url == "https://example.com/fake.mp4"
+
+
+def test_zoom_webhook_asks_for_a_retry_when_the_write_queue_is_full():
+    body = json.dumps({"meta": {"token": "testverificationtoken"},
+                       "payload": {"object": {"download_url": "u", "uuid": "u1"}}}).encode()
+    with patch.object(main.recording_writer, "submit", side_effect=QueueFull("full")):
+        response = client.post("/webhook/zoom", data=body, headers={"Authorization": sign_payload(body)})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(INGEST_RETRY_AFTER_SECONDS)
+
+
+def test_zoom_webhook_rejects_malformed_json():
+    body = b"{not json"
+    response = client.post("/webhook/zoom", data=body, headers={"Authorization": sign_payload(body)})
+    assert response.status_code == 400
+
+
+def recording_completed(uuid: str, file_id: str, event_ts: int) -> bytes:
+    return json.dumps({
+        "event": "recording.completed", "event_ts": event_ts, "meta": {"token": "testverificationtoken"},
+        "payload": {"object": {"uuid": uuid, "recording_files": [
+            {"id": f"{file_id}-audio", "file_type": "M4A", "download_url": "https://example.com/a.m4a"},
+            {"id": file_id, "file_type": "MP4", "download_url": f"https://example.com/{file_id}.mp4"},
+        ]}},
+    }).encode()
+
+
+def test_zoom_webhook_ignores_redelivered_recordings():
+    def post(body):
+        return client.post("/webhook/zoom", data=body, headers={"Authorization": sign_payload(body)}).json()
+
+    body = recording_completed("uuid-1", "file-1", 1)
+    assert post(body) == {"status": "ok"}
+    # A retry of the same event is answered from memory
+    with patch.object(main.recording_writer, "submit") as submit:
+        assert post(body) == {"status": "duplicate"}
+    submit.assert_not_called()
+    # A new event for the same file reaches the database, which already has it
+    assert post(recording_completed("uuid-1", "file-1", 2)) == {"status": "duplicate"}
+    assert post(recording_completed("uuid-1", "file-2", 3)) == {"status": "ok"}
+
+    db = SessionLocal()
+    recs = db.query(Recording).order_by(Recording.id).all()
+    db.close()
+    assert [(r.recording_file_id, r.recording_url) for r in recs] == [
+        ("file-1", "https://example.com/file-1.mp4"), ("file-2", "https://example.com/file-2.mp4")]
@@ -0,0 +1,114 @@
+import io
+import shutil
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from app.audio import SAMPLE_RATE, decode_file, decode_stream, load_audio, needs_seeking, pcm_windows, read_pcm, save_pcm
+
+
+def box(box_type: bytes, payload_size: int) -> bytes:
+    return struct.pack(">I4s", payload_size + 8, box_type) + b"\0" * payload_size
+
+
+def test_faststart_mp4_is_streamable():
+    head = box(b"ftyp", 24) + box(b"moov", 100) + box(b"mdat", 1000)
+    assert not needs_seeking(head)
+
+
+def test_mp4_with_index_at_end_needs_seeking():
+    head = box(b"ftyp", 24) + box(b"free", 0) + struct.pack(">I4s", 902414, b"mdat")
+    assert needs_seeking(head)
+
+
+def test_large_mdat_box_header_is_parsed():
+    # 64-bit box size, followed by moov
+    large = struct.pack(">I4sQ", 1, b"wide", 16)
+    assert not needs_seeking(box(b"ftyp", 24) + large + box(b"moov", 8))
+
+
+def test_non_mp4_containers_are_streamable():
+    assert not needs_seeking(b"\x1aE\xdf\xa3" + b"\0" * 100)  # Matroska/WebM
+    assert not needs_seeking(b"RIFF\0\0\0\0WAVEfmt ")
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_decode_stream_resamples_to_16k_mono():
+    # Two seconds of 44.1 kHz stereo sine, fed to ffmpeg in small chunks
+    t = np.arange(2 * 44100) / 44100
+    tone = (np.sin(2 * np.pi * 440 * t) * 16000).astype(np.int16)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(44100)
+        w.writeframes(np.repeat(tone, 2).tobytes())
+    data = buf.getvalue()
+
+    audio = decode_stream(data[i:i + 4096] for i in range(0, len(data), 4096))
+
+    assert audio.dtype == np.float32
+    assert abs(len(audio) - 2 * SAMPLE_RATE) < 100
+    assert 0.4 < np.abs(audio).max() <= 1.0
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_pcm_windows_cut_in_silence_and_cover_the_file(tmp_path):
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal(55 * SAMPLE_RATE) * 8000).astype(np.int16)
+    for start in (19, 41):
+        samples[start * SAMPLE_RATE:(start + 1) * SAMPLE_RATE] = 0
+    path = tmp_path / "long.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        w.writeframes(samples.tobytes())
+
+    windows = list(pcm_windows(path, window_seconds=20, search_seconds=3))
+
+    offsets = [offset / SAMPLE_RATE for offset, _ in windows]
+    assert len(windows) == 3
+    assert 19 <= offsets[1] <= 20 and 41 <= offsets[2] <= 42
+    assert all(offset + len(w) == nxt for (offset, w), (nxt, _) in zip(windows, windows[1:]))
+    assert np.array_equal(np.concatenate([w for _, w in windows]), decode_file(path))
+
+
+def test_pcm_file_round_trip(tmp_path):
+    samples = np.linspace(-1, 1, 1000, dtype=np.float32)
+    save_pcm(samples, tmp_path / "a.f32")
+    assert np.array_equal(read_pcm(tmp_path / "a.f32"), samples)
+
+
+class FakeResponse:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        return (self.data[i:i + 4096] for i in range(0, len(self.data), 4096))
+
+    def close(self):
+        pass
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+def test_mp4_needing_seeking_is_not_downloaded_twice(tmp_path):
+    import subprocess
+    from unittest.mock import MagicMock
+    # ffmpeg writes the moov index at the end unless told to use faststart
+    subprocess.run(["ffmpeg", "-f", "lavfi", "-i", "sine=frequency=440:duration=2", "-c:a", "aac",
+                    str(tmp_path / "late-index.mp4")], check=True, capture_output=True)
+    data = (tmp_path / "late-index.mp4").read_bytes()
+    assert needs_seeking(data[:64 * 1024])
+    session = MagicMock()
+    session.get.return_value = FakeResponse(data)
+
+    audio = load_audio("https://zoom.us/rec/1", session)
+
+    assert session.get.call_count == 1
+    assert abs(len(audio) - 2 * SAMPLE_RATE) < 2000
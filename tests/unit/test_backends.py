@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app import backends, transcription
+
+
+class FakeModel:
+    def transcribe(self, audio, **kwargs):
+        return {"text": " hi", "segments": [], "language": "en"}
+
+
+def test_default_backend_uses_the_shared_model_registry(monkeypatch):
+    monkeypatch.setitem(transcription._models, "fake.en", FakeModel())
+    monkeypatch.setattr(backends, "_backends", {})
+    monkeypatch.delenv("TRANSCRIBE_BACKEND", raising=False)
+
+    backend = backends.get_backend("fake.en")
+
+    assert isinstance(backend, backends.WhisperBackend)
+    assert backend is backends.get_backend("fake.en", "whisper")
+    assert backend.transcribe(np.zeros(160, dtype=np.float32))["text"] == " hi"
+
+
+def test_registry_is_keyed_by_backend_and_model(monkeypatch):
+    built = []
+
+    class CountingBackend(backends.TranscriptionBackend):
+        def __init__(self, model_name):
+            super().__init__(model_name)
+            built.append(model_name)
+
+    monkeypatch.setattr(backends, "_backends", {})
+    monkeypatch.setitem(backends.BACKENDS, "counting", CountingBackend)
+    monkeypatch.setenv("TRANSCRIBE_BACKEND", "counting")
+
+    assert backends.get_backend("a") is backends.get_backend("a", "counting")
+    backends.get_backend("b")
+    assert built == ["a", "b"]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown TRANSCRIBE_BACKEND"):
+        backends.get_backend("tiny.en", "nope")
+
+
+def test_model_tag_keeps_default_cache_keys():
+    assert backends.model_tag("tiny.en", "whisper") == "tiny.en"
+    assert backends.model_tag("tiny.en", "whisper-int8") == "tiny.en@whisper-int8"
+
+
+def test_faster_whisper_segments_use_the_whisper_schema():
+    segments = iter([
+        SimpleNamespace(id=1, seek=0, start=0.0, end=2.5, text=" Hello", tokens=[50363, 15496],
+                        temperature=0.0, avg_logprob=-0.2, compression_ratio=1.1, no_speech_prob=0.01),
+        SimpleNamespace(id=2, seek=250, start=2.5, end=4.0, text=" there.", tokens=[612],
+                        temperature=0.2, avg_logprob=-0.4, compression_ratio=0.9, no_speech_prob=0.02),
+    ])
+
+    result = backends.to_whisper_result(segments, "en")
+
+    assert result["text"] == " Hello there."
+    assert result["language"] == "en"
+    assert [s["id"] for s in result["segments"]] == [0, 1]
+    assert set(result["segments"][0]) == {
+        "id", "seek", "start", "end", "text", "tokens", "temperature",
+        "avg_logprob", "compression_ratio", "no_speech_prob",
+    }
+
+
+def test_quantize_whisper_replaces_linear_layers():
+    torch = pytest.importorskip("torch")
+    from whisper.model import ModelDimensions, Whisper
+
+    dims = ModelDimensions(n_mels=80, n_audio_ctx=16, n_audio_state=32, n_audio_head=2, n_audio_layer=1,
+                           n_vocab=64, n_text_ctx=8, n_text_state=32, n_text_head=2, n_text_layer=1)
+    model = Whisper(dims).eval()
+    mel = torch.randn(1, 80, 32)
+    with torch.no_grad():
+        expected = model.encoder(mel)
+
+    quantized = backends.quantize_whisper(model)
+
+    dynamic_linear = torch.ao.nn.quantized.dynamic.Linear
+    assert isinstance(quantized.decoder.blocks[0].attn.query, dynamic_linear)
+    assert isinstance(quantized.encoder.blocks[0].mlp[0], dynamic_linear)
+    with torch.no_grad():
+        actual = quantized.encoder(mel)
+    assert float((actual - expected).norm() / expected.norm()) < 0.1
@@ -0,0 +1,59 @@
+import json
+
+from app import chunking
+from app.chunking import chunk_budget, context_window, count_tokens, get_encoder, pack_chunks, transcript_pieces
+from app.transcript_store import save_transcript
+
+MODEL = "gpt-4o"
+
+
+def test_chunks_end_on_piece_boundaries_and_fill_the_budget():
+    pieces = [f" Sentence number {i} is about the quarterly roadmap." for i in range(40)]
+
+    chunks = pack_chunks(pieces, MODEL, max_tokens=60)
+
+    assert "".join(" " + c for c in chunks) == "".join(pieces)
+    assert all(count_tokens(c, MODEL) <= 60 for c in chunks)
+    # Greedy packing: no chunk had room for the first piece of the next one
+    for chunk, following in zip(chunks, chunks[1:]):
+        first_piece = " " + following.split(".")[0] + "."
+        assert count_tokens(" " + chunk, MODEL) + count_tokens(first_piece, MODEL) > 60
+
+
+def test_oversized_piece_is_cut_on_token_boundaries():
+    chunks = pack_chunks([" short.", " word" * 250, " tail."], MODEL, max_tokens=100)
+
+    assert chunks[0] == "short."
+    assert [count_tokens(c, MODEL) for c in chunks[1:4]] == [100, 100, 50]
+    assert chunks[-1] == "tail."
+
+
+def test_budget_follows_the_model_context_window(monkeypatch):
+    assert context_window("gpt-4o-mini-2024-07-18") == 128000
+    assert context_window("gpt-4-0613") == 8192
+    assert context_window("some-local-model") == chunking.DEFAULT_CONTEXT_WINDOW
+    assert chunk_budget("gpt-4", 500) == 8192 - chunking.SUMMARY_MAX_OUTPUT_TOKENS - 500
+
+    # map_reduce chunks are capped, so an hour-long meeting still maps concurrently
+    assert chunk_budget(MODEL, 500, concurrent=True) == chunking.MAP_CHUNK_TOKENS
+
+    monkeypatch.setenv("SUMMARY_CHUNK_TOKENS", "3000")
+    assert chunk_budget(MODEL, 500) == 3000
+    assert chunk_budget(MODEL, 500, concurrent=True) == 3000
+
+
+def test_encoder_is_loaded_once_per_model():
+    assert get_encoder(MODEL) is get_encoder(MODEL)
+
+
+def test_pieces_are_segments_or_sentences(tmp_path):
+    compact = tmp_path / "m.transcript"
+    save_transcript({"text": " One. Two", "language": "en", "segments": [
+        {"id": 0, "seek": 0, "start": 0.0, "end": 1.0, "text": " One.", "tokens": []},
+        {"id": 1, "seek": 0, "start": 1.0, "end": 2.0, "text": " Two", "tokens": []},
+    ]}, compact)
+    legacy = tmp_path / "m.json"
+    legacy.write_text(json.dumps({"text": "First point. Second point? Third"}))
+
+    assert transcript_pieces(compact) == [" One.", " Two"]
+    assert transcript_pieces(legacy) == ["First point. ", "Second point? ", "Third"]
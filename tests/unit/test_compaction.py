@@ -0,0 +1,61 @@
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+from app.compaction import compact_segments, remove_disfluencies
+
+
+def test_disfluencies_are_removed_but_meaning_kept():
+    assert remove_disfluencies(" Um, so we, uh, decided to ship it.") == " so we decided to ship it."
+    assert remove_disfluencies(" You know, we've kind of restructured.") == " we've restructured."
+    assert remove_disfluencies(" The the plan is, I mean, fine.") == " The plan is fine."
+    assert remove_disfluencies(" It's done, you know.") == " It's done."
+    assert remove_disfluencies(" Thank you. Thank you. Thank you.") == " Thank you."
+    # Not fillers here
+    assert remove_disfluencies(" What kind of database do we need?") == " What kind of database do we need?"
+    assert remove_disfluencies(" I know that that is hard.") == " I know that that is hard."
+
+
+def test_backchannel_and_repeated_segments_are_dropped():
+    segments = [{"text": t} for t in [
+        " Yeah.", " We need to migrate the billing cluster.", " We need to migrate the billing cluster.",
+        " Mm-hmm, okay.", " we need to migrate the billing cluster", " Yes.", " Let's move on.", " Yes.",
+    ]]
+
+    kept, stats = compact_segments(segments)
+
+    assert [s["text"] for s in kept] == [" We need to migrate the billing cluster.", " Yes.", " Let's move on.", " Yes."]
+    assert stats == {"segments": 8, "low_confidence": 0, "backchannel": 2, "duplicates": 2}
+
+
+def test_low_confidence_segments_are_dropped_only_when_asked():
+    segments = [
+        {"text": " Budget approved.", "no_speech_prob": 0.1, "avg_logprob": -0.3},
+        {"text": " Subtitles by the community.", "no_speech_prob": 0.9, "avg_logprob": -1.4},
+        {"text": " Quiet but clear.", "no_speech_prob": 0.9, "avg_logprob": -0.2},
+    ]
+
+    assert len(compact_segments(segments, drop_low_confidence=False)[0]) == 3
+    kept, stats = compact_segments(segments, drop_low_confidence=True)
+    assert [s["text"] for s in kept] == [" Budget approved.", " Quiet but clear."]
+    assert stats["low_confidence"] == 1
+
+
+@patch.dict(os.environ, {"OPENAI_API_KEY": "k", "SUMMARY_COMPACTION": "1", "LLM_CACHE_ENABLED": "0"})
+def test_summary_records_tokens_saved_by_compaction(tmp_path):
+    from app.summarizer import generate_summary
+    path = tmp_path / "t.json"
+    segments = [{"id": i, "seek": 0, "start": float(i), "end": i + 1.0, "text": t, "tokens": []}
+                for i, t in enumerate([" Um, you know, the launch moves a week.", " Yeah.", " Yeah.",
+                                       " Bob will, uh, update the plan.", " Bob will update the plan."])]
+    path.write_text(json.dumps({"text": "".join(s["text"] for s in segments), "segments": segments}))
+    chain = MagicMock(return_value={"output_text": "**Key Decisions (5 bullet points):**\n**Action Items:**"})
+    session = MagicMock()
+
+    with patch("app.summarizer.ChatOpenAI"), patch("app.summarizer.load_summarize_chain", return_value=chain), \
+            patch("app.summarizer.SessionLocal", return_value=session):
+        generate_summary(str(path), recording_id=1)
+
+    sent = chain.call_args[0][0]["input_documents"][0].page_content
+    assert sent == "the launch moves a week. Bob will update the plan."
+    assert session.add.call_args[0][0].compaction_saved_tokens > 0
@@ -0,0 +1,94 @@
+import json
+import os
+from unittest.mock import patch
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.extractive import _tfidf, action_items, summarize_segments, textrank
+from app.models import Base, Recording, SummaryMetrics
+from app.summarizer import generate_summary
+
+MEETING = [
+    " Alright, let's go through the launch plan.",
+    " We decided to ship the mobile release on Friday after the QA pass.",
+    " Um, yeah.",
+    " The QA pass on the mobile release found two blocking bugs.",
+    " Sarah will send the release notes to marketing by Thursday.",
+    " The mobile release notes need the new pricing.",
+    " Tom, can you update the pricing page before the launch?",
+    " Yeah.",
+    " Budget for the launch campaign stays at ten thousand dollars.",
+]
+
+
+def segments(texts, seconds=20.0):
+    return [{"start": i * seconds, "end": (i + 1) * seconds, "text": t} for i, t in enumerate(texts)]
+
+
+def test_summary_has_the_llm_layout():
+    summary = summarize_segments(segments(MEETING))
+
+    decisions, actions = summary.split("\n\n**Action Items:**\n")
+    assert decisions.startswith("**Key Decisions (5 bullet points):**\n")
+    assert len(decisions.splitlines()) == 6
+    assert "- We decided to ship the mobile release on Friday after the QA pass." in decisions
+    assert "Yeah" not in summary
+    assert "- Sarah: Sarah will send the release notes to marketing by Thursday." in actions
+    assert "- Tom: Can you update the pricing page before the launch?" in actions
+
+
+def test_action_items_ignore_descriptions():
+    assert action_items(["The event support isn't as nailed down as it needs to be."]) == []
+    assert action_items(["We need to book the venue."]) == ["We need to book the venue."]
+
+
+def test_textrank_matches_dense_similarity_matrix():
+    texts = [t.strip() for t in MEETING]
+    matrix = _tfidf(texts)
+    similarity = matrix @ matrix.T
+    np.fill_diagonal(similarity, 0)
+    n = len(texts)
+    degree = similarity.sum(axis=1)
+    transition = np.where(degree[:, None] > 0, similarity / np.where(degree > 0, degree, 1)[:, None], 1 / n)
+    expected = np.full(n, 1 / n)
+    for _ in range(200):
+        expected = 0.15 / n + 0.85 * transition.T @ expected
+
+    np.testing.assert_allclose(textrank(matrix), expected, atol=1e-4)
+    # The meeting keeps coming back to the mobile release
+    assert "mobile release" in texts[np.argmax(expected)]
+
+
+def test_auto_engine_summarises_short_meetings_locally(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'metrics.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    rec = Recording(platform="zoom", meeting_id="m1", recording_url="u", transcript_fetched=True)
+    db.add(rec)
+    db.commit()
+    path = tmp_path / "t.json"
+    path.write_text(json.dumps({"text": "".join(MEETING), "segments": segments(MEETING)}))
+
+    env = {"OPENAI_API_KEY": "k", "SUMMARY_ENGINE": "auto", "SUMMARY_EXTRACTIVE_MAX_MINUTES": "10"}
+    with patch.dict(os.environ, env), patch("app.summarizer.ChatOpenAI") as chat, \
+            patch("app.summarizer.SessionLocal", Session):
+        summary = generate_summary(str(path), rec.id)
+
+    chat.assert_not_called()
+    assert "**Action Items:**" in summary
+    metrics = db.query(SummaryMetrics).filter_by(recording_id=rec.id).one()
+    assert metrics.engine == "extractive" and metrics.total_tokens == 0 and metrics.cost == 0
+    assert metrics.latency_seconds is not None
+
+
+@patch.dict(os.environ, {"OPENAI_API_KEY": "", "SUMMARY_ENGINE": "auto", "SUMMARY_EXTRACTIVE_MAX_MINUTES": "0"})
+def test_auto_engine_without_api_key(tmp_path):
+    path = tmp_path / "t.json"
+    path.write_text(json.dumps({"text": "".join(MEETING), "segments": segments(MEETING, seconds=600)}))
+
+    summary = generate_summary(str(path))
+
+    assert summary.startswith("**Key Decisions (5 bullet points):**")
@@ -0,0 +1,98 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app import transcription
+from app.model_server import ModelServer, parse_address, transcribe_remote
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio):
+        self.calls += 1
+        return {"text": f" {len(audio)} samples", "segments": [], "language": "en"}
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = FakeModel()
+    monkeypatch.setitem(transcription._models, "fake.en", model)
+    return model
+
+
+def test_importing_summarizer_does_not_load_whisper_or_langchain():
+    code = "import sys, app.summarizer; print(sorted(m for m in ('whisper', 'torch', 'langchain') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_registry_loads_each_model_once(fake_model):
+    assert transcription.get_model("fake.en") is transcription.get_model("fake.en")
+
+
+def test_parse_address():
+    assert parse_address("/tmp/w.sock") == "/tmp/w.sock"
+    assert parse_address("unix:/tmp/w.sock") == "/tmp/w.sock"
+    assert parse_address("127.0.0.1:7001") == ("127.0.0.1", 7001)
+
+
+def start_server(tmp_path, **kwargs) -> tuple:
+    address = str(tmp_path / "whisper.sock")
+    server = ModelServer(address, "fake.en", **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    for _ in range(100):
+        if os.path.exists(address):
+            break
+        time.sleep(0.01)
+    return server, address
+
+
+def test_workers_transcribe_through_the_server(fake_model, tmp_path):
+    server, address = start_server(tmp_path)
+
+    try:
+        results = []
+        workers = [
+            threading.Thread(target=lambda: results.append(transcribe_remote(np.zeros(1600, np.float32), address)))
+            for _ in range(4)
+        ]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+    finally:
+        server.close()
+
+    assert [r["text"] for r in results] == [" 1600 samples"] * 4
+    assert fake_model.calls == 4
+
+
+def test_tcp_needs_an_authkey(monkeypatch):
+    monkeypatch.delenv("WHISPER_SERVER_AUTHKEY", raising=False)
+    with pytest.raises(ValueError, match="WHISPER_SERVER_AUTHKEY"):
+        ModelServer("127.0.0.1:7001", "fake.en")
+    with pytest.raises(ValueError, match="WHISPER_SERVER_AUTHKEY"):
+        transcribe_remote(np.zeros(16, np.float32), "127.0.0.1:7001")
+
+
+def test_server_only_reads_files_in_the_audio_directory(fake_model, tmp_path):
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    server, address = start_server(tmp_path, audio_dir=audio_dir)
+    try:
+        assert transcribe_remote(audio_dir / "m1.wav", address)["text"]
+        for path in [tmp_path / "secret.wav", audio_dir / ".." / "secret.wav"]:
+            with pytest.raises(RuntimeError, match="outside the audio directory"):
+                transcribe_remote(path, address)
+    finally:
+        server.close()
+    assert fake_model.calls == 1
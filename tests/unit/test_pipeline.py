@@ -0,0 +1,145 @@
+import os
+import pickle
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app import pipeline
+from app.pipeline import Job, Stage, Pipeline, run_serially
+
+
+def make_jobs(n):
+    return [Job(recording_id=i, meeting_id=f"m{i}", recording_url=f"http://example.com/{i}.mp4") for i in range(n)]
+
+
+def mark_processed(job):
+    job.summary = f"done {job.recording_id} in {os.getpid()}"
+    return job
+
+
+def test_pipeline_processes_every_job_once():
+    seen = []
+    lock = threading.Lock()
+
+    def record(job):
+        with lock:
+            seen.append(job.recording_id)
+        return job
+
+    pipeline = Pipeline([Stage("a", record, workers=3), Stage("b", mark_processed, workers=2)], queue_size=1)
+    results = pipeline.run(make_jobs(10))
+
+    assert sorted(seen) == list(range(10))
+    assert sorted(j.recording_id for j in results) == list(range(10))
+    assert all(j.summary.startswith("done") for j in results)
+    assert all(set(j.timings) == {"a", "b"} for j in results)
+
+
+def test_stages_overlap_across_recordings():
+    # Stage "download" of job 1 blocks until stage "transcribe" has started on job 0,
+    # which can only happen if the two stages run concurrently
+    transcribing = threading.Event()
+
+    def download(job):
+        if job.recording_id == 1:
+            assert transcribing.wait(timeout=5), "download of job 1 never overlapped transcription of job 0"
+        return job
+
+    def transcribe(job):
+        if job.recording_id == 0:
+            transcribing.set()
+        return job
+
+    results = Pipeline([Stage("download", download), Stage("transcribe", transcribe)]).run(make_jobs(2))
+    assert not any(j.failed for j in results)
+
+
+def test_failed_job_skips_later_stages():
+    def explode(job):
+        if job.recording_id == 1:
+            raise RuntimeError("ffmpeg exploded")
+        return job
+
+    results = Pipeline([Stage("extract", explode), Stage("summarize", mark_processed)]).run(make_jobs(3))
+    by_id = {j.recording_id: j for j in results}
+
+    assert by_id[1].failed_stage == "extract"
+    assert by_id[1].error == "ffmpeg exploded"
+    assert by_id[1].summary is None
+    assert by_id[0].summary and by_id[2].summary
+
+
+def test_process_stage_runs_outside_parent():
+    results = Pipeline([Stage("transcribe", mark_processed, workers=2, processes=True)]).run(make_jobs(4))
+
+    assert len(results) == 4
+    assert all(not j.summary.endswith(f"in {os.getpid()}") for j in results)
+
+
+def slow_transcribe(job):
+    time.sleep(0.5)
+    return mark_processed(job)
+
+
+def test_process_stage_keeps_the_lease_alive():
+    renewed = []
+    with patch.object(pipeline, "LEASE_RENEW_SECONDS", 0.1), \
+            patch.object(pipeline, "_renew_lease", lambda job: renewed.append(job.recording_id)):
+        [job] = Pipeline([Stage("transcribe", slow_transcribe, processes=True)]).run(make_jobs(1))
+
+    assert job.summary and not job.failed
+    assert len(renewed) >= 3 and set(renewed) == {0}
+
+
+def spooled_samples(job):
+    from app.audio import read_pcm
+    job.summary = f"{len(read_pcm(job.pcm_path))} samples"
+    return job
+
+
+def test_streamed_samples_reach_the_worker_through_a_file(tmp_path):
+    samples = np.zeros(60 * 16000, dtype=np.float32)
+    with patch("app.audio.load_audio", return_value=samples), patch("app.transcription.TRANSCRIBE_WINDOWED", False), \
+            patch.object(pipeline, "PCM_SPOOL_DIR", str(tmp_path)):
+        [job] = Pipeline([Stage("stream", pipeline.stream_stage),
+                          Stage("transcribe", spooled_samples, processes=True)]).run(make_jobs(1))
+
+    assert job.summary == f"{len(samples)} samples"
+    # The job that crossed the process boundary carried a path, not the samples
+    assert len(pickle.dumps(job)) < 10_000
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_download_outlives_the_job_until_extracted(tmp_path):
+    downloads = []
+
+    def download_file(url, dest):
+        downloads.append(url)
+        Path(str(dest) + ".part").write_bytes(b"half")
+        raise ConnectionError("reset by peer")
+
+    with patch.object(pipeline, "DOWNLOAD_DIR", tmp_path), patch("app.summarizer.download_file", download_file):
+        [job] = run_serially([Stage("download", pipeline.download_stage)], make_jobs(1))
+    # The job's workdir is gone, the partial download isn't
+    assert job.failed and job.workdir is None
+    assert (tmp_path / "0" / "m0_meeting.mp4.part").read_bytes() == b"half"
+
+    (tmp_path / "0" / "m0_meeting.mp4").write_bytes(b"video")
+    with patch.object(pipeline, "DOWNLOAD_DIR", tmp_path), patch("app.summarizer.download_file", download_file), \
+            patch("app.summarizer.extract_audio", lambda video, audio: audio.write_bytes(b"wav")):
+        [job] = run_serially([Stage("download", pipeline.download_stage), Stage("extract", pipeline.extract_stage)],
+                             make_jobs(1))
+    assert not job.failed and len(downloads) == 1
+    assert not (tmp_path / "0").exists()
+
+
+def test_run_serially_matches_pipeline_output():
+    stages = [Stage("a", mark_processed)]
+    results = run_serially(stages, make_jobs(3))
+    assert [j.recording_id for j in results] == [0, 1, 2]
@@ -0,0 +1,134 @@
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app import publishers
+from app.publishers import PublishError, confluence_steps, digest_messages
+from app.transcript_store import save_transcript
+
+SETTINGS = {
+    "CONFLUENCE_BASE_URL": "https://wiki.example.com/wiki", "CONFLUENCE_USER": "bot@example.com",
+    "CONFLUENCE_API_TOKEN": "token", "CONFLUENCE_SPACE": "MEET", "CONFLUENCE_PARENT_ID": "42",
+}
+
+
+class Response:
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self.data = data if data is not None else {}
+        self.text = json.dumps(self.data)
+
+    def json(self):
+        return self.data
+
+
+def run(steps, respond=None):
+    """Drive the steps, answering every request with ``respond(request)`` (a new page id by default)."""
+    requests, response = [], None
+    try:
+        while True:
+            request = steps.send(response)
+            if "files" in request:
+                # The spooled attachment is closed once the steps move on
+                _, f, _ = request["files"]["file"]
+                request = dict(request, upload=gzip.decompress(f.read()).decode())
+            requests.append(request)
+            response = respond(request) if respond else Response(data={"id": str(100 + len(requests))})
+    except StopIteration:
+        return requests
+
+
+def transcript(tmp_path, minutes, name="m.transcript"):
+    segments = [{"id": i, "seek": 0, "start": i * 5.0, "end": i * 5.0 + 5.0, "text": f" Point {i} is <b> & more.",
+                 "tokens": [], "temperature": 0.0, "avg_logprob": 0.0, "compression_ratio": 1.0, "no_speech_prob": 0.0}
+                for i in range(minutes * 12)]
+    path = tmp_path / name
+    save_transcript({"text": "".join(s["text"] for s in segments), "segments": segments, "language": "en"}, path)
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def confluence():
+    with patch.multiple(publishers, **SETTINGS):
+        yield
+
+
+def test_short_transcript_is_one_escaped_page(tmp_path):
+    requests = run(confluence_steps("m1", "Ship <Friday> & celebrate", transcript(tmp_path, 3)))
+
+    assert len(requests) == 1
+    page = requests[0]["json"]
+    body = page["body"]["storage"]["value"]
+    assert page["ancestors"] == [{"id": 42}] and page["title"] == "Meeting Summary: m1"
+    assert "Ship &lt;Friday&gt; &amp; celebrate" in body
+    assert "<strong>[00:01:00]</strong> Point 12 is &lt;b&gt; &amp; more." in body
+    assert body.count("<p>") == 1 + 3
+
+
+def test_long_transcript_is_attached_compressed(tmp_path):
+    path = transcript(tmp_path, 120)
+    with patch.object(publishers, "CONFLUENCE_MAX_BODY_BYTES", 20_000):
+        page, attachment = run(confluence_steps("m1", "Summary", path))
+
+    assert len(page["json"]["body"]["storage"]["value"]) < 20_000
+    assert 'ri:filename="transcript.txt.gz"' in page["json"]["body"]["storage"]["value"]
+    assert attachment["method"] == "PUT" and attachment["url"].endswith("/content/101/child/attachment")
+    lines = attachment["upload"].split("\n\n")
+    assert lines[0].startswith("[00:00:00] Point 0 is <b> & more.") and "Point 1439 " in lines[-2]
+
+
+def test_long_transcript_can_be_split_into_child_pages(tmp_path):
+    path = transcript(tmp_path, 120)
+    with patch.multiple(publishers, CONFLUENCE_MAX_BODY_BYTES=20_000, CONFLUENCE_LARGE_TRANSCRIPTS="pages"):
+        summary, *parts = run(confluence_steps("m1", "Summary", path))
+
+    bodies = [p["json"]["body"]["storage"]["value"] for p in parts]
+    assert 'ac:name="children"' in summary["json"]["body"]["storage"]["value"]
+    assert len(parts) > 1 and all(len(b.encode()) <= 20_000 for b in bodies)
+    assert all(p["json"]["ancestors"] == [{"id": 101}] for p in parts)
+    assert [p["json"]["title"] for p in parts][-1] == f"Meeting Summary: m1 (transcript part {len(parts)})"
+    text = "".join(bodies)
+    assert all(f"Point {i} is" in text for i in range(0, 1440, 97))
+
+
+def test_retried_publication_reuses_the_existing_page(tmp_path):
+    def respond(request):
+        if request["method"] == "POST":
+            return Response(400, {"message": "A page with this title already exists"})
+        if request["method"] == "GET":
+            return Response(data={"results": [{"id": "77"}]})
+        return Response()
+
+    path = transcript(tmp_path, 120)
+    with patch.object(publishers, "CONFLUENCE_MAX_BODY_BYTES", 20_000):
+        post, lookup, attachment = run(confluence_steps("m1", "Summary", path), respond)
+
+    assert lookup["params"] == {"spaceKey": "MEET", "title": "Meeting Summary: m1"}
+    assert attachment["url"].endswith("/content/77/child/attachment")
+    with pytest.raises(PublishError):
+        run(confluence_steps("m1", "Summary", path), lambda request: Response(403, {"message": "forbidden"}))
+
+
+def test_digest_is_split_within_slack_limits():
+    payloads = [{"meeting_id": f"m{i}", "summary": "\n".join(f"- Point {j} for <team> & co" for j in range(i * 40))}
+                for i in range(30)]
+    messages = digest_messages(payloads)
+
+    assert len(messages) > 1 and messages[0]["text"] == f"Meeting summaries (30), part 1 of {len(messages)}"
+    sections = [b["text"]["text"] for m in messages for b in m["blocks"] if b["type"] == "section"]
+    for m in messages:
+        assert len(m["blocks"]) <= 50 and m["blocks"][0]["type"] == "header" and m["blocks"][-1]["type"] != "divider"
+        assert sum(len(b["text"]["text"]) for b in m["blocks"][1:] if b["type"] == "section") <= 12000
+    assert all(len(text) <= 3000 for text in sections)
+    assert "- Point 0 for &lt;team&gt; &amp; co" in sections[1]
+    assert "\n".join(sections).count("- Point") == sum(i * 40 for i in range(30))
+    # Short summaries are never split across messages
+    for i in range(1, 5):
+        assert sum(f"Meeting Summary (m{i})*" in text for text in sections) == 1
+
+
+def test_threaded_digest_lists_first_lines():
+    [message] = digest_messages([{"meeting_id": "m1", "summary": "\nShip Friday\n- More"}], threaded=True)
+    assert message["blocks"][1]["text"]["text"] == "*Meeting Summary (m1)*\nShip Friday"
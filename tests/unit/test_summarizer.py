@@ -2,13 +2,21 @@ import pytest
 import os
 from unittest.mock import patch, MagicMock
 import json
+import threading
+import time
 from pathlib import Path
+from typing import Any
+
+from langchain.prompts import PromptTemplate
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
 
 # Ensure app modules can be imported
 import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from app.summarizer import generate_summary, AUDIO_DIR
+from app.summarizer import generate_summary, summarize_map_reduce, SummaryError, AUDIO_DIR
 
 # Create a dummy transcript file for testing
 DUMMY_TRANSCRIPT_CONTENT = {
@@ -46,14 +54,14 @@ def test_generate_summary_success(MockChatOpenAI):
 
 @patch.dict(os.environ, {"OPENAI_API_KEY": ""}) # Simulate missing API key
 def test_generate_summary_no_api_key():
-    with pytest.raises(ValueError, match="OPENAI_API_KEY not set"): #Updated to ValueError based on implementation
+    with pytest.raises(SummaryError, match="OPENAI_API_KEY not set"):
         generate_summary(str(TRANSCRIPT_FILE_PATH))
 
 def test_generate_summary_file_not_found():
     # Set a valid API key for this test case, as we are testing file not found, not auth.
     with patch.dict(os.environ, {"OPENAI_API_KEY": "fake_api_key"}):
-        summary = generate_summary("non_existent_file.json")
-        assert summary == "Error: Transcript file not found."
+        with pytest.raises(SummaryError, match="Transcript file not found"):
+            generate_summary("non_existent_file.json")
 
 def test_generate_summary_empty_transcript():
     EMPTY_TRANSCRIPT_ID = "empty_transcript_test"
@@ -74,5 +82,77 @@ def test_generate_summary_llm_error(MockChatOpenAI):
     mock_chain.side_effect = Exception("LLM service unavailable")
 
     with patch('app.summarizer.load_summarize_chain', return_value=mock_chain):
-        summary = generate_summary(str(TRANSCRIPT_FILE_PATH))
-        assert "Error generating summary: LLM service unavailable" in summary 
\ No newline at end of file
+        with pytest.raises(SummaryError, match="LLM service unavailable"):
+            generate_summary(str(TRANSCRIPT_FILE_PATH)) 
+
+
+class RecordingChatModel(BaseChatModel):
+    """Stand-in chat model: records prompts and peak concurrency, reports token usage."""
+    delay: float = 0.0
+    prompts: list = []
+    active: int = 0
+    peak: int = 0
+    lock: Any = None
+
+    @property
+    def _llm_type(self):
+        return "recording"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt = messages[-1].content
+        with self.lock:
+            self.prompts.append(prompt)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if "Below are summaries" in prompt:
+            reply = "**Key Decisions (5 bullet points):**\n- Ship it.\n\n**Action Items:**\n- Bob: write tests."
+        else:
+            reply = f"summary {len(self.prompts)}"
+        usage = {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=reply))],
+                          llm_output={"token_usage": usage, "model_name": "gpt-4o"})
+
+
+@patch.dict(os.environ, {"OPENAI_API_KEY": "fake_api_key", "SUMMARY_STRATEGY": "map_reduce", "SUMMARY_CONCURRENCY": "3",
+                         "SUMMARY_CHUNK_TOKENS": "2000"})
+def test_generate_summary_map_reduce_runs_chunks_concurrently(tmp_path):
+    llm = RecordingChatModel(delay=0.05, prompts=[], lock=threading.Lock())
+    path = tmp_path / "long.json"
+    path.write_text(json.dumps({"text": "\n\n".join(f"Part {i}. " + "talk " * 1500 for i in range(6))}))
+    session = MagicMock()
+
+    with patch('app.summarizer.ChatOpenAI', return_value=llm), patch('app.summarizer.SessionLocal', return_value=session):
+        summary = generate_summary(str(path), recording_id=7)
+
+    assert "**Key Decisions (5 bullet points):**" in summary and "**Action Items:**" in summary
+    # Six chunk summaries, then one reduce
+    assert len(llm.prompts) == 7 and "Below are summaries" in llm.prompts[-1]
+    assert llm.peak == 3
+    metrics = session.add.call_args[0][0]
+    assert (metrics.recording_id, metrics.prompt_tokens, metrics.total_tokens) == (7, 70, 84)
+
+
+def test_map_reduce_of_one_chunk_skips_the_reduce():
+    llm = RecordingChatModel(prompts=[], lock=threading.Lock())
+
+    summarize_map_reduce(llm, ["chunk 0"], PromptTemplate.from_template("Summarise: {text}"),
+                         max_tokens=1000, count_tokens=len)
+
+    assert len(llm.prompts) == 1
+    assert "chunk 0" in llm.prompts[0] and "**Key Decisions (5 bullet points):**" in llm.prompts[0]
+
+
+def test_map_reduce_collapses_long_summaries_hierarchically():
+    llm = RecordingChatModel(prompts=[], lock=threading.Lock())
+
+    summary = summarize_map_reduce(llm, [f"chunk {i}" for i in range(8)],
+                                   PromptTemplate.from_template("Summarise: {text}"), max_tokens=25, count_tokens=len)
+
+    assert "**Action Items:**" in summary
+    collapses = [p for p in llm.prompts if p.startswith("The following are summaries")]
+    # 8 chunk summaries are collapsed in pairs into 4, then 2, which fit one reduce
+    assert len(collapses) == 4 + 2
+    assert len(llm.prompts) == 8 + 6 + 1
@@ -0,0 +1,73 @@
+import json
+import wave
+
+import numpy as np
+
+from app.transcript_cache import TranscriptCache, audio_key, cache_stats
+
+
+def write_wav(path, samples):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(samples.astype("<i2").tobytes())
+
+
+def test_wav_file_and_float_array_share_a_key(tmp_path):
+    samples = (np.sin(np.arange(16000) / 10) * 20000).astype(np.int16)
+    write_wav(tmp_path / "a.wav", samples)
+
+    from_file = audio_key(tmp_path / "a.wav", "tiny.en")
+    from_array = audio_key(samples.astype(np.float32) / 32768.0, "tiny.en")
+
+    assert from_file == from_array
+    assert audio_key(tmp_path / "a.wav", "base.en") != from_file
+
+
+def test_identical_audio_is_transcribed_once(tmp_path):
+    cache = TranscriptCache(tmp_path / "cas")
+    audio = np.zeros(16000, dtype=np.float32)
+    calls = []
+
+    def fake_transcribe(a):
+        calls.append(a)
+        return {"text": " hello", "segments": [], "language": "en"}
+
+    key1, hit1 = cache.transcribe(audio, tmp_path / "meeting1.json", fake_transcribe, "tiny.en")
+    key2, hit2 = cache.transcribe(audio.copy(), tmp_path / "meeting2.json", fake_transcribe, "tiny.en")
+
+    assert len(calls) == 1
+    assert (hit1, hit2) == (False, True)
+    assert key1 == key2
+    assert cache_stats([hit1, hit2, None]) == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    assert json.loads((tmp_path / "meeting2.json").read_text())["text"] == " hello"
+    # Both meeting files point at the single cached copy
+    assert (tmp_path / "meeting1.json").stat().st_ino == cache.path_for(key1).stat().st_ino
+
+
+def test_different_model_misses(tmp_path):
+    cache = TranscriptCache(tmp_path / "cas")
+    audio = np.zeros(1600, dtype=np.float32)
+    fake = lambda a: {"text": "", "segments": []}
+
+    cache.transcribe(audio, tmp_path / "m.json", fake, "tiny.en")
+    _, hit = cache.transcribe(audio, tmp_path / "m.json", fake, "small.en")
+
+    assert not hit
+
+
+def test_json_entry_is_reused_for_compact_transcripts(tmp_path):
+    from app.transcript_store import load_text
+
+    cache = TranscriptCache(tmp_path / "cas")
+    audio = np.zeros(1600, dtype=np.float32)
+    calls = []
+    fake = lambda a: calls.append(a) or {"text": " hi", "segments": [
+        {"id": 0, "seek": 0, "start": 0.0, "end": 0.1, "text": " hi", "tokens": [1]}], "language": "en"}
+
+    cache.transcribe(audio, tmp_path / "m.json", fake, "tiny.en")
+    _, hit = cache.transcribe(audio, tmp_path / "m.transcript", fake, "tiny.en")
+
+    assert hit and len(calls) == 1
+    assert load_text(tmp_path / "m.transcript") == " hi"
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from app.transcript_store import (
+    CompactTranscript, TranscriptWriter, convert, iter_segments, load_segments, load_text, load_transcript,
+    save_transcript,
+)
+
+
+def make_transcript(n=40):
+    segments = [
+        {"id": i, "seek": i * 500, "start": i * 5.0, "end": i * 5.0 + 4.5, "text": f" Segment {i} – café.",
+         "tokens": list(range(i, i + 3)), "temperature": 0.0, "avg_logprob": -0.25,
+         "compression_ratio": 1.5, "no_speech_prob": 0.125}
+        for i in range(n)
+    ]
+    return {"text": "".join(s["text"] for s in segments), "segments": segments, "language": "en"}
+
+
+def test_compact_round_trip(tmp_path):
+    transcript = make_transcript()
+    path = tmp_path / "m.transcript"
+    save_transcript(transcript, path)
+
+    assert load_transcript(path) == transcript
+    assert load_text(path) == transcript["text"]
+    assert path.stat().st_size < len(json.dumps(transcript, indent=2)) / 2
+
+
+def test_time_range_matches_json(tmp_path):
+    transcript = make_transcript()
+    save_transcript(transcript, tmp_path / "m.transcript")
+    save_transcript(transcript, tmp_path / "m.json")
+
+    for start, end in [(12.0, 31.0), (None, 7.0), (190.0, None), (4.6, 4.9), (500.0, 600.0)]:
+        compact = load_segments(tmp_path / "m.transcript", start, end)
+        legacy = load_segments(tmp_path / "m.json", start, end)
+        assert compact == legacy
+    assert [s["id"] for s in load_segments(tmp_path / "m.transcript", 12.0, 31.0)] == [2, 3, 4, 5, 6]
+
+
+def test_text_without_segments_is_kept(tmp_path):
+    path = tmp_path / "m.transcript"
+
+    save_transcript({"text": " Stitched text only.", "language": "en"}, path)
+
+    assert load_text(path) == " Stitched text only."
+    assert [s["text"] for s in load_segments(path)] == [" Stitched text only."]
+
+
+def test_iter_segments_reads_in_batches(tmp_path):
+    transcript = make_transcript()
+    save_transcript(transcript, tmp_path / "m.transcript")
+    save_transcript(transcript, tmp_path / "m.json")
+
+    assert list(iter_segments(tmp_path / "m.transcript", batch_size=7)) == transcript["segments"]
+    assert list(iter_segments(tmp_path / "m.json")) == transcript["segments"]
+
+
+def test_text_load_does_not_map_segments(tmp_path):
+    save_transcript(make_transcript(), tmp_path / "m.transcript")
+    transcript = CompactTranscript(tmp_path / "m.transcript")
+
+    transcript.text()
+
+    assert transcript._segments is None
+
+
+def test_windowed_writer_matches_whole_file(tmp_path):
+    transcript = make_transcript(10)
+    writer = TranscriptWriter(tmp_path / "windowed.transcript")
+    writer.language = "en"
+    writer.add_segments(transcript["segments"][:4])
+    writer.add_segments([])
+    writer.add_segments(transcript["segments"][4:])
+    writer.close()
+    save_transcript(transcript, tmp_path / "whole.transcript")
+
+    assert (tmp_path / "windowed.transcript").read_bytes() == (tmp_path / "whole.transcript").read_bytes()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["whole.transcript", "windowed.transcript"]
+
+
+def test_convert_legacy_json(tmp_path):
+    transcript = make_transcript(3)
+    legacy = tmp_path / "m.json"
+    legacy.write_text(json.dumps(transcript, indent=2))
+
+    dest = convert(legacy, remove=True)
+
+    assert dest == tmp_path / "m.transcript"
+    assert not legacy.exists()
+    assert load_transcript(dest) == transcript
+
+
+def test_word_timings_are_not_silently_dropped(tmp_path):
+    transcript = make_transcript(1)
+    transcript["segments"][0]["words"] = [{"word": " Segment", "start": 0.0, "end": 0.4}]
+    (tmp_path / "m.json").write_text(json.dumps(transcript))
+
+    with pytest.raises(ValueError, match="word timings"):
+        convert(tmp_path / "m.json")
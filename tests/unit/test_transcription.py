@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+
+from app.audio import SAMPLE_RATE, find_split_points
+from app.transcription import TranscriptWriter, split_windows, stitch
+
+
+def speech_with_pauses(seconds, pauses):
+    """Noise-like 'speech' with silent gaps at the given (start, end) seconds."""
+    rng = np.random.default_rng(0)
+    audio = (rng.standard_normal(seconds * SAMPLE_RATE) * 0.3).astype(np.float32)
+    for start, end in pauses:
+        audio[int(start * SAMPLE_RATE):int(end * SAMPLE_RATE)] = 0.0
+    return audio
+
+
+def test_split_points_land_in_nearby_silence():
+    audio = speech_with_pauses(90, [(27.0, 28.0), (61.0, 62.0)])
+
+    cuts = [c / SAMPLE_RATE for c in find_split_points(audio, window_seconds=30, search_seconds=5)]
+
+    assert len(cuts) == 2
+    assert 27.0 <= cuts[0] <= 28.0
+    assert 61.0 <= cuts[1] <= 62.0
+
+
+def test_windows_cover_audio_exactly_once():
+    audio = speech_with_pauses(95, [(29.5, 30.5), (59.5, 60.5)])
+    windows = split_windows(audio, window_seconds=30)
+
+    assert len(windows) == 3
+    assert windows[0][0] == 0
+    assert np.array_equal(np.concatenate([w for _, w in windows]), audio)
+
+
+def test_stitch_offsets_segments_and_renumbers_ids():
+    first = {"text": " Hello there.", "language": "en", "segments": [
+        {"id": 0, "seek": 0, "start": 0.0, "end": 2.0, "text": " Hello", "tokens": [1]},
+        {"id": 1, "seek": 0, "start": 2.0, "end": 4.0, "text": " there.", "tokens": [2]},
+    ]}
+    second = {"text": " Next window.", "language": "en", "segments": [
+        {"id": 0, "seek": 0, "start": 0.5, "end": 3.0, "text": " Next window.", "tokens": [3],
+         "words": [{"word": " Next", "start": 0.5, "end": 1.0}]},
+    ]}
+
+    result = stitch([first, second], [0, 30 * SAMPLE_RATE])
+
+    assert result["text"] == " Hello there. Next window."
+    assert result["language"] == "en"
+    assert [s["id"] for s in result["segments"]] == [0, 1, 2]
+    last = result["segments"][2]
+    assert (last["start"], last["end"], last["seek"]) == (30.5, 33.0, 3000)
+    assert last["words"][0]["start"] == 30.5
+    # Inputs are left untouched
+    assert second["segments"][0]["start"] == 0.5
+
+
+def test_writer_output_matches_stitched_transcript(tmp_path):
+    windows = [
+        {"text": " One.", "language": "en", "segments": [
+            {"id": 0, "seek": 0, "start": 0.0, "end": 1.0, "text": " One.", "tokens": [1]}]},
+        {"text": "", "language": "en", "segments": []},
+        {"text": " Two. Three.", "language": "en", "segments": [
+            {"id": 0, "seek": 0, "start": 0.2, "end": 1.0, "text": " Two.", "tokens": [2]},
+            {"id": 1, "seek": 0, "start": 1.0, "end": 2.0, "text": " Three.", "tokens": [3]}]},
+    ]
+    offsets = [0, 20 * SAMPLE_RATE, 40 * SAMPLE_RATE]
+    path = tmp_path / "meeting.json"
+
+    writer = TranscriptWriter(path)
+    for result, offset in zip(windows, offsets):
+        assert not path.exists()
+        writer.add(result, offset)
+    writer.close()
+
+    assert json.loads(path.read_text()) == stitch(windows, offsets)
+    assert writer.segments == 3
+    assert list(tmp_path.iterdir()) == [path]
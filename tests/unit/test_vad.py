@@ -0,0 +1,67 @@
+import numpy as np
+
+from app.audio import SAMPLE_RATE
+from app.vad import SpeechFilter, detect_speech
+
+
+def recording(layout):
+    """Build audio from (seconds, is_speech) pieces; silence is faint noise."""
+    rng = np.random.default_rng(1)
+    pieces = []
+    for seconds, speech in layout:
+        n = int(seconds * SAMPLE_RATE)
+        level = 0.3 if speech else 0.001
+        pieces.append((rng.standard_normal(n) * level).astype(np.float32))
+    return np.concatenate(pieces)
+
+
+def test_detects_speech_between_long_silences():
+    audio = recording([(20, False), (5, True), (30, False), (4, True), (10, False)])
+    regions = [(s / SAMPLE_RATE, e / SAMPLE_RATE) for s, e in detect_speech(audio)]
+
+    assert len(regions) == 2
+    assert abs(regions[0][0] - 20) < 0.5 and abs(regions[0][1] - 25) < 0.5
+    assert abs(regions[1][0] - 55) < 0.5 and abs(regions[1][1] - 59) < 0.5
+
+
+def test_short_pauses_do_not_split_speech():
+    audio = recording([(3, False), (2, True), (0.4, False), (2, True), (3, False)])
+    assert len(detect_speech(audio)) == 1
+
+
+def test_silent_recording_is_skipped_entirely():
+    audio = recording([(10, False)])
+    speech = SpeechFilter(audio)
+    calls = []
+
+    result = speech.wrap(lambda a: calls.append(a))(audio)
+
+    assert calls == []
+    assert result["segments"] == []
+    assert speech.skipped_seconds == 10
+
+
+def test_segment_times_map_back_to_original_recording():
+    audio = recording([(20, False), (5, True), (30, False), (4, True), (10, False)])
+    speech = SpeechFilter(audio)
+    first_len = (speech.map.regions[0][1] - speech.map.regions[0][0]) / SAMPLE_RATE
+    seen = {}
+
+    def fake_transcribe(samples):
+        seen["seconds"] = len(samples) / SAMPLE_RATE
+        return {"text": " a b", "language": "en", "segments": [
+            {"id": 0, "seek": 0, "start": 1.0, "end": first_len, "text": " a"},
+            {"id": 1, "seek": 0, "start": first_len + 1.0, "end": first_len + 2.0, "text": " b"},
+        ]}
+
+    result = speech.wrap(fake_transcribe)(audio)
+    first, second = result["segments"]
+
+    assert abs(seen["seconds"] - speech.speech_seconds) < 1e-6
+    assert speech.skipped_seconds > 45
+    region0, region1 = [(s / SAMPLE_RATE, e / SAMPLE_RATE) for s, e in speech.map.regions]
+    assert abs(first["start"] - (region0[0] + 1.0)) < 1e-6
+    # An end exactly on the region boundary stays in the first region
+    assert abs(first["end"] - region0[1]) < 1e-6
+    assert abs(second["start"] - (region1[0] + 1.0)) < 1e-6
+    assert abs(second["end"] - (region1[0] + 2.0)) < 1e-6